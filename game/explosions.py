@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import List, Sequence
+
+import numpy as np
+
+from .health import DamageReport, HitFeedback
+from .math_utils import distance
+from .weapons import Actor, ExplosionResult, RocketProjectile
+
+
+def resolve_explosions(rockets: Sequence[RocketProjectile], actors: Sequence[Actor]) -> List[ExplosionResult]:
+    """Explode every rocket of a tick against every actor in one batched pass.
+
+    Equivalent to calling ``rocket.explode(actors)`` for each rocket in order:
+    the rocket x actor distance matrix selects the pairs inside a splash, falloff,
+    direct hits and knockback are computed for all pairs at once, and damage is applied
+    in rounds that keep each actor's hits in rocket order, so armor soaked by an earlier
+    rocket is gone for the next. Health, armor and velocity are written back to the
+    actors at the end. Requires NumPy.
+    """
+    if not rockets:
+        return []
+    if not actors:
+        return [ExplosionResult(damaged_actors=[]) for _ in rockets]
+
+    centers = np.array([rocket.position for rocket in rockets], dtype=np.float64)
+    damage = np.array([rocket.damage for rocket in rockets], dtype=np.float64)[:, None]
+    radius = np.array([rocket.splash_radius for rocket in rockets], dtype=np.float64)[:, None]
+    self_scale = np.array([rocket.self_damage_scale for rocket in rockets], dtype=np.float64)[:, None]
+    knockback = np.array([rocket.knockback_force for rocket in rockets], dtype=np.float64)[:, None]
+    positions = np.array([actor.position for actor in actors], dtype=np.float64)
+    is_shooter = np.array([actor.name == "shooter" for actor in actors])
+
+    offsets = positions[None, :, :] - centers[:, None, :]
+    dist = np.sqrt(np.einsum("rai,rai->ra", offsets, offsets))
+    # math.dist in RocketProjectile.explode may round an ulp or two differently. Where that could
+    # flip a splash-edge or direct-hit comparison, take its distance so both paths agree.
+    slack = 8 * np.spacing(radius)
+    near_edge = (np.abs(dist - radius) <= slack) | (np.abs(dist - radius * 0.25) <= slack)
+    for rocket, actor in zip(*np.nonzero(near_edge)):
+        dist[rocket, actor] = distance(rockets[rocket].position, actors[actor].position)
+    touching = dist <= radius
+    rows, cols = np.nonzero(touching | (dist == 0))
+
+    # Everything past the distance matrix only concerns (rocket, actor) pairs inside a splash.
+    pair_dist = dist[rows, cols]
+    pair_radius = radius[rows, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = pair_dist / pair_radius
+        direction = np.where(pair_dist[:, None] > 0, offsets[rows, cols] / pair_dist[:, None], 0.0)
+    shooter = is_shooter[cols]
+    pair_damage = damage[rows, 0]
+    amount = np.where(pair_dist == 0, pair_damage, pair_damage * (1.0 - ratio))
+    amount = np.where(shooter, amount * self_scale[rows, 0], amount)
+    positive = amount > 0
+    allow_armor = ~shooter & ~(pair_dist <= pair_radius * 0.25)
+    pushes = touching[rows, cols]
+    forces = direction * (knockback[rows, 0] * (1.0 - np.minimum(ratio, 1.0)))[:, None]
+
+    health = np.array([actor.health.health for actor in actors], dtype=np.float64)
+    armor = np.array([actor.health.armor for actor in actors], dtype=np.float64)
+    velocity = np.array([actor.velocity for actor in actors], dtype=np.float64)
+    applied = np.zeros(len(rows))
+    remaining_health = np.empty(len(rows))
+    remaining_armor = np.empty(len(rows))
+
+    # Pairs are in rocket order. Round k holds every actor's k-th hit, so each round touches an
+    # actor at most once and can be applied in bulk while armor still drains rocket by rocket.
+    for pair in _rounds(cols):
+        actor = cols[pair]
+        hit = positive[pair]
+        absorbed = np.where(hit & allow_armor[pair] & (armor[actor] > 0), np.minimum(armor[actor], amount[pair]), 0.0)
+        armor[actor] -= absorbed
+        lost = np.where(hit, np.minimum(health[actor], amount[pair] - absorbed), 0.0)
+        health[actor] -= lost
+        applied[pair] = absorbed + lost
+        remaining_health[pair] = health[actor]
+        remaining_armor[pair] = armor[actor]
+        pushing = pair[pushes[pair]]
+        velocity[cols[pushing]] += forces[pushing]
+
+    reports = _reports(positive, applied, remaining_health, remaining_armor)
+    bounds = np.searchsorted(rows, np.arange(len(rockets) + 1)).tolist()
+    results = [ExplosionResult(damaged_actors=reports[bounds[i] : bounds[i + 1]]) for i in range(len(rockets))]
+
+    for index in np.unique(cols[positive]).tolist():
+        actors[index].health.health = float(health[index])
+        actors[index].health.armor = float(armor[index])
+    for index in np.unique(cols[pushes]).tolist():
+        actors[index].velocity = tuple(velocity[index].tolist())
+    return results
+
+
+def _rounds(cols: np.ndarray) -> List[np.ndarray]:
+    """Split pair indexes into rounds by per-actor occurrence, keeping pair order within an actor."""
+    if not len(cols):
+        return []
+    order = np.argsort(cols, kind="stable")
+    sorted_cols = cols[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cols[1:] != sorted_cols[:-1]])
+    rank = np.arange(len(cols)) - np.repeat(starts, np.diff(np.r_[starts, len(cols)]))
+    rank_of_pair = np.empty(len(cols), dtype=np.intp)
+    rank_of_pair[order] = rank
+    return [np.flatnonzero(rank_of_pair == k) for k in range(int(rank.max()) + 1)]
+
+
+def _reports(positive: np.ndarray, applied: np.ndarray, health: np.ndarray, armor: np.ndarray) -> List[DamageReport]:
+    reports = []
+    for was_hit, damage_applied, remaining_health, remaining_armor in zip(
+        positive.tolist(), applied.tolist(), health.tolist(), armor.tolist()
+    ):
+        if not was_hit:
+            reports.append(DamageReport(0.0, remaining_health, remaining_armor, False, None))
+            continue
+        reports.append(
+            DamageReport(
+                damage_applied=damage_applied,
+                remaining_health=remaining_health,
+                remaining_armor=remaining_armor,
+                defeated=remaining_health <= 0,
+                feedback=HitFeedback(hitmarker=True, sound="hit_confirm", screen_flash=True),
+            )
+        )
+    return reports
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .health import DamageReport
+from .math_utils import Vector, normalize
+from .spatial import SpatialGrid
+from .weapons import Actor, HitscanWeapon
+
+
+@dataclass
+class RayHit:
+    pellet: int
+    actor: Actor
+    distance: float
+    point: Vector
+    damage: float
+
+
+@dataclass
+class VictimDamage:
+    actor: Actor
+    damage: float
+    hits: int
+    report: Optional[DamageReport] = None
+
+
+@dataclass
+class HitscanResult:
+    was_fired: bool
+    hits: List[RayHit] = field(default_factory=list)
+    victims: List[VictimDamage] = field(default_factory=list)
+
+    @property
+    def damage(self) -> float:
+        return sum(victim.damage for victim in self.victims)
+
+    def damage_by_victim(self) -> Dict[str, float]:
+        return {victim.actor.name: victim.damage for victim in self.victims}
+
+
+class HitscanResolver:
+    """Server-side hit resolution for :class:`HitscanWeapon` and :class:`Shotgun`.
+
+    A shot is cast as one ray per pellet, each deflected from the aim by the weapon's
+    own ``roll_spread``. Actors are spheres of ``actor_radius``. A broadphase drops
+    actors out of range or behind the shooter (or asks a :class:`SpatialGrid` for the
+    ones in range), then every pellet is tested against every candidate in a single
+    vectorized ray-sphere pass; each ray stops at the first actor it meets. Damage per
+    hit comes from ``weapon.calculate_damage`` at the hit distance and is applied once
+    per victim. Requires NumPy.
+    """
+
+    def __init__(self, actor_radius: float = 0.5, up: Vector = (0.0, 0.0, 1.0)) -> None:
+        if actor_radius <= 0:
+            raise ValueError("actor_radius must be positive")
+        self.actor_radius = actor_radius
+        self.up = normalize(up)
+
+    def fire(
+        self,
+        weapon: HitscanWeapon,
+        shooter: Actor,
+        aim: Vector,
+        now: float,
+        actors: Union[Sequence[Actor], SpatialGrid],
+        apply: bool = True,
+    ) -> HitscanResult:
+        """Fire ``weapon`` from ``shooter`` along ``aim``, honouring its fire rate."""
+        if not weapon.ready(now):
+            return HitscanResult(False)
+        weapon.mark_fired(now)
+        directions = self.roll_directions(weapon, aim)
+        candidates = self.broadphase(shooter.position, aim, weapon.max_range, actors, exclude=shooter)
+        centers = np.array([actor.position for actor in candidates], dtype=np.float64).reshape(-1, 3)
+        return self.resolve(weapon, shooter.position, directions, candidates, centers, apply)
+
+    def resolve(
+        self,
+        weapon: HitscanWeapon,
+        origin: Vector,
+        directions: np.ndarray,
+        candidates: Sequence[Actor],
+        centers: np.ndarray,
+        apply: bool = True,
+    ) -> HitscanResult:
+        """Resolve already-rolled rays against ``candidates`` located at ``centers``."""
+        distances, targets = self.cast(origin, directions, centers, weapon.max_range)
+        result = HitscanResult(True)
+        victims: Dict[int, VictimDamage] = {}
+        origin_array = np.asarray(origin, dtype=np.float64)
+        for pellet in np.flatnonzero(targets >= 0).tolist():
+            actor = candidates[int(targets[pellet])]
+            distance = float(distances[pellet])
+            damage = weapon.calculate_damage(distance)
+            point = tuple((origin_array + directions[pellet] * distance).tolist())
+            result.hits.append(RayHit(pellet, actor, distance, point, damage))
+            victim = victims.get(id(actor))
+            if victim is None:
+                victim = victims[id(actor)] = VictimDamage(actor, 0.0, 0)
+            victim.damage += damage
+            victim.hits += 1
+        result.victims = list(victims.values())
+        if apply:
+            for victim in result.victims:
+                victim.report = victim.actor.take_damage(victim.damage)
+        return result
+
+    def cast(
+        self, origin: Vector, directions: np.ndarray, centers: np.ndarray, max_range: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Distance along each unit ray to the first sphere it enters, and that sphere's index (-1 on a miss)."""
+        rays = len(directions)
+        if not len(centers):
+            return np.full(rays, np.inf), np.full(rays, -1)
+        offset = np.asarray(origin, dtype=np.float64) - centers
+        b = directions @ offset.T
+        c = np.einsum("ai,ai->a", offset, offset) - self.actor_radius**2
+        disc = b * b - c
+        entry = -b - np.sqrt(np.maximum(disc, 0.0))
+        # Spheres containing the origin are hit at distance 0; otherwise the ray must enter in front of it.
+        entry = np.where(c <= 0, 0.0, entry)
+        valid = (disc >= 0) & (entry >= 0) & (entry <= max_range)
+        entry = np.where(valid, entry, np.inf)
+        nearest = np.argmin(entry, axis=1)
+        distance = entry[np.arange(rays), nearest]
+        return distance, np.where(np.isfinite(distance), nearest, -1)
+
+    def broadphase(
+        self,
+        origin: Vector,
+        aim: Vector,
+        max_range: float,
+        actors: Union[Iterable[Actor], SpatialGrid],
+        exclude: Optional[Actor] = None,
+    ) -> List[Actor]:
+        """Actors whose sphere is within range and not entirely behind the shooter."""
+        reach = max_range + self.actor_radius
+        if isinstance(actors, SpatialGrid):
+            actors = actors.query_radius(origin, reach)
+        forward = normalize(aim)
+        candidates = []
+        for actor in actors:
+            if actor is exclude:
+                continue
+            dx = actor.position[0] - origin[0]
+            dy = actor.position[1] - origin[1]
+            dz = actor.position[2] - origin[2]
+            if dx * forward[0] + dy * forward[1] + dz * forward[2] < -self.actor_radius:
+                continue
+            if dx * dx + dy * dy + dz * dz > reach * reach:
+                continue
+            candidates.append(actor)
+        return candidates
+
+    def roll_directions(self, weapon: HitscanWeapon, aim: Vector) -> np.ndarray:
+        """One spread-deflected unit ray per pellet (a single ray for non-shotguns)."""
+        spreads = [weapon.roll_spread() for _ in range(getattr(weapon, "pellet_count", 1))]
+        return self.pellet_directions(aim, spreads)
+
+    def pellet_directions(self, aim: Vector, spreads: Sequence[Vector]) -> np.ndarray:
+        """Unit ray per ``(pitch, yaw, roll)`` spread offset (radians) around ``aim``."""
+        forward = np.asarray(normalize(aim), dtype=np.float64)
+        up = np.asarray(self.up, dtype=np.float64)
+        if abs(float(forward @ up)) > 0.999:
+            up = np.array([1.0, 0.0, 0.0]) if abs(forward[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+        right = np.cross(forward, up)
+        right /= np.linalg.norm(right)
+        local_up = np.cross(right, forward)
+        offsets = np.array([(float(pitch), float(yaw)) for pitch, yaw, _ in spreads], dtype=np.float64).reshape(-1, 2)
+        directions = (
+            forward[None, :]
+            + np.tan(offsets[:, 1])[:, None] * right[None, :]
+            + np.tan(offsets[:, 0])[:, None] * local_up[None, :]
+        )
+        return directions / np.linalg.norm(directions, axis=1)[:, None]
+
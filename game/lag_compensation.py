@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .hitscan import HitscanResolver, HitscanResult
+from .math_utils import Vector, normalize
+from .weapons import Actor, HitscanWeapon
+
+
+class PositionHistory:
+    """Per-actor position history in a fixed-size ring buffer.
+
+    Every :meth:`record` writes one row of a preallocated ``(capacity, max_actors, 3)``
+    array, overwriting the oldest tick once the buffer is full, so memory is fixed when
+    the history is built and recording never allocates. Each tracked actor owns a
+    column for as long as it is tracked. :meth:`sample` interpolates every actor's
+    position at a past time into a reused scratch buffer.
+    """
+
+    def __init__(self, capacity: int, max_actors: int) -> None:
+        if capacity < 2:
+            raise ValueError("capacity must hold at least two ticks")
+        if max_actors <= 0:
+            raise ValueError("max_actors must be positive")
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.positions = np.zeros((capacity, max_actors, 3), dtype=np.float64)
+        self.present = np.zeros((capacity, max_actors), dtype=bool)
+        self.actors: List[Optional[Actor]] = [None] * max_actors
+        self._columns: Dict[int, int] = {}
+        self._free: List[int] = list(range(max_actors - 1, -1, -1))
+        self._head = 0
+        self._count = 0
+        self._sampled = np.zeros((max_actors, 3), dtype=np.float64)
+        self._sampled_present = np.zeros(max_actors, dtype=bool)
+
+    @classmethod
+    def for_window(cls, tick_rate: float, window: float, max_actors: int) -> "PositionHistory":
+        """A history long enough to rewind ``window`` seconds at ``tick_rate`` recordings per second."""
+        return cls(math.ceil(window * tick_rate) + 2, max_actors)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return len(self.times)
+
+    @property
+    def oldest(self) -> Optional[float]:
+        return float(self.times[self._row(0)]) if self._count else None
+
+    @property
+    def newest(self) -> Optional[float]:
+        return float(self.times[self._row(self._count - 1)]) if self._count else None
+
+    def column_of(self, actor: Actor) -> Optional[int]:
+        return self._columns.get(id(actor))
+
+    def track(self, actor: Actor) -> int:
+        key = id(actor)
+        if key in self._columns:
+            raise ValueError(f"actor {actor.name!r} is already tracked")
+        if not self._free:
+            raise ValueError("position history is full")
+        column = self._free.pop()
+        self._columns[key] = column
+        self.actors[column] = actor
+        return column
+
+    def untrack(self, actor: Actor) -> None:
+        column = self._columns.pop(id(actor), None)
+        if column is None:
+            return
+        self.actors[column] = None
+        self.present[:, column] = False
+        self._free.append(column)
+
+    def record(self, now: float) -> None:
+        """Store every tracked actor's current position as the newest tick."""
+        if self._count and now < self.times[self._row(self._count - 1)]:
+            raise ValueError("history must be recorded in time order")
+        row = self._head
+        self.times[row] = now
+        present = self.present[row]
+        positions = self.positions[row]
+        present[:] = False
+        for column, actor in enumerate(self.actors):
+            if actor is not None:
+                positions[column] = actor.position
+                present[column] = True
+        self._head = (row + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def sample(self, time: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of every column at ``time`` and which columns had an actor then.
+
+        Times outside the recorded span clamp to the oldest or newest tick. The returned
+        arrays are scratch buffers overwritten by the next call.
+        """
+        if not self._count:
+            raise ValueError("no positions recorded yet")
+        before, after, alpha = self._bracket(time)
+        out = self._sampled
+        present = self._sampled_present
+        np.subtract(self.positions[after], self.positions[before], out=out)
+        out *= alpha
+        out += self.positions[before]
+        # An actor tracked or untracked between the two ticks snaps to the tick it was present in.
+        only_before = self.present[before] & ~self.present[after]
+        only_after = self.present[after] & ~self.present[before]
+        out[only_before] = self.positions[before][only_before]
+        out[only_after] = self.positions[after][only_after]
+        np.logical_or(self.present[before], self.present[after], out=present)
+        return out, present
+
+    def _bracket(self, time: float) -> Tuple[int, int, float]:
+        """Rows of the ticks around ``time`` and the interpolation weight between them."""
+        low, high = 0, self._count - 1
+        if time <= self.times[self._row(low)]:
+            return self._row(low), self._row(low), 0.0
+        if time >= self.times[self._row(high)]:
+            return self._row(high), self._row(high), 0.0
+        # Binary search over the ring: O(log capacity) however long the match has run.
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.times[self._row(middle)] <= time:
+                low = middle
+            else:
+                high = middle
+        before, after = self._row(low), self._row(high)
+        span = self.times[after] - self.times[before]
+        alpha = float((time - self.times[before]) / span) if span > 0 else 0.0
+        return before, after, alpha
+
+    def _row(self, index: int) -> int:
+        return (self._head - self._count + index) % self.capacity
+
+
+class LagCompensator:
+    """Evaluates hitscan shots against where actors were on the shooter's screen.
+
+    The shot is cast from the shooter's current position against every other tracked
+    actor's position interpolated at the shooter's client timestamp, clamped to at most
+    ``max_rewind`` seconds in the past. Hits, damage and reports come from the
+    :class:`HitscanResolver` exactly as for an unrewound shot and land on the actors'
+    present health. Requires NumPy.
+    """
+
+    def __init__(
+        self, history: PositionHistory, resolver: Optional[HitscanResolver] = None, max_rewind: float = 0.2
+    ) -> None:
+        if max_rewind < 0:
+            raise ValueError("max_rewind must be non-negative")
+        self.history = history
+        self.resolver = resolver or HitscanResolver()
+        self.max_rewind = max_rewind
+
+    def rewind_time(self, now: float, client_time: float) -> float:
+        """``client_time`` clamped to ``[now - max_rewind, now]``."""
+        return min(now, max(now - self.max_rewind, client_time))
+
+    def fire(
+        self,
+        weapon: HitscanWeapon,
+        shooter: Actor,
+        aim: Vector,
+        now: float,
+        client_time: float,
+        apply: bool = True,
+    ) -> HitscanResult:
+        """Fire ``weapon`` as the shooter saw the world at ``client_time``, honouring its fire rate."""
+        if not weapon.ready(now):
+            return HitscanResult(False)
+        weapon.mark_fired(now)
+        directions = self.resolver.roll_directions(weapon, aim)
+        centers, present = self.history.sample(self.rewind_time(now, client_time))
+        shooter_column = self.history.column_of(shooter)
+        if shooter_column is not None:
+            present[shooter_column] = False
+
+        # Same broadphase as HitscanResolver.broadphase, on the rewound positions.
+        origin = np.asarray(shooter.position, dtype=np.float64)
+        offsets = centers - origin
+        reach = weapon.max_range + self.resolver.actor_radius
+        in_range = np.einsum("ai,ai->a", offsets, offsets) <= reach * reach
+        in_front = offsets @ np.asarray(normalize(aim), dtype=np.float64) >= -self.resolver.actor_radius
+        columns = np.flatnonzero(present & in_range & in_front)
+
+        candidates = [self.history.actors[column] for column in columns.tolist()]
+        return self.resolver.resolve(
+            weapon, shooter.position, directions, candidates, centers[columns], apply  # type: ignore[arg-type]
+        )
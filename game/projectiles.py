@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .explosions import resolve_explosions
+from .math_utils import Vector, normalize, scale
+from .weapons import Actor, ExplosionResult, RocketLauncher, RocketProjectile
+
+
+@dataclass
+class Impact:
+    slot: int
+    position: Vector
+    actor: Optional[Actor]
+    explosion: ExplosionResult
+
+
+class ProjectileManager:
+    """Simulates every rocket in flight with continuous collision detection.
+
+    Positions and velocities live in contiguous arrays indexed by slot. Each
+    :meth:`step` sweeps every projectile's sphere along its path for the tick against
+    every actor's sphere and against the arena box, so fast rockets cannot tunnel
+    through thin targets. Rockets that hit something explode at the point of impact
+    (in impact order, via :func:`game.explosions.resolve_explosions`) and their slot,
+    including its :class:`RocketProjectile`, is reused by the next launch.
+    Requires NumPy.
+    """
+
+    def __init__(
+        self,
+        arena_min: Vector,
+        arena_max: Vector,
+        capacity: int = 64,
+        projectile_radius: float = 0.25,
+        actor_radius: float = 0.5,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.arena_min = np.asarray(arena_min, dtype=np.float64) + projectile_radius
+        self.arena_max = np.asarray(arena_max, dtype=np.float64) - projectile_radius
+        if np.any(self.arena_min > self.arena_max):
+            raise ValueError("arena is smaller than a projectile")
+        self.projectile_radius = projectile_radius
+        self.actor_radius = actor_radius
+        self.active = np.zeros(capacity, dtype=bool)
+        self.positions = np.zeros((capacity, 3), dtype=np.float64)
+        self.velocities = np.zeros((capacity, 3), dtype=np.float64)
+        self._rockets: List[Optional[RocketProjectile]] = [None] * capacity
+        self._owners: List[Optional[Actor]] = [None] * capacity
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return int(self.active.sum())
+
+    @property
+    def capacity(self) -> int:
+        return len(self._rockets)
+
+    def rocket(self, slot: int) -> RocketProjectile:
+        """The slot's projectile with its position synced from the arrays."""
+        rocket = self._rockets[slot]
+        if rocket is None or not self.active[slot]:
+            raise KeyError(f"slot {slot} is not in flight")
+        rocket.position = tuple(self.positions[slot].tolist())
+        rocket.velocity = tuple(self.velocities[slot].tolist())
+        return rocket
+
+    def spawn(self, rocket: RocketProjectile, owner: Optional[Actor] = None) -> int:
+        """Put a copy of ``rocket`` in flight; ``owner`` is never hit by its own rocket's sweep."""
+        return self._launch(rocket, rocket.position, rocket.velocity, owner)
+
+    def fire(self, launcher: RocketLauncher, owner: Actor, direction: Vector, now: float) -> Optional[int]:
+        """Fire ``launcher`` from ``owner``'s position without allocating a projectile; None while cooling down."""
+        if not launcher.ready(now):
+            return None
+        launcher.mark_fired(now)
+        return self._launch(launcher, owner.position, scale(normalize(direction), launcher.speed), owner)
+
+    def remove(self, slot: int) -> None:
+        if not self.active[slot]:
+            return
+        self.active[slot] = False
+        self._owners[slot] = None
+        self._free.append(slot)
+
+    def step(self, delta_time: float, actors: Sequence[Actor]) -> List[Impact]:
+        """Advance every projectile by ``delta_time`` and explode the ones that hit an actor or a wall."""
+        slots = np.flatnonzero(self.active)
+        if not len(slots):
+            return []
+        start = self.positions[slots]
+        travel = self.velocities[slots] * delta_time
+
+        hit_time, hit_actor = self._sweep_actors(slots, start, travel, actors)
+        wall_time = self._sweep_bounds(start, travel)
+        hits_wall = wall_time < hit_time
+        impact_time = np.where(hits_wall, wall_time, hit_time)
+        impacting = impact_time <= 1.0
+
+        moving = slots[~impacting]
+        self.positions[moving] += travel[~impacting]
+        if not impacting.any():
+            return []
+
+        # Explode in the order the impacts happened within the tick.
+        order = np.flatnonzero(impacting)
+        order = order[np.argsort(impact_time[order], kind="stable")]
+        points = start[order] + travel[order] * impact_time[order, None]
+        rockets = []
+        for slot, point in zip(slots[order].tolist(), points.tolist()):
+            rocket = self._rockets[slot]
+            assert rocket is not None
+            rocket.position = tuple(point)
+            rocket.velocity = tuple(self.velocities[slot].tolist())
+            rockets.append(rocket)
+        explosions = resolve_explosions(rockets, actors)
+
+        impacts = []
+        for index, slot, explosion in zip(order.tolist(), slots[order].tolist(), explosions):
+            actor = None if hits_wall[index] else actors[int(hit_actor[index])]
+            impacts.append(Impact(slot, self._rockets[slot].position, actor, explosion))  # type: ignore[union-attr]
+            self.remove(slot)
+        return impacts
+
+    def _sweep_actors(
+        self, slots: np.ndarray, start: np.ndarray, travel: np.ndarray, actors: Sequence[Actor]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Earliest time in [0, 1] each swept projectile sphere touches an actor sphere (inf if none)."""
+        count = len(slots)
+        if not actors:
+            return np.full(count, np.inf), np.full(count, -1)
+        centers = np.array([actor.position for actor in actors], dtype=np.float64)
+        reach = (self.projectile_radius + self.actor_radius) ** 2
+        # Solve |start + t * travel - center|^2 = reach for the smaller root t.
+        offset = start[:, None, :] - centers[None, :, :]
+        a = np.einsum("pi,pi->p", travel, travel)[:, None]
+        b = np.einsum("pai,pi->pa", offset, travel)
+        c = np.einsum("pai,pai->pa", offset, offset) - reach
+        disc = b * b - a * c
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(a > 0, (-b - np.sqrt(np.maximum(disc, 0.0))) / a, np.inf)
+        t = np.where(c <= 0, 0.0, np.where((disc >= 0) & (t >= 0), t, np.inf))
+
+        column: Dict[int, int] = {id(actor): index for index, actor in enumerate(actors)}
+        for row, slot in enumerate(slots.tolist()):
+            owner = self._owners[slot]
+            if owner is not None and id(owner) in column:
+                t[row, column[id(owner)]] = np.inf
+        nearest = np.argmin(t, axis=1)
+        return t[np.arange(count), nearest], nearest
+
+    def _sweep_bounds(self, start: np.ndarray, travel: np.ndarray) -> np.ndarray:
+        """Earliest time in [0, 1] each projectile sphere reaches an arena wall (inf if it stays inside)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            to_max = np.where(travel > 0, (self.arena_max - start) / travel, np.inf)
+            to_min = np.where(travel < 0, (self.arena_min - start) / travel, np.inf)
+        exit_time = np.minimum(to_max, to_min).min(axis=1)
+        outside = np.any((start < self.arena_min) | (start > self.arena_max), axis=1)
+        exit_time = np.where(outside, 0.0, np.maximum(exit_time, 0.0))
+        return np.where(exit_time <= 1.0, exit_time, np.inf)
+
+    def _launch(
+        self,
+        source: Union[RocketProjectile, RocketLauncher],
+        position: Vector,
+        velocity: Vector,
+        owner: Optional[Actor],
+    ) -> int:
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        pooled = self._rockets[slot]
+        if pooled is None:
+            pooled = self._rockets[slot] = RocketProjectile(0.0, 0.0, position, velocity, 0.0, 0.0)
+        pooled.damage = source.damage
+        pooled.splash_radius = source.splash_radius
+        pooled.self_damage_scale = source.self_damage_scale
+        pooled.knockback_force = source.knockback_force
+        self.active[slot] = True
+        self.positions[slot] = position
+        self.velocities[slot] = velocity
+        self._owners[slot] = owner
+        return slot
+
+    def _grow(self) -> None:
+        old = self.capacity
+        self._rockets.extend([None] * old)
+        self._owners.extend([None] * old)
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+        self.active = np.concatenate([self.active, np.zeros(old, dtype=bool)])
+        self.positions = np.concatenate([self.positions, np.zeros((old, 3))])
+        self.velocities = np.concatenate([self.velocities, np.zeros((old, 3))])
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+from .math_utils import Vector
+
+if TYPE_CHECKING:
+    from .weapons import Actor
+
+Cell = Tuple[int, int, int]
+
+
+class SpatialGrid:
+    """Uniform grid over actor positions for radius queries.
+
+    Actors are bucketed by the cell containing their position. Moving an actor only
+    touches the grid when it crosses into another cell, and a radius query visits the
+    cells overlapping the query sphere's bounding box instead of every actor. Results
+    come back in insertion order, so a grid built from an actor list answers exactly
+    like a scan over that list.
+    """
+
+    def __init__(self, cell_size: float = 8.0, actors: Iterable[Actor] = ()) -> None:
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Dict[int, Actor]] = {}
+        self._actor_cells: Dict[int, Cell] = {}
+        self._order: Dict[int, int] = {}
+        self._next_order = 0
+        for actor in actors:
+            self.insert(actor)
+
+    def __len__(self) -> int:
+        return len(self._actor_cells)
+
+    def __contains__(self, actor: object) -> bool:
+        return id(actor) in self._actor_cells
+
+    def __iter__(self) -> Iterator[Actor]:
+        actors = [actor for cell in self._cells.values() for actor in cell.values()]
+        return iter(sorted(actors, key=lambda actor: self._order[id(actor)]))
+
+    def cell_of(self, position: Vector) -> Cell:
+        size = self.cell_size
+        return (math.floor(position[0] / size), math.floor(position[1] / size), math.floor(position[2] / size))
+
+    def insert(self, actor: Actor) -> None:
+        key = id(actor)
+        if key in self._actor_cells:
+            raise ValueError(f"actor {actor.name!r} is already indexed")
+        cell = self.cell_of(actor.position)
+        self._cells.setdefault(cell, {})[key] = actor
+        self._actor_cells[key] = cell
+        self._order[key] = self._next_order
+        self._next_order += 1
+
+    def remove(self, actor: Actor) -> None:
+        key = id(actor)
+        cell = self._actor_cells.pop(key, None)
+        if cell is None:
+            return
+        del self._order[key]
+        self._discard(cell, key)
+
+    def update(self, actor: Actor) -> None:
+        """Re-bucket ``actor`` after its position changed; O(1) and a no-op within the same cell."""
+        key = id(actor)
+        old = self._actor_cells[key]
+        new = self.cell_of(actor.position)
+        if new == old:
+            return
+        self._discard(old, key)
+        self._cells.setdefault(new, {})[key] = actor
+        self._actor_cells[key] = new
+
+    def move(self, actor: Actor, position: Vector) -> None:
+        actor.position = position
+        self.update(actor)
+
+    def query_radius(self, center: Vector, radius: float) -> List[Actor]:
+        """Actors within ``radius`` of ``center`` (inclusive), in insertion order."""
+        found: List[Actor] = []
+        for actor in self._candidates(center, radius):
+            if math.dist(center, actor.position) <= radius:
+                found.append(actor)
+        order = self._order
+        found.sort(key=lambda actor: order[id(actor)])
+        return found
+
+    def _candidates(self, center: Vector, radius: float) -> Iterator[Actor]:
+        low = self.cell_of((center[0] - radius, center[1] - radius, center[2] - radius))
+        high = self.cell_of((center[0] + radius, center[1] + radius, center[2] + radius))
+        span = (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * (high[2] - low[2] + 1)
+        cells = self._cells
+        if span >= len(cells):
+            # Huge radius or sparse grid: walking the occupied cells is cheaper than the empty ones.
+            for (x, y, z), bucket in cells.items():
+                if low[0] <= x <= high[0] and low[1] <= y <= high[1] and low[2] <= z <= high[2]:
+                    yield from bucket.values()
+            return
+        for x in range(low[0], high[0] + 1):
+            for y in range(low[1], high[1] + 1):
+                for z in range(low[2], high[2] + 1):
+                    bucket = cells.get((x, y, z))
+                    if bucket:
+                        yield from bucket.values()
+
+    def _discard(self, cell: Cell, key: int) -> None:
+        bucket = self._cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self._cells[cell]
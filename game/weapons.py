@@ -3,10 +3,11 @@ from __future__ import annotations
 import math
 import random
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterable, List, Optional, Union
 
 from .health import DamageReport, HealthArmor
 from .math_utils import Vector, add, distance, normalize, scale
+from .spatial import SpatialGrid
 
 
 class ComparableFloat(float):
@@ -182,7 +183,10 @@ class RocketProjectile:
         displacement = scale(self.velocity, delta_time)
         self.position = add(self.position, displacement)
 
-    def explode(self, actors: List[Actor]) -> ExplosionResult:
+    def explode(self, actors: Union[Iterable[Actor], SpatialGrid]) -> ExplosionResult:
+        """Apply splash damage and knockback; pass a :class:`SpatialGrid` to skip actors outside the radius."""
+        if isinstance(actors, SpatialGrid):
+            actors = actors.query_radius(self.position, self.splash_radius)
         reports: List[DamageReport] = []
         for actor in actors:
             dist = distance(self.position, actor.position)
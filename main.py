@@ -6,7 +6,9 @@ import threading
 from server.config import ServerConfig
 from server.game_server import GameServer
 from server.matchmaking import MatchmakingBackend
-from server.metrics import Metrics
+from server.metrics import Metrics, MetricsExporter
+from server.supervisor import WorkerSupervisor
+from shizgiggles.net import LOOP_CHOICES, install_event_loop
 
 
 def parse_args() -> argparse.Namespace:
@@ -17,25 +19,59 @@ def parse_args() -> argparse.Namespace:
     server_parser.add_argument("--host", default="0.0.0.0", help="Bind address for the server")
     server_parser.add_argument("--port", type=int, default=7777, help="Port for the server")
     server_parser.add_argument("--maps", nargs="+", default=["arena", "ascent", "sewers"], help="Map rotation list")
+    server_parser.add_argument(
+        "--map-rotation-seconds", type=int, default=180, help="Seconds between automatic map rotations"
+    )
     server_parser.add_argument("--player-limit", type=int, default=16, help="Maximum number of players")
     server_parser.add_argument("--tick-rate", type=int, default=30, help="Server tick rate in Hz")
+    server_parser.add_argument(
+        "--max-catchup-ticks", type=int, default=3, help="Late ticks to run back to back before skipping"
+    )
     server_parser.add_argument("--password", help="Optional server password")
     server_parser.add_argument("--region", default="global", help="Region identifier for matchmaking")
     server_parser.add_argument("--matchmaking-endpoint", help="URL of the matchmaking backend to register with")
     server_parser.add_argument("--matchmaking-api-key", help="Optional API key for the matchmaking backend")
     server_parser.add_argument("--metrics-interval", type=int, default=30, help="How often to log metrics (seconds)")
+    server_parser.add_argument("--metrics-host", default="127.0.0.1", help="Bind address for the /metrics endpoint")
+    server_parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
     server_parser.add_argument("--rate-limit", type=int, default=10, help="Messages per second per client")
+    server_parser.add_argument(
+        "--max-connections-per-ip",
+        type=int,
+        default=64,
+        help="Concurrent connections per client IP; players behind one NAT share an IP (0 = unlimited, loopback exempt)",
+    )
+    server_parser.add_argument("--join-rate", type=int, default=20, help="Connections admitted per second")
+    server_parser.add_argument("--join-burst", type=int, default=40, help="Burst of connections admitted at once")
     server_parser.add_argument("--max-message-size", type=int, default=4096, help="Maximum message size in bytes")
+    server_parser.add_argument(
+        "--loop", choices=LOOP_CHOICES, default="auto", help="Event loop implementation (auto prefers uvloop)"
+    )
+    server_parser.add_argument("--no-nodelay", action="store_true", help="Leave Nagle's algorithm enabled")
+    server_parser.add_argument("--send-buffer", type=int, help="SO_SNDBUF size in bytes (default: kernel default)")
+    server_parser.add_argument("--recv-buffer", type=int, help="SO_RCVBUF size in bytes (default: kernel default)")
+    server_parser.add_argument("--reuse-port", action="store_true", help="Bind the game port with SO_REUSEPORT")
+    server_parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes, each running its own server (default: 1)"
+    )
+    server_parser.add_argument(
+        "--shared-port",
+        action="store_true",
+        help="Workers share --port via SO_REUSEPORT instead of using consecutive ports",
+    )
 
     backend_parser = subparsers.add_parser("matchmaking-backend", help="Run the matchmaking backend server list")
     backend_parser.add_argument("--host", default="0.0.0.0", help="Bind address for the matchmaking backend")
     backend_parser.add_argument("--port", type=int, default=8080, help="Port for the matchmaking backend")
+    backend_parser.add_argument(
+        "--max-connections", type=int, default=1024, help="Concurrent client connections before answering 503"
+    )
 
     return parser.parse_args()
 
 
-def run_matchmaking_backend(host: str, port: int):
-    backend = MatchmakingBackend(host=host, port=port)
+def run_matchmaking_backend(host: str, port: int, max_connections: int):
+    backend = MatchmakingBackend(host=host, port=port, max_connections=max_connections)
     backend.start()
     try:
         threading.Event().wait()
@@ -43,28 +79,49 @@ def run_matchmaking_backend(host: str, port: int):
         backend.stop()
 
 
-async def run_server(args: argparse.Namespace):
-    metrics = Metrics()
-    config = ServerConfig(
+def build_config(args: argparse.Namespace) -> ServerConfig:
+    return ServerConfig(
         host=args.host,
         port=args.port,
         maps=args.maps,
+        map_rotation_seconds=args.map_rotation_seconds,
         player_limit=args.player_limit,
         tick_rate=args.tick_rate,
+        max_catchup_ticks=args.max_catchup_ticks,
         password=args.password,
         region=args.region,
         matchmaking_endpoint=args.matchmaking_endpoint,
         matchmaking_api_key=args.matchmaking_api_key,
         metrics_interval_seconds=args.metrics_interval,
+        metrics_host=args.metrics_host,
+        metrics_port=args.metrics_port,
         rate_limit_per_second=args.rate_limit,
         max_message_size=args.max_message_size,
+        max_connections_per_ip=args.max_connections_per_ip,
+        join_rate_per_second=args.join_rate,
+        join_burst=args.join_burst,
+        event_loop=args.loop,
+        tcp_nodelay=not args.no_nodelay,
+        socket_send_buffer=args.send_buffer,
+        socket_recv_buffer=args.recv_buffer,
+        reuse_port=args.reuse_port,
+        workers=args.workers,
+        shared_port=args.shared_port,
     )
+
+
+async def run_server(config: ServerConfig):
+    metrics = Metrics()
     server = GameServer(config=config, metrics=metrics)
     metrics_stop_event = threading.Event()
     metrics_thread = threading.Thread(
         target=metrics.log_periodically, args=(config.metrics_interval_seconds, metrics_stop_event), daemon=True
     )
     metrics_thread.start()
+    exporter = None
+    if config.metrics_port is not None:
+        exporter = MetricsExporter(metrics, host=config.metrics_host, port=config.metrics_port)
+        exporter.start()
 
     await server.start()
     try:
@@ -73,15 +130,47 @@ async def run_server(args: argparse.Namespace):
         await server.stop()
         metrics_stop_event.set()
         metrics_thread.join()
+        if exporter:
+            exporter.stop()
+
+
+def run_supervisor(config: ServerConfig):
+    supervisor = WorkerSupervisor(config)
+    metrics_stop_event = threading.Event()
+    metrics_thread = threading.Thread(
+        target=supervisor.metrics.log_periodically,
+        args=(config.metrics_interval_seconds, metrics_stop_event),
+        daemon=True,
+    )
+    metrics_thread.start()
+    exporter = None
+    if config.metrics_port is not None:
+        exporter = MetricsExporter(supervisor.metrics, host=config.metrics_host, port=config.metrics_port)
+        exporter.start()
+
+    supervisor.start()
+    try:
+        supervisor.run_forever()
+    except KeyboardInterrupt:
+        supervisor.stop()
+        metrics_stop_event.set()
+        metrics_thread.join()
+        if exporter:
+            exporter.stop()
 
 
 def main():
     logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s: %(message)s")
     args = parse_args()
     if args.command == "matchmaking-backend":
-        run_matchmaking_backend(args.host, args.port)
+        run_matchmaking_backend(args.host, args.port, args.max_connections)
     elif args.command == "server":
-        asyncio.run(run_server(args))
+        config = build_config(args)
+        if config.workers > 1:
+            run_supervisor(config)
+            return
+        logging.info("using the %s event loop", install_event_loop(config.event_loop))
+        asyncio.run(run_server(config))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+from typing import Callable, Dict
+
+from shizgiggles.codec import BinaryCodec
+from shizgiggles.protocol import Message
+
+
+def _sample_messages(codec: BinaryCodec, players: int) -> Dict[str, Message]:
+    for idx in range(players):
+        codec.intern(f"bot-{idx:03d}")
+    state = {
+        f"bot-{idx:03d}": {"position": (float(idx), -float(idx)), "health": 100 - idx % 50, "ammo": 30}
+        for idx in range(players)
+    }
+    return {
+        "move": Message.move("bot-000", (1.0, -0.5)),
+        "fire": Message.fire("bot-000"),
+        "ping": Message.ping("bot-000"),
+        "snapshot": Message.snapshot(1234, state),
+    }
+
+
+def _rate(fn: Callable[[], object], number: int) -> float:
+    return number / min(timeit.repeat(fn, number=number, repeat=3))
+
+
+def run_benchmark(players: int = 16, number: int = 20000) -> Dict[str, Dict[str, float]]:
+    codec = BinaryCodec(authoritative=True)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, message in _sample_messages(codec, players).items():
+        count = max(1, number // players) if name == "snapshot" else number
+        text = message.to_json()
+        frame = codec.encode(message)
+        json_encode = _rate(message.to_json, count)
+        json_decode = _rate(lambda: Message.from_json(text), count)
+        binary_encode = _rate(lambda: codec.encode(message), count)
+        binary_decode = _rate(lambda: codec.decode(frame[2:]), count)
+        results[name] = {
+            "json_bytes": len(text) + 1,
+            "binary_bytes": len(frame),
+            "json_encode_per_sec": json_encode,
+            "binary_encode_per_sec": binary_encode,
+            "json_decode_per_sec": json_decode,
+            "binary_decode_per_sec": binary_decode,
+            "encode_speedup": binary_encode / json_encode,
+            "decode_speedup": binary_decode / json_decode,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare JSON and binary Message codec throughput")
+    parser.add_argument("--players", type=int, default=16, help="Players in the sample snapshot")
+    parser.add_argument("--number", type=int, default=20000, help="Iterations per measurement")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.players, args.number), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib import parse
+
+from server.matchmaking import MatchmakingBackend, ServerAnnouncement, ServerList
+
+BACKENDS = ("threaded", "asyncio")
+
+
+class _ThreadedBackend:
+    """The previous MatchmakingBackend: ThreadingHTTPServer with one thread per connection."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.server_list = ServerList()
+        server_list = self.server_list
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, code: int, body: bytes, etag: str | None = None) -> None:
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                raw = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+                self._send(*server_list.register(raw))
+
+            def do_GET(self) -> None:
+                url = parse.urlsplit(self.path)
+                self._send(*server_list.servers(url.query, self.headers.get("If-None-Match")))
+
+            def log_message(self, format: str, *args) -> None:  # noqa: A003
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self._httpd.server_address[1]
+
+    def start(self) -> None:
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def _serve(kind: str, servers: int, ports: multiprocessing.Queue, stop: threading.Event) -> None:
+    backend = _ThreadedBackend("127.0.0.1", 0) if kind == "threaded" else MatchmakingBackend("127.0.0.1", 0)
+    now = time.time()
+    for index in range(servers):
+        backend.server_list.registry.register(
+            ServerAnnouncement(f"10.0.{index // 250}.{index % 250}", 7000, "eu", 16, "arena", 30, now, index % 17)
+        )
+    backend.start()
+    ports.put(backend.port)
+    stop.wait()
+    backend.stop()
+
+
+async def _read_response(reader: asyncio.StreamReader) -> None:
+    await reader.readline()
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    await reader.readexactly(length)
+
+
+async def _connection(
+    port: int, start: asyncio.Event, deadline: list, pipeline: int, register_every: int, ready: list
+) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    ready.append(writer)
+    await start.wait()
+    registration = json.dumps({"address": "10.9.9.9", "port": 7000, "region": "eu", "max_players": 16}).encode()
+    register = b"POST /register HTTP/1.1\r\nHost: bench\r\nContent-Length: %d\r\n\r\n%s" % (
+        len(registration),
+        registration,
+    )
+    poll = b"GET /servers?region=eu&has_slots=1&limit=50 HTTP/1.1\r\nHost: bench\r\n\r\n"
+    completed = 0
+    while time.perf_counter() < deadline[0]:
+        batch = [register if (completed + i) % register_every == 0 else poll for i in range(pipeline)]
+        writer.write(b"".join(batch))
+        for _ in batch:
+            await _read_response(reader)
+        completed += len(batch)
+    writer.close()
+    return completed
+
+
+async def _load(port: int, connections: int, duration: float, pipeline: int, register_every: int) -> Dict[str, float]:
+    # Connect everything first so the timed window measures steady-state keep-alive throughput only.
+    start = asyncio.Event()
+    deadline = [0.0]
+    ready: list = []
+    tasks = [
+        asyncio.create_task(_connection(port, start, deadline, pipeline, register_every, ready))
+        for _ in range(connections)
+    ]
+    while len(ready) < connections:
+        await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    deadline[0] = started + duration
+    start.set()
+    completed = sum(await asyncio.gather(*tasks))
+    elapsed = time.perf_counter() - started
+    return {"requests": completed, "requests_per_second": completed / elapsed}
+
+
+def run_benchmark(
+    connections: int = 50, duration: float = 5.0, pipeline: int = 1, servers: int = 2000, register_every: int = 10
+) -> Dict[str, Dict[str, float]]:
+    # Each backend runs in its own process so the load generator does not compete with it for the GIL.
+    context = multiprocessing.get_context("spawn")
+    results: Dict[str, Dict[str, float]] = {}
+    for kind in BACKENDS:
+        ports = context.Queue()
+        stop = context.Event()
+        process = context.Process(target=_serve, args=(kind, servers, ports, stop), daemon=True)
+        process.start()
+        try:
+            port = ports.get(timeout=30)
+            results[kind] = asyncio.run(_load(port, connections, duration, pipeline, register_every))
+        finally:
+            stop.set()
+            process.join(timeout=10)
+    results["speedup"] = {
+        "asyncio_vs_threaded": results["asyncio"]["requests_per_second"]
+        / results["threaded"]["requests_per_second"]
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare matchmaking backend throughput (requests/sec)")
+    parser.add_argument("--connections", type=int, default=50, help="Concurrent keep-alive client connections")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of load per backend")
+    parser.add_argument("--pipeline", type=int, default=1, help="Requests written per round trip")
+    parser.add_argument("--servers", type=int, default=2000, help="Servers registered before the run")
+    parser.add_argument("--register-every", type=int, default=10, help="One POST /register per this many requests")
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            run_benchmark(args.connections, args.duration, args.pipeline, args.servers, args.register_every),
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import timeit
+from collections import Counter
+from typing import Callable, Dict
+
+from server.metrics import Metrics
+
+
+class _LockedCounter:
+    """The previous Metrics.increment: one lock round-trip per call."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counter: Counter = Counter()
+
+    def increment(self, key: str, value: int = 1) -> None:
+        with self._lock:
+            self._counter[key] += value
+
+
+def _ns_per_call(fn: Callable[[], object], number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e9
+
+
+def run_benchmark(number: int = 200000) -> Dict[str, float]:
+    locked = _LockedCounter()
+    metrics = Metrics()
+    handle = metrics.counter("messages_handled")
+    metrics.increment("messages_handled")
+    return {
+        "locked_increment_ns": _ns_per_call(lambda: locked.increment("messages_handled"), number),
+        "sharded_increment_ns": _ns_per_call(lambda: metrics.increment("messages_handled"), number),
+        "handle_increment_ns": _ns_per_call(handle.increment, number),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the per-call cost of Metrics counter increments")
+    parser.add_argument("--number", type=int, default=200000, help="Increments per measurement")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.number), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import abc
 import argparse
 import asyncio
+import json
 import logging
-from typing import List
+import statistics
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence
 
-from shizgiggles.client import send_actions
-from shizgiggles.protocol import Message
+from shizgiggles.client import SnapshotDecoder, send_actions
+from shizgiggles.codec import BINARY_CODEC, JSON_CODEC, SUPPORTED_CODECS, BinaryCodec, read_frame
+from shizgiggles.protocol import Message, MessageType
 
 logger = logging.getLogger(__name__)
 
+TARGET_SHIZGIGGLES = "shizgiggles"
+TARGET_GAME_SERVER = "game-server"
+TARGETS = (TARGET_SHIZGIGGLES, TARGET_GAME_SERVER)
+
 
 async def run_fake_client(host: str, port: int, player_id: str) -> None:
     moves = [Message.move(player_id, (1, 0)), Message.move(player_id, (0, 1)), Message.fire(player_id)]
@@ -24,16 +37,417 @@ async def load_test(host: str, port: int, client_count: int) -> None:
     await asyncio.gather(*tasks)
 
 
+@dataclass
+class LoadTestConfig:
+    host: str = "127.0.0.1"
+    port: int = 8765
+    target: str = TARGET_SHIZGIGGLES
+    clients: int = 16
+    duration: float = 10.0
+    ramp_up: float = 0.0
+    input_rate: float = 20.0
+    ping_interval: float = 0.5
+    codec: str = JSON_CODEC
+    delta: bool = False
+    password: Optional[str] = None
+    processes: int = 1
+    # Sharding fields: which slice of the global client range this run owns, and the shared wall-clock start.
+    first_client: int = 0
+    total_clients: int = 0
+    start_at: Optional[float] = None
+
+
+@dataclass
+class ClientStats:
+    connected: int = 0
+    errors: int = 0
+    rejected: int = 0
+    messages_sent: int = 0
+    messages_received: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    rtts: List[float] = field(default_factory=list)
+    snapshot_intervals: List[float] = field(default_factory=list)
+
+    def merge(self, other: "ClientStats") -> None:
+        self.connected += other.connected
+        self.errors += other.errors
+        self.rejected += other.rejected
+        self.messages_sent += other.messages_sent
+        self.messages_received += other.messages_received
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.rtts.extend(other.rtts)
+        self.snapshot_intervals.extend(other.snapshot_intervals)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not values:
+        return 0.0
+    rank = max(1, min(len(values), int(-(-pct * len(values) // 100))))
+    return values[rank - 1]
+
+
+def _distribution_ms(samples: Sequence[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered) * 1000,
+        "p50": percentile(ordered, 50) * 1000,
+        "p95": percentile(ordered, 95) * 1000,
+        "p99": percentile(ordered, 99) * 1000,
+        "max": ordered[-1] * 1000,
+        "stdev": statistics.pstdev(ordered) * 1000,
+    }
+
+
+class _Bot(abc.ABC):
+    def __init__(self, config: LoadTestConfig, player_id: str, stats: ClientStats) -> None:
+        self.config = config
+        self.player_id = player_id
+        self.stats = stats
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+        self._pings: Deque[float] = deque()
+
+    async def run(self, start_delay: float, stop_at: float) -> None:
+        await asyncio.sleep(start_delay)
+        loop = asyncio.get_running_loop()
+        try:
+            self.reader, self.writer = await asyncio.open_connection(self.config.host, self.config.port)
+            if not await self.handshake():
+                self.stats.rejected += 1
+                await self._close()
+                return
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            logger.debug("%s failed to connect: %s", self.player_id, exc)
+            self.stats.errors += 1
+            await self._close()
+            return
+        self.stats.connected += 1
+        receiver = asyncio.create_task(self._receive_loop())
+        input_interval = 1 / self.config.input_rate if self.config.input_rate > 0 else None
+        now = loop.time()
+        next_input = now
+        next_ping = now
+        try:
+            while not receiver.done():
+                now = loop.time()
+                if now >= stop_at:
+                    break
+                if input_interval is not None and now >= next_input:
+                    self.send_input()
+                    next_input += input_interval
+                if now >= next_ping:
+                    self.send_ping()
+                    next_ping += self.config.ping_interval
+                await self.writer.drain()
+                wake = min(next_ping, next_input if input_interval is not None else stop_at, stop_at)
+                await asyncio.sleep(max(0.0, wake - loop.time()))
+        except ConnectionError as exc:
+            logger.debug("%s lost connection: %s", self.player_id, exc)
+            self.stats.errors += 1
+        finally:
+            receiver.cancel()
+            await self._close()
+
+    async def _close(self) -> None:
+        if self.writer is None:
+            return
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    def _write(self, data: bytes) -> None:
+        assert self.writer
+        self.writer.write(data)
+        self.stats.messages_sent += 1
+        self.stats.bytes_sent += len(data)
+
+    def _record_pong(self) -> None:
+        if self._pings:
+            self.stats.rtts.append(time.perf_counter() - self._pings.popleft())
+
+    async def _receive_loop(self) -> None:
+        try:
+            while await self.receive_one():
+                self.stats.messages_received += 1
+        except (ConnectionError, ValueError) as exc:
+            logger.debug("%s receive failed: %s", self.player_id, exc)
+            self.stats.errors += 1
+
+    @abc.abstractmethod
+    async def handshake(self) -> bool:
+        """Join the server; False if it refused the bot."""
+
+    @abc.abstractmethod
+    def send_input(self) -> None:
+        """Queue one input message on the writer."""
+
+    @abc.abstractmethod
+    def send_ping(self) -> None:
+        """Queue one ping and remember when it was sent."""
+
+    @abc.abstractmethod
+    async def receive_one(self) -> bool:
+        """Read and account for one server message; False at EOF."""
+
+
+class ShizgigglesBot(_Bot):
+    """Bot for ``shizgiggles.server``: moves at the input rate and times pings and snapshots."""
+
+    def __init__(self, config: LoadTestConfig, player_id: str, stats: ClientStats) -> None:
+        super().__init__(config, player_id, stats)
+        self.codec: BinaryCodec | None = None
+        self.decoder = SnapshotDecoder()
+        self._last_snapshot: float | None = None
+        self._step = 0
+
+    async def handshake(self) -> bool:
+        assert self.reader
+        codec = self.config.codec if self.config.codec != JSON_CODEC else None
+        join = Message.join(self.player_id, delta_snapshots=self.config.delta, codec=codec)
+        self._write((join.to_json() + "\n").encode())
+        if codec is not None:
+            line = await self.reader.readline()
+            self.stats.bytes_received += len(line)
+            reply = Message.from_json(line.decode())
+            if (reply.payload or {}).get("codec") == BINARY_CODEC:
+                self.codec = BinaryCodec()
+                self.codec.learn(int(reply.payload["index"]), self.player_id)
+        return True
+
+    def _send(self, message: Message) -> None:
+        self._write(self.codec.encode(message) if self.codec else (message.to_json() + "\n").encode())
+
+    def send_input(self) -> None:
+        self._step += 1
+        direction = 1.0 if self._step % 40 < 20 else -1.0
+        self._send(Message.move(self.player_id, (direction, 0.5 * direction)))
+
+    def send_ping(self) -> None:
+        self._pings.append(time.perf_counter())
+        self._send(Message.ping(self.player_id))
+
+    async def receive_one(self) -> bool:
+        assert self.reader
+        if self.codec:
+            frame = await read_frame(self.reader)
+            if frame is None:
+                return False
+            self.stats.bytes_received += len(frame) + 2
+            message = self.codec.decode(frame)
+        else:
+            line = await self.reader.readline()
+            if not line:
+                return False
+            self.stats.bytes_received += len(line)
+            message = Message.from_json(line.decode())
+        if message.type == MessageType.PING:
+            self._record_pong()
+        elif message.type == MessageType.SNAPSHOT:
+            now = time.perf_counter()
+            if self._last_snapshot is not None:
+                self.stats.snapshot_intervals.append(now - self._last_snapshot)
+            self._last_snapshot = now
+            if self.config.delta:
+                seq = self.decoder.apply(message.payload or {})
+                if seq is not None:
+                    self._send(Message.ack(self.player_id, seq))
+        return True
+
+
+class GameServerBot(_Bot):
+    """Bot for ``server.game_server``, which only understands pings, so every input is a timed ping."""
+
+    async def handshake(self) -> bool:
+        assert self.reader
+        join: Dict[str, Any] = {"player_id": self.player_id}
+        if self.config.password:
+            join["password"] = self.config.password
+        self._write(json.dumps(join).encode() + b"\n")
+        line = await self.reader.readline()
+        self.stats.bytes_received += len(line)
+        try:
+            return json.loads(line).get("status") == "ok"
+        except json.JSONDecodeError:
+            return False
+
+    def send_input(self) -> None:
+        self.send_ping()
+
+    def send_ping(self) -> None:
+        self._pings.append(time.perf_counter())
+        self._write(b'{"action":"ping"}\n')
+
+    async def receive_one(self) -> bool:
+        assert self.reader
+        line = await self.reader.readline()
+        if not line:
+            return False
+        self.stats.bytes_received += len(line)
+        if line.startswith(b'{"action":"pong"}'):
+            self._record_pong()
+        elif line.startswith(b"rate limited"):
+            self.stats.rejected += 1
+            if self._pings:
+                self._pings.popleft()
+        return True
+
+
+_BOTS = {TARGET_SHIZGIGGLES: ShizgigglesBot, TARGET_GAME_SERVER: GameServerBot}
+
+
+async def run_clients(config: LoadTestConfig) -> ClientStats:
+    """Run ``config.clients`` bots until the shared deadline and return their merged stats."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    if config.start_at is not None:
+        start += max(0.0, config.start_at - time.time())
+    stop_at = start + config.ramp_up + config.duration
+    total = config.total_clients or config.clients
+    bot_cls = _BOTS[config.target]
+    stats = [ClientStats() for _ in range(config.clients)]
+    tasks = []
+    for idx in range(config.clients):
+        global_idx = config.first_client + idx
+        delay = start - loop.time() + config.ramp_up * global_idx / total
+        bot = bot_cls(config, f"bot-{global_idx:04d}", stats[idx])
+        tasks.append(asyncio.create_task(bot.run(delay, stop_at)))
+    await asyncio.gather(*tasks)
+    merged = ClientStats()
+    for entry in stats:
+        merged.merge(entry)
+    return merged
+
+
+def build_report(config: LoadTestConfig, stats: ClientStats, elapsed: float) -> Dict[str, Any]:
+    elapsed = max(elapsed, 1e-9)
+    return {
+        "config": asdict(config),
+        "elapsed_seconds": elapsed,
+        "clients": {
+            "requested": config.clients,
+            "connected": stats.connected,
+            "rejected": stats.rejected,
+            "errors": stats.errors,
+        },
+        "rtt_ms": _distribution_ms(stats.rtts),
+        "snapshot_interval_ms": _distribution_ms(stats.snapshot_intervals),
+        "throughput": {
+            "messages_sent": stats.messages_sent,
+            "messages_received": stats.messages_received,
+            "bytes_sent": stats.bytes_sent,
+            "bytes_received": stats.bytes_received,
+            "messages_sent_per_sec": stats.messages_sent / elapsed,
+            "messages_received_per_sec": stats.messages_received / elapsed,
+            "bytes_sent_per_sec": stats.bytes_sent / elapsed,
+            "bytes_received_per_sec": stats.bytes_received / elapsed,
+        },
+    }
+
+
+async def benchmark(config: LoadTestConfig) -> Dict[str, Any]:
+    started = time.perf_counter()
+    stats = await run_clients(config)
+    return build_report(config, stats, time.perf_counter() - started)
+
+
+def _run_shard(config: LoadTestConfig) -> ClientStats:
+    return asyncio.run(run_clients(config))
+
+
+def shard_config(config: LoadTestConfig, processes: int, start_at: float) -> List[LoadTestConfig]:
+    """Split ``config`` into contiguous client ranges that share one ramp-up schedule."""
+    base, extra = divmod(config.clients, processes)
+    shards: List[LoadTestConfig] = []
+    first = 0
+    for shard in range(processes):
+        count = base + (1 if shard < extra else 0)
+        if count:
+            shards.append(
+                LoadTestConfig(
+                    **{
+                        **asdict(config),
+                        "clients": count,
+                        "processes": 1,
+                        "first_client": first,
+                        "total_clients": config.clients,
+                        "start_at": start_at,
+                    }
+                )
+            )
+        first += count
+    return shards
+
+
+def benchmark_processes(config: LoadTestConfig, startup_grace: float = 1.0) -> Dict[str, Any]:
+    """Run the benchmark across ``config.processes`` worker processes, each with its own event loop."""
+    start_at = time.time() + startup_grace
+    shards = shard_config(config, config.processes, start_at)
+    merged = ClientStats()
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        for stats in pool.map(_run_shard, shards):
+            merged.merge(stats)
+    return build_report(config, merged, time.time() - start_at)
+
+
+def run_benchmark(config: LoadTestConfig) -> Dict[str, Any]:
+    if config.processes > 1:
+        return benchmark_processes(config)
+    return asyncio.run(benchmark(config))
+
+
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Run a lightweight load test against the dedicated server")
+    parser = argparse.ArgumentParser(description="Run a load test against the dedicated server")
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8765)
     parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--target", choices=TARGETS, default=TARGET_SHIZGIGGLES, help="Server protocol to speak")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to sustain load after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which clients are started")
+    parser.add_argument("--input-rate", type=float, default=20.0, help="Inputs per second per client")
+    parser.add_argument("--ping-interval", type=float, default=0.5, help="Seconds between RTT probes")
+    parser.add_argument("--codec", choices=SUPPORTED_CODECS, default=JSON_CODEC)
+    parser.add_argument("--delta", action="store_true", help="Request delta-compressed snapshots")
+    parser.add_argument("--password", help="Server password (game-server target)")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to shard clients across")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--smoke", action="store_true", help="Only run the short scripted smoke test")
     parser.add_argument("--log-level", default="INFO")
     args = parser.parse_args()
 
     logging.basicConfig(level=args.log_level.upper(), format="[%(asctime)s] %(levelname)s %(message)s")
-    asyncio.run(load_test(args.host, args.port, args.clients))
+    if args.smoke:
+        asyncio.run(load_test(args.host, args.port, args.clients))
+        return
+
+    config = LoadTestConfig(
+        host=args.host,
+        port=args.port,
+        target=args.target,
+        clients=args.clients,
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        input_rate=args.input_rate,
+        ping_interval=args.ping_interval,
+        codec=args.codec,
+        delta=args.delta,
+        password=args.password,
+        processes=max(1, args.processes),
+    )
+    report = run_benchmark(config)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+import ipaddress
+import time
+from typing import Dict, Optional
+
+from server.anti_cheat import RateLimiter
+from server.metrics import Metrics
+
+REJECT_IP_LIMIT = "ip_limit"
+REJECT_JOIN_RATE = "join_rate"
+
+
+class AdmissionController:
+    """
+    Cheap connection admission checks that run before any per-connection parsing.
+
+    Caps concurrent connections per IP (so opening many sockets from one host does
+    not multiply its rate limit) and spends a global token bucket of joins per second
+    (so connection storms after a map change are shed instead of queued).
+
+    The per-IP cap must leave room for players sharing a NAT or LAN address; 0 turns
+    it off, and loopback peers (local bots, load tests) are exempt unless
+    ``exempt_loopback`` is False. The join budget applies to everyone.
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        max_connections_per_ip: int,
+        join_rate_per_second: int,
+        join_burst: int,
+        exempt_loopback: bool = True,
+    ):
+        self.max_connections_per_ip = max_connections_per_ip
+        self.exempt_loopback = exempt_loopback
+        self._per_ip: Dict[str, int] = {}
+        self._join_budget = RateLimiter(capacity=join_burst, refill_per_second=join_rate_per_second)
+        self._rejected = {
+            REJECT_IP_LIMIT: metrics.counter("connections_rejected_ip_limit"),
+            REJECT_JOIN_RATE: metrics.counter("connections_rejected_join_rate"),
+        }
+
+    def connections_from(self, ip: str) -> int:
+        return self._per_ip.get(ip, 0)
+
+    def try_admit(self, ip: str, now: Optional[float] = None) -> Optional[str]:
+        """Admit a connection from ``ip`` or return the rejection reason."""
+        count = self._per_ip.get(ip, 0)
+        if count >= self.max_connections_per_ip > 0 and not (self.exempt_loopback and _is_loopback(ip)):
+            reason = REJECT_IP_LIMIT
+        elif not self._join_budget.allow(time.monotonic() if now is None else now):
+            reason = REJECT_JOIN_RATE
+        else:
+            self._per_ip[ip] = count + 1
+            return None
+        self._rejected[reason].increment()
+        return reason
+
+    def release(self, ip: str) -> None:
+        count = self._per_ip.get(ip, 0) - 1
+        if count > 0:
+            self._per_ip[ip] = count
+        else:
+            self._per_ip.pop(ip, None)
+
+
+def _is_loopback(ip: str) -> bool:
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    mapped = getattr(address, "ipv4_mapped", None)
+    return (mapped or address).is_loopback
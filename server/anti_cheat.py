@@ -1,18 +1,25 @@
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
 
 from server.metrics import Metrics
 
 
-@dataclass
+@dataclass(slots=True)
 class RateLimiter:
     capacity: int
     refill_per_second: int
-    tokens: float = 0
-    last_refill: float = time.monotonic()
+    tokens: Optional[float] = None
+    last_refill: float = field(default_factory=time.monotonic)
 
-    def allow(self) -> bool:
-        now = time.monotonic()
+    def __post_init__(self) -> None:
+        if self.tokens is None:
+            self.tokens = float(self.capacity)
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.monotonic()
         elapsed = now - self.last_refill
         self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
         self.last_refill = now
@@ -22,16 +29,99 @@ class RateLimiter:
         return False
 
 
+class RateLimiterTable:
+    """
+    LRU table of per-client limiters that evicts idle clients and caps how many are tracked.
+
+    Entries are kept in last-use order, so eviction only ever inspects the oldest entries.
+    An evicted client simply starts again with a full bucket.
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        capacity: int,
+        refill_per_second: int,
+        max_clients: int = 10000,
+        idle_seconds: float = 60.0,
+    ):
+        self.metrics = metrics
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self._limiters: "OrderedDict[str, RateLimiter]" = OrderedDict()
+        self._evictions = metrics.counter("rate_limiter_evictions")
+
+    def __len__(self) -> int:
+        return len(self._limiters)
+
+    def __contains__(self, client_id: object) -> bool:
+        return client_id in self._limiters
+
+    def allow(self, client_id: str, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.monotonic()
+        limiter = self._limiters.get(client_id)
+        if limiter is None:
+            limiter = RateLimiter(capacity=self.capacity, refill_per_second=self.refill_per_second, last_refill=now)
+            self._limiters[client_id] = limiter
+            self.evict(now)
+            self._publish_size()
+        else:
+            self._limiters.move_to_end(client_id)
+        return limiter.allow(now)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        if now is None:
+            now = time.monotonic()
+        evicted = 0
+        limiters = self._limiters
+        while len(limiters) > self.max_clients:
+            limiters.popitem(last=False)
+            evicted += 1
+        cutoff = now - self.idle_seconds
+        while limiters:
+            oldest = next(iter(limiters.values()))
+            if oldest.last_refill > cutoff:
+                break
+            limiters.popitem(last=False)
+            evicted += 1
+        if evicted:
+            self._evictions.increment(evicted)
+        return evicted
+
+    def forget(self, client_id: str) -> None:
+        if self._limiters.pop(client_id, None) is not None:
+            self._publish_size()
+
+    def _publish_size(self) -> None:
+        self.metrics.set_gauge("rate_limiter_clients", len(self._limiters))
+
+
 class AntiCheat:
     """
     Lightweight anti-cheat utilities for the sample server.
     """
 
-    def __init__(self, metrics: Metrics, rate_limit_per_second: int, max_message_size: int):
+    def __init__(
+        self,
+        metrics: Metrics,
+        rate_limit_per_second: int,
+        max_message_size: int,
+        max_tracked_clients: int = 10000,
+        limiter_idle_seconds: float = 60.0,
+    ):
         self.metrics = metrics
         self.rate_limit_per_second = rate_limit_per_second
         self.max_message_size = max_message_size
-        self._limiters = {}
+        self._limiters = RateLimiterTable(
+            metrics,
+            capacity=rate_limit_per_second,
+            refill_per_second=rate_limit_per_second,
+            max_clients=max_tracked_clients,
+            idle_seconds=limiter_idle_seconds,
+        )
 
     def validate_password(self, supplied: str, expected: str | None) -> bool:
         if expected is None:
@@ -45,11 +135,10 @@ class AntiCheat:
         return ok
 
     def allow_message(self, client_id: str) -> bool:
-        limiter = self._limiters.setdefault(
-            client_id,
-            RateLimiter(capacity=self.rate_limit_per_second, refill_per_second=self.rate_limit_per_second),
-        )
-        allowed = limiter.allow()
+        allowed = self._limiters.allow(client_id)
         if not allowed:
             self.metrics.increment("messages_rejected_rate")
         return allowed
+
+    def forget_client(self, client_id: str) -> None:
+        self._limiters.forget(client_id)
@@ -11,12 +11,29 @@ class ServerConfig:
     host: str = "0.0.0.0"
     port: int = 7777
     maps: List[str] = field(default_factory=lambda: ["arena"])
+    map_rotation_seconds: int = 180
     player_limit: int = 16
     tick_rate: int = 30
+    max_catchup_ticks: int = 3
     password: Optional[str] = None
     region: str = "global"
     matchmaking_endpoint: Optional[str] = None
     matchmaking_api_key: Optional[str] = None
     metrics_interval_seconds: int = 30
+    metrics_host: str = "127.0.0.1"
+    metrics_port: Optional[int] = None
     rate_limit_per_second: int = 10
+    rate_limit_max_clients: int = 10000
+    rate_limit_idle_seconds: float = 60.0
     max_message_size: int = 4096
+    max_connections_per_ip: int = 64
+    ip_limit_exempt_loopback: bool = True
+    join_rate_per_second: int = 20
+    join_burst: int = 40
+    event_loop: str = "auto"
+    tcp_nodelay: bool = True
+    socket_send_buffer: Optional[int] = None
+    socket_recv_buffer: Optional[int] = None
+    reuse_port: bool = False
+    workers: int = 1
+    shared_port: bool = False
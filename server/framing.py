@@ -0,0 +1,56 @@
+from typing import List
+
+
+class LineFramer:
+    """
+    Splits a byte stream into newline-delimited messages, one socket read at a time.
+
+    Lines keep their terminator, exactly as ``StreamReader.readline`` returns them, so
+    size limits apply to the same bytes. A trailing partial line is carried over to
+    the next feed and handed back by :meth:`flush` at EOF. Once a partial line grows
+    past max_size it is truncated to max_size + 1 bytes (enough to fail the size
+    check) and the rest of it is discarded up to its newline, so a client cannot grow
+    the buffer unbounded.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._pending = b""
+        self._overflow = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def feed(self, data: bytes) -> List[bytes]:
+        lines: List[bytes] = []
+        if self._overflow:
+            end = data.find(b"\n")
+            if end < 0:
+                return lines
+            lines.append(self._pending)
+            self._pending = b""
+            self._overflow = False
+            data = data[end + 1 :]
+        if self._pending:
+            data = self._pending + data
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            if end < 0:
+                break
+            lines.append(data[start : end + 1])
+            start = end + 1
+        pending = data[start:]
+        if len(pending) > self.max_size:
+            pending = pending[: self.max_size + 1]
+            self._overflow = True
+        self._pending = pending
+        return lines
+
+    def flush(self) -> List[bytes]:
+        """At EOF, return the unterminated last line if there is one."""
+        lines = [self._pending] if self._pending else []
+        self._pending = b""
+        self._overflow = False
+        return lines
@@ -1,14 +1,21 @@
 import asyncio
 import json
 import logging
+import time
 from asyncio import StreamReader, StreamWriter
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
+from server.admission import REJECT_IP_LIMIT, AdmissionController
 from server.anti_cheat import AntiCheat
 from server.config import ServerConfig
-from server.matchmaking import MatchmakingClient
+from server.framing import LineFramer
+from server.matchmaking import AsyncMatchmakingClient
 from server.metrics import Metrics
+from shizgiggles.net import SocketOptions, listen_kwargs, tune_connection, tune_server
+
+READ_SIZE = 64 * 1024
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
 
 
 @dataclass
@@ -44,20 +51,48 @@ class GameServer:
         self.config = config
         self.metrics = metrics
         self.state = ServerState(config=config)
-        self.matchmaking_client: Optional[MatchmakingClient] = None
+        self.matchmaking_client: Optional[AsyncMatchmakingClient] = None
         if config.matchmaking_endpoint:
-            self.matchmaking_client = MatchmakingClient(
-                config.matchmaking_endpoint, api_key=config.matchmaking_api_key
+            self.matchmaking_client = AsyncMatchmakingClient(
+                config.matchmaking_endpoint, api_key=config.matchmaking_api_key, metrics=metrics
             )
         self.anti_cheat = AntiCheat(
-            metrics=metrics, rate_limit_per_second=config.rate_limit_per_second, max_message_size=config.max_message_size
+            metrics=metrics,
+            rate_limit_per_second=config.rate_limit_per_second,
+            max_message_size=config.max_message_size,
+            max_tracked_clients=config.rate_limit_max_clients,
+            limiter_idle_seconds=config.rate_limit_idle_seconds,
+        )
+        self.admission = AdmissionController(
+            metrics,
+            max_connections_per_ip=config.max_connections_per_ip,
+            join_rate_per_second=config.join_rate_per_second,
+            join_burst=config.join_burst,
+            exempt_loopback=config.ip_limit_exempt_loopback,
+        )
+        self.socket_options = SocketOptions(
+            nodelay=config.tcp_nodelay,
+            send_buffer=config.socket_send_buffer,
+            recv_buffer=config.socket_recv_buffer,
+            reuse_port=config.reuse_port,
         )
+        self.tick_count = 0
+        self._ticks_until_rotation = self._rotation_period_ticks()
+        self._ticks_counter = metrics.counter("ticks")
+        self._tick_overruns = metrics.counter("tick_overruns")
+        self._tick_ms = metrics.histogram("tick_duration_ms")
+        self._message_ms = metrics.histogram("message_handle_ms")
+        self._drain_ms = metrics.histogram("drain_ms")
+        self._batch_sizes = metrics.histogram("messages_per_read", BATCH_BUCKETS)
         self._server: Optional[asyncio.AbstractServer] = None
         self._tick_task: Optional[asyncio.Task] = None
         self._matchmaking_task: Optional[asyncio.Task] = None
 
     async def start(self):
-        self._server = await asyncio.start_server(self._handle_client, host=self.config.host, port=self.config.port)
+        self._server = await asyncio.start_server(
+            self._admit_client, host=self.config.host, port=self.config.port, **listen_kwargs(self.socket_options)
+        )
+        tune_server(self._server, self.socket_options)
         self._tick_task = asyncio.create_task(self._tick_loop())
         if self.matchmaking_client:
             self._matchmaking_task = asyncio.create_task(self._matchmaking_loop())
@@ -71,18 +106,21 @@ class GameServer:
             self._tick_task.cancel()
         if self._matchmaking_task:
             self._matchmaking_task.cancel()
+        if self.matchmaking_client:
+            await self.matchmaking_client.close()
         logging.info("server stopped")
 
     async def _matchmaking_loop(self):
         assert self.matchmaking_client
         while True:
-            success = self.matchmaking_client.register_server(
+            success = await self.matchmaking_client.register_server(
                 address=self.config.host,
                 port=self.config.port,
                 region=self.config.region,
                 max_players=self.config.player_limit,
                 map_name=self.state.current_map,
                 tick_rate=self.config.tick_rate,
+                players=len(self.state.players),
             )
             self.metrics.increment("matchmaking_register_attempts")
             if success:
@@ -90,14 +128,66 @@ class GameServer:
             await asyncio.sleep(30)
 
     async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
         tick_interval = 1 / self.config.tick_rate
+        max_lag = self.config.max_catchup_ticks * tick_interval
+        next_tick = loop.time() + tick_interval
+        window_start = loop.time()
+        window_ticks = 0
         while True:
-            await asyncio.sleep(tick_interval)
-            # Here you'd run simulation logic. We only rotate maps every 3 minutes.
-            if self.state.players and self.metrics.snapshot().get("ticks", 0) % (self.config.tick_rate * 180) == 0:
+            # Always yield, even when running late, so connection handlers are not starved.
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            started = loop.time()
+            self._run_tick()
+            finished = loop.time()
+            duration = finished - started
+            self._tick_ms.observe(duration * 1000)
+            if duration > tick_interval:
+                self._tick_overruns.increment()
+
+            # Deadlines advance by whole intervals so sleep jitter and tick work never accumulate as drift.
+            # Small lag is caught up by running the next ticks back to back; beyond max_catchup_ticks we skip.
+            next_tick += tick_interval
+            lag = finished - next_tick
+            if lag > max_lag:
+                skipped = int(lag // tick_interval)
+                next_tick += skipped * tick_interval
+                self.metrics.increment("ticks_skipped", skipped)
+
+            window_ticks += 1
+            if finished - window_start >= 1.0:
+                self.metrics.set_gauge("tick_rate_actual", window_ticks / (finished - window_start))
+                window_start = finished
+                window_ticks = 0
+
+    def _rotation_period_ticks(self) -> int:
+        return max(1, self.config.tick_rate * self.config.map_rotation_seconds)
+
+    def _run_tick(self):
+        # Here you'd run simulation logic. We only rotate maps every map_rotation_seconds of ticks.
+        self._ticks_until_rotation -= 1
+        if self._ticks_until_rotation <= 0:
+            self._ticks_until_rotation = self._rotation_period_ticks()
+            if self.state.players:
                 self.state.rotate_map()
                 logging.info("rotated to next map: %s", self.state.current_map)
-            self.metrics.increment("ticks")
+        self.tick_count += 1
+        self._ticks_counter.increment()
+
+    async def _admit_client(self, reader: StreamReader, writer: StreamWriter):
+        peername = writer.get_extra_info("peername")
+        ip = peername[0] if peername else "unknown"
+        reason = self.admission.try_admit(ip)
+        if reason is not None:
+            # Early reject: no session, no JSON, no drain; close() still flushes the short reply.
+            writer.write(b"too many connections\n" if reason == REJECT_IP_LIMIT else b"server busy\n")
+            writer.close()
+            return
+        tune_connection(writer, self.socket_options)
+        try:
+            await self._handle_client(reader, writer)
+        finally:
+            self.admission.release(ip)
 
     async def _handle_client(self, reader: StreamReader, writer: StreamWriter):
         peername = writer.get_extra_info("peername")
@@ -106,8 +196,7 @@ class GameServer:
         self.metrics.increment("connections_opened")
 
         if not self.state.has_capacity():
-            writer.write(b"server full\n")
-            await writer.drain()
+            await self._send(writer, b"server full\n")
             writer.close()
             await writer.wait_closed()
             self.metrics.increment("connections_rejected_full")
@@ -117,74 +206,84 @@ class GameServer:
         try:
             join_message = await reader.readline()
             if not self.anti_cheat.validate_message_size(join_message):
-                writer.write(b"message too large\n")
-                await writer.drain()
+                await self._send(writer, b"message too large\n")
                 return
             try:
                 payload = json.loads(join_message.decode())
             except json.JSONDecodeError:
-                writer.write(b"invalid join payload\n")
-                await writer.drain()
+                await self._send(writer, b"invalid join payload\n")
                 self.metrics.increment("connections_rejected_invalid")
                 return
 
             player_id = payload.get("player_id") or client_id
             supplied_password = payload.get("password", "")
             if not self.anti_cheat.validate_password(supplied_password, self.config.password):
-                writer.write(b"invalid password\n")
-                await writer.drain()
+                await self._send(writer, b"invalid password\n")
                 self.metrics.increment("connections_rejected_auth")
                 return
 
             session = PlayerSession(player_id=player_id, writer=writer, rate_limit_label=client_id)
             self.state.players[player_id] = session
             self.metrics.increment("players_joined")
-            writer.write(
+            await self._send(
+                writer,
                 json.dumps({"status": "ok", "map": self.state.current_map, "tick_rate": self.config.tick_rate}).encode()
-                + b"\n"
+                + b"\n",
             )
-            await writer.drain()
-
-            while not reader.at_eof():
-                line = await reader.readline()
-                if not line:
-                    break
-                if not self.anti_cheat.validate_message_size(line):
-                    writer.write(b"message too large\n")
-                    await writer.drain()
-                    continue
-                if not self.anti_cheat.allow_message(client_id):
-                    writer.write(b"rate limited\n")
-                    await writer.drain()
-                    continue
-                try:
-                    message = json.loads(line.decode())
-                except json.JSONDecodeError:
-                    writer.write(b"invalid message\n")
-                    await writer.drain()
-                    self.metrics.increment("messages_rejected_parse")
+
+            # Handle everything a single read returns as one batch: one wakeup, one write and one drain,
+            # however many messages the client pipelined.
+            framer = LineFramer(self.config.max_message_size)
+            while True:
+                data = await reader.read(READ_SIZE)
+                # Like readline(), a last line without a newline still counts once the client closes.
+                lines = framer.feed(data) if data else framer.flush()
+                if not lines:
+                    if not data:
+                        break
                     continue
-                await self._process_message(session, message)
+                replies = []
+                for line in lines:
+                    started = time.perf_counter()
+                    replies.append(self._handle_line(session, client_id, line))
+                    self._message_ms.observe((time.perf_counter() - started) * 1000)
+                self._batch_sizes.observe(len(lines))
+                await self._send(writer, b"".join(replies))
         finally:
             if player_id:
                 self.state.players.pop(player_id, None)
+            self.anti_cheat.forget_client(client_id)
             writer.close()
             await writer.wait_closed()
             self.metrics.increment("connections_closed")
             logging.info("connection closed: %s", client_id)
 
-    async def _process_message(self, session: PlayerSession, message: dict):
-        action = message.get("action")
+    def _handle_line(self, session: PlayerSession, client_id: str, line: bytes) -> bytes:
+        if not self.anti_cheat.validate_message_size(line):
+            return b"message too large\n"
+        if not self.anti_cheat.allow_message(client_id):
+            return b"rate limited\n"
+        try:
+            message = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self.metrics.increment("messages_rejected_parse")
+            return b"invalid message\n"
+        return self._process_message(session, message)
+
+    async def _send(self, writer: StreamWriter, data: bytes):
+        writer.write(data)
+        started = time.perf_counter()
+        await writer.drain()
+        self._drain_ms.observe((time.perf_counter() - started) * 1000)
+
+    def _process_message(self, session: PlayerSession, message: dict) -> bytes:
+        action = message.get("action") if isinstance(message, dict) else None
         if action == "ping":
-            session.writer.write(b'{"action":"pong"}\n')
-            await session.writer.drain()
             self.metrics.increment("pings")
-        elif action == "rotate_map":
+            return b'{"action":"pong"}\n'
+        if action == "rotate_map":
             self.state.rotate_map()
-            session.writer.write(json.dumps({"map": self.state.current_map}).encode() + b"\n")
-            await session.writer.drain()
             self.metrics.increment("map_rotations_manual")
-        else:
-            session.writer.write(b'{"error":"unknown action"}\n')
-            await session.writer.drain()
-            self.metrics.increment("messages_rejected_unknown")
+            return json.dumps({"map": self.state.current_map}).encode() + b"\n"
+        self.metrics.increment("messages_rejected_unknown")
+        return b'{"error":"unknown action"}\n'
@@ -1,13 +1,33 @@
+import asyncio
+import dataclasses
+import heapq
 import json
 import logging
+import os
+import random
 import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from typing import Dict, List, Optional
+from http import HTTPStatus
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from urllib import error, parse, request
 
+from server.metrics import Metrics
+
 SERVER_TTL_SECONDS = 120
+MAX_PAGE_SIZE = 500
+RESPONSE_CACHE_SIZE = 256
+
+_READ_SIZE = 64 * 1024
+_MAX_HEADER_BYTES = 16 * 1024
+_MAX_BODY_BYTES = 64 * 1024
+_OK = b'{"status": "ok"}'
+_INVALID_PAYLOAD = b'{"error": "invalid payload"}'
+_NOT_FOUND = b'{"error": "not found"}'
+_BAD_REQUEST = b'{"error": "bad request"}'
+_BUSY = b'{"error": "too many connections"}'
+_INTERNAL_ERROR = b'{"error": "internal error"}'
 
 
 @dataclass
@@ -19,112 +39,434 @@ class ServerAnnouncement:
     map_name: str
     tick_rate: int
     last_seen: float
+    players: int = 0
+
+    def __post_init__(self):
+        # Region and map name key the registry indexes, so they must be hashable strings.
+        for field_name in ("address", "region", "map_name"):
+            if not isinstance(getattr(self, field_name), str):
+                raise TypeError(f"{field_name} must be a string")
+
+    @property
+    def has_free_slots(self) -> bool:
+        return self.players < self.max_players
+
+    def to_dict(self) -> dict:
+        return {
+            "address": self.address,
+            "port": self.port,
+            "region": self.region,
+            "max_players": self.max_players,
+            "players": self.players,
+            "map_name": self.map_name,
+            "tick_rate": self.tick_rate,
+            "last_seen": self.last_seen,
+        }
 
 
 class _Registry:
-    def __init__(self):
+    """
+    Server list with heap-driven expiry and secondary indexes by region and map.
+
+    Index dicts keep registration order, so paginated listings are stable while servers
+    heartbeat. Re-registering pushes a new heap entry; superseded entries are skipped when
+    they surface, so expiry costs O(log n) per registration instead of a scan per listing.
+
+    ``version`` changes whenever a listing would: a server appears, changes a field or
+    expires. A heartbeat that only refreshes ``last_seen`` keeps the version, so cached
+    listings survive the steady stream of re-registrations.
+    """
+
+    def __init__(self, ttl_seconds: float = SERVER_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
         self._servers: Dict[str, ServerAnnouncement] = {}
+        self._by_region: Dict[str, Dict[str, ServerAnnouncement]] = {}
+        self._by_map: Dict[str, Dict[str, ServerAnnouncement]] = {}
+        self._expiry: List[Tuple[float, str]] = []
         self._lock = threading.Lock()
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._servers)
 
     def register(self, announcement: ServerAnnouncement) -> None:
+        key = self._key(announcement)
         with self._lock:
-            self._servers[self._key(announcement)] = announcement
+            previous = self._servers.get(key)
+            changed = previous is None or dataclasses.replace(previous, last_seen=announcement.last_seen) != announcement
+            # Everything that can raise happens before the first write, so a bad announcement leaves no trace.
+            region_bucket = self._by_region.setdefault(announcement.region, {})
+            map_bucket = self._by_map.setdefault(announcement.map_name, {})
+            deadline = announcement.last_seen + self.ttl_seconds
+            if previous is not None and previous.region != announcement.region:
+                self._drop(self._by_region, previous.region, key)
+            if previous is not None and previous.map_name != announcement.map_name:
+                self._drop(self._by_map, previous.map_name, key)
+            if changed:
+                self.version += 1
+            self._servers[key] = announcement
+            region_bucket[key] = announcement
+            map_bucket[key] = announcement
+            heapq.heappush(self._expiry, (deadline, key))
+
+    def expire(self, now: Optional[float] = None) -> int:
+        with self._lock:
+            return self._expire(time.time() if now is None else now)
+
+    def current_version(self, now: Optional[float] = None) -> int:
+        """Expire due servers, then return the listing version."""
+        with self._lock:
+            self._expire(time.time() if now is None else now)
+            return self.version
 
     def list_active(self) -> List[ServerAnnouncement]:
+        return self.query()[0]
+
+    def query(
+        self,
+        region: Optional[str] = None,
+        map_name: Optional[str] = None,
+        has_free_slots: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> Tuple[List[ServerAnnouncement], int]:
+        """Return one page of matching servers and the total number of matches."""
         with self._lock:
-            now = time.time()
-            self._servers = {k: v for k, v in self._servers.items() if now - v.last_seen <= SERVER_TTL_SECONDS}
-            return list(self._servers.values())
+            self._expire(time.time() if now is None else now)
+            candidates: Iterable[ServerAnnouncement] = self._smallest_index(region, map_name).values()
+            if region is not None:
+                candidates = (s for s in candidates if s.region == region)
+            if map_name is not None:
+                candidates = (s for s in candidates if s.map_name == map_name)
+            if has_free_slots:
+                candidates = (s for s in candidates if s.has_free_slots)
+            matches = list(candidates)
+        end = len(matches) if limit is None else offset + limit
+        return matches[offset:end], len(matches)
+
+    def _smallest_index(self, region: Optional[str], map_name: Optional[str]) -> Dict[str, ServerAnnouncement]:
+        indexes = []
+        if region is not None:
+            indexes.append(self._by_region.get(region, {}))
+        if map_name is not None:
+            indexes.append(self._by_map.get(map_name, {}))
+        return min(indexes, key=len) if indexes else self._servers
+
+    def _expire(self, now: float) -> int:
+        expired = 0
+        heap = self._expiry
+        while heap and heap[0][0] < now:
+            deadline, key = heapq.heappop(heap)
+            announcement = self._servers.get(key)
+            if announcement is None or announcement.last_seen + self.ttl_seconds != deadline:
+                continue
+            del self._servers[key]
+            self._unindex(key, announcement)
+            expired += 1
+        if expired:
+            self.version += 1
+        return expired
+
+    def _unindex(self, key: str, announcement: ServerAnnouncement) -> None:
+        self._drop(self._by_region, announcement.region, key)
+        self._drop(self._by_map, announcement.map_name, key)
+
+    @staticmethod
+    def _drop(index: Dict[str, Dict[str, ServerAnnouncement]], value: str, key: str) -> None:
+        bucket = index.get(value)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del index[value]
 
     @staticmethod
     def _key(announcement: ServerAnnouncement) -> str:
         return f"{announcement.address}:{announcement.port}"
 
 
+class _ResponseCache:
+    """
+    Pre-encoded GET /servers bodies per filter combination, valid for one registry version.
+
+    ETags combine a per-process epoch with the registry version, so a tag issued before a
+    backend restart never matches a new listing that happens to reach the same version.
+    """
+
+    def __init__(self, registry: _Registry, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.registry = registry
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._epoch = os.urandom(4).hex()
+        self._entries: "OrderedDict[tuple, Tuple[int, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def etag(self, version: int) -> str:
+        return f'"{self._epoch}-{version}"'
+
+    def get(self, filters: dict) -> Tuple[str, bytes]:
+        """Return ``(etag, body)`` for ``filters``, encoding the page only when the listing changed."""
+        key = tuple(sorted(filters.items()))
+        # Read the version before querying: a racing registration can only make the body newer than its tag.
+        version = self.registry.current_version()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self.etag(version), cached[1]
+        servers, total = self.registry.query(**filters)
+        body = json.dumps(_server_page(servers, total, filters["offset"], filters["limit"])).encode("utf-8")
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return self.etag(version), body
+
+
+class ServerList:
+    """
+    Transport-independent /register and /servers handling shared by the HTTP front ends.
+    """
+
+    def __init__(self, ttl_seconds: float = SERVER_TTL_SECONDS):
+        self.registry = _Registry(ttl_seconds)
+        self.responses = _ResponseCache(self.registry)
+
+    def register(self, raw: bytes) -> Tuple[int, bytes]:
+        try:
+            payload = json.loads(raw)
+            announcement = ServerAnnouncement(
+                address=payload["address"],
+                port=int(payload["port"]),
+                region=payload.get("region", "global"),
+                max_players=int(payload.get("max_players", 0)),
+                map_name=payload.get("map_name", "unknown"),
+                tick_rate=int(payload.get("tick_rate", 0)),
+                last_seen=time.time(),
+                players=int(payload.get("players", 0)),
+            )
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            logging.warning("failed to register server: %r", exc)
+            return 400, _INVALID_PAYLOAD
+        self.registry.register(announcement)
+        return 200, _OK
+
+    def servers(self, query: str, if_none_match: Optional[str] = None) -> Tuple[int, bytes, Optional[str]]:
+        """Return ``(status, body, etag)`` for GET /servers with the given query string."""
+        try:
+            filters = _server_filters(query)
+        except ValueError as exc:
+            return 400, json.dumps({"error": str(exc)}).encode("utf-8"), None
+        etag, body = self.responses.get(filters)
+        if _etag_matches(if_none_match, etag):
+            return 304, b"", etag
+        return 200, body, etag
+
+
 class MatchmakingBackend:
     """
-    Lightweight HTTP server list backend.
+    Asyncio HTTP/1.1 server list backend.
+
+    Connections are kept alive and pipelined requests are answered in one write per
+    socket read. At most ``max_connections`` are served at once; beyond that new
+    connections get a 503 and are closed. :meth:`start` and :meth:`stop` run the
+    backend on a private event loop thread; :meth:`start_async` and :meth:`stop_async`
+    run it on the caller's loop.
     """
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 8080):
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        max_connections: int = 1024,
+        idle_timeout: float = 60.0,
+        server_list: Optional[ServerList] = None,
+    ):
         self.host = host
         self.port = port
-        self._registry = _Registry()
-        self._httpd: Optional[ThreadingHTTPServer] = None
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.server_list = server_list or ServerList()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._thread: Optional[threading.Thread] = None
 
+    async def start_async(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logging.info("Matchmaking backend started on %s:%s", self.host, self.port)
+
+    async def stop_async(self):
+        if self._server:
+            self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        if self._server:
+            await self._server.wait_closed()
+
     def start(self):
-        handler = self._build_handler()
-        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
-        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="matchmaking-backend", daemon=True)
         self._thread.start()
-        logging.info("Matchmaking backend started on %s:%s", self.host, self.port)
+        asyncio.run_coroutine_threadsafe(self.start_async(), self._loop).result()
 
     def stop(self):
-        if self._httpd:
-            self._httpd.shutdown()
-            self._httpd.server_close()
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop_async(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
         if self._thread:
             self._thread.join(timeout=1)
+        self._loop.close()
+        self._loop = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self._connections) >= self.max_connections:
+            writer.write(_response(503, _BUSY, keep_alive=False))
+            writer.close()
+            return
+        self._connections.add(writer)
+        buffer = bytearray()
+        try:
+            keep_alive = True
+            while keep_alive:
+                data = await asyncio.wait_for(reader.read(_READ_SIZE), self.idle_timeout)
+                if not data:
+                    break
+                buffer += data
+                responses = []
+                while keep_alive:
+                    request = _parse_request(buffer)
+                    if request is None:
+                        break
+                    if isinstance(request, int):
+                        responses.append(_response(request, _BAD_REQUEST, keep_alive=False))
+                        keep_alive = False
+                        break
+                    method, target, version, headers, body = request
+                    keep_alive = _wants_keep_alive(version, headers)
+                    try:
+                        responses.append(self._dispatch(method, target, headers, body, keep_alive))
+                    except Exception:
+                        # Answer what came before in the pipeline, then give up on this connection.
+                        logging.exception("matchmaking request %s %s failed", method, target)
+                        responses.append(_response(500, _INTERNAL_ERROR, keep_alive=False))
+                        keep_alive = False
+                if responses:
+                    writer.write(b"".join(responses))
+                    await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception:
+            logging.exception("matchmaking connection failed")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes, keep_alive: bool) -> bytes:
+        path, _, query = target.partition("?")
+        if method == "GET" and path == "/servers":
+            status, payload, etag = self.server_list.servers(query, headers.get("if-none-match"))
+            return _response(status, payload, keep_alive, etag)
+        if method == "POST" and path == "/register":
+            status, payload = self.server_list.register(body)
+            return _response(status, payload, keep_alive)
+        return _response(404, _NOT_FOUND, keep_alive)
+
+
+def _parse_request(buffer: bytearray):
+    """
+    Pop one complete request off ``buffer``.
+
+    Returns ``(method, target, version, headers, body)``, None when more bytes are needed, or an
+    HTTP status code when the request is malformed or too large.
+    """
+    head_end = buffer.find(b"\r\n\r\n")
+    if head_end < 0:
+        return 431 if len(buffer) > _MAX_HEADER_BYTES else None
+    if head_end > _MAX_HEADER_BYTES:
+        return 431
+    lines = bytes(buffer[:head_end]).decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+        return 400
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if not sep:
+            return 400
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        return 400
+    if length < 0 or length > _MAX_BODY_BYTES or "transfer-encoding" in headers:
+        return 413 if length > _MAX_BODY_BYTES else 400
+    end = head_end + 4 + length
+    if len(buffer) < end:
+        return None
+    body = bytes(buffer[head_end + 4 : end])
+    del buffer[:end]
+    return parts[0], parts[1], parts[2], headers, body
+
+
+def _wants_keep_alive(version: str, headers: Dict[str, str]) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def _response(status: int, body: bytes, keep_alive: bool = True, etag: Optional[str] = None) -> bytes:
+    head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    if status != 304:
+        head += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+    if etag:
+        head += [f"ETag: {etag}", "Cache-Control: no-cache"]
+    if not keep_alive:
+        head.append("Connection: close")
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _server_filters(query: str) -> dict:
+    """Parse GET /servers query parameters: region, map, has_slots, offset and limit."""
+    params = dict(parse.parse_qsl(query))
+    try:
+        offset = int(params.get("offset", 0))
+        limit = int(params["limit"]) if "limit" in params else None
+    except ValueError:
+        raise ValueError("offset and limit must be integers") from None
+    if offset < 0 or (limit is not None and not 0 < limit <= MAX_PAGE_SIZE):
+        raise ValueError(f"offset must be >= 0 and limit between 1 and {MAX_PAGE_SIZE}")
+    return {
+        "region": params.get("region"),
+        "map_name": params.get("map"),
+        "has_free_slots": params.get("has_slots", "").lower() in ("1", "true", "yes"),
+        "offset": offset,
+        "limit": limit,
+    }
 
-    def _build_handler(self):
-        registry = self._registry
-
-        class Handler(BaseHTTPRequestHandler):
-            def _send(self, code: int, payload: dict):
-                body = json.dumps(payload).encode("utf-8")
-                self.send_response(code)
-                self.send_header("Content-Type", "application/json")
-                self.send_header("Content-Length", str(len(body)))
-                self.end_headers()
-                self.wfile.write(body)
-
-            def do_POST(self):
-                if self.path != "/register":
-                    self._send(404, {"error": "not found"})
-                    return
-                content_length = int(self.headers.get("Content-Length", "0"))
-                try:
-                    raw = self.rfile.read(content_length)
-                    payload = json.loads(raw)
-                    announcement = ServerAnnouncement(
-                        address=payload["address"],
-                        port=int(payload["port"]),
-                        region=payload.get("region", "global"),
-                        max_players=int(payload.get("max_players", 0)),
-                        map_name=payload.get("map_name", "unknown"),
-                        tick_rate=int(payload.get("tick_rate", 0)),
-                        last_seen=time.time(),
-                    )
-                    registry.register(announcement)
-                    self._send(200, {"status": "ok"})
-                except Exception as exc:  # noqa: BLE001
-                    logging.exception("failed to register server: %s", exc)
-                    self._send(400, {"error": "invalid payload"})
-
-            def do_GET(self):
-                if self.path != "/servers":
-                    self._send(404, {"error": "not found"})
-                    return
-                servers = registry.list_active()
-                body = [
-                    {
-                        "address": s.address,
-                        "port": s.port,
-                        "region": s.region,
-                        "max_players": s.max_players,
-                        "map_name": s.map_name,
-                        "tick_rate": s.tick_rate,
-                        "last_seen": s.last_seen,
-                    }
-                    for s in servers
-                ]
-                self._send(200, {"servers": body})
-
-            def log_message(self, format: str, *args) -> None:  # noqa: A003
-                logging.info("matchmaking: " + format, *args)
-
-        return Handler
+
+def _server_page(servers: List[ServerAnnouncement], total: int, offset: int, limit: Optional[int]) -> dict:
+    end = offset + len(servers)
+    return {
+        "servers": [server.to_dict() for server in servers],
+        "total": total,
+        "offset": offset,
+        "next_offset": end if limit is not None and end < total else None,
+    }
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
 
 
 class MatchmakingClient:
@@ -144,12 +486,14 @@ class MatchmakingClient:
         max_players: int,
         map_name: str,
         tick_rate: int,
+        players: int = 0,
     ) -> bool:
         payload = {
             "address": address,
             "port": port,
             "region": region,
             "max_players": max_players,
+            "players": players,
             "map_name": map_name,
             "tick_rate": tick_rate,
         }
@@ -166,3 +510,147 @@ class MatchmakingClient:
         except error.URLError as exc:
             logging.warning("failed to register with matchmaking backend: %s", exc)
             return False
+
+
+class AsyncMatchmakingClient:
+    """
+    Asyncio registration client that reuses one keep-alive HTTP/1.1 connection and retries with jittered backoff.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        api_key: str | None = None,
+        metrics: Optional[Metrics] = None,
+        timeout: float = 5.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 10.0,
+        rng: Optional[random.Random] = None,
+    ):
+        parsed = parse.urlsplit(endpoint)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"unsupported matchmaking endpoint: {endpoint}")
+        self.endpoint = endpoint.rstrip("/")
+        self.api_key = api_key
+        self.metrics = metrics or Metrics()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._host = parsed.hostname
+        self._port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self._ssl = parsed.scheme == "https"
+        self._path_prefix = parsed.path.rstrip("/")
+        self._rng = rng or random.Random()
+        self._latency_ms = self.metrics.histogram("matchmaking_register_latency_ms")
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def register_server(
+        self,
+        address: str,
+        port: int,
+        region: str,
+        max_players: int,
+        map_name: str,
+        tick_rate: int,
+        players: int = 0,
+    ) -> bool:
+        payload = {
+            "address": address,
+            "port": port,
+            "region": region,
+            "max_players": max_players,
+            "players": players,
+            "map_name": map_name,
+            "tick_rate": tick_rate,
+        }
+        body = json.dumps(payload).encode("utf-8")
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(self._post("/register", body), self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+                await self.close()
+                self.metrics.increment("matchmaking_register_errors")
+                logging.warning("failed to register with matchmaking backend: %r", exc)
+            else:
+                self._latency_ms.observe((time.perf_counter() - started) * 1000)
+                self.metrics.increment("matchmaking_register_responses")
+                if status == 200:
+                    return True
+                logging.warning("matchmaking backend rejected registration with HTTP %s", status)
+                if status < 500:
+                    return False
+            if attempt < self.max_retries:
+                self.metrics.increment("matchmaking_register_retries")
+                await asyncio.sleep(self.backoff_delay(attempt))
+        return False
+
+    def backoff_delay(self, attempt: int) -> float:
+        # "Full jitter": spreads retries from many servers after a backend outage.
+        return self._rng.uniform(0, min(self.backoff_cap, self.backoff_base * (2**attempt)))
+
+    async def close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    async def _post(self, path: str, body: bytes) -> int:
+        async with self._lock:
+            reused = self._writer is not None and not self._writer.is_closing()
+            try:
+                return await self._exchange(path, body)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not reused:
+                    raise
+            # The backend dropped our idle keep-alive connection; retry once on a fresh one.
+            await self.close()
+            return await self._exchange(path, body)
+
+    async def _exchange(self, path: str, body: bytes) -> int:
+        if self._writer is None or self._writer.is_closing():
+            self._reader, self._writer = await asyncio.open_connection(self._host, self._port, ssl=self._ssl or None)
+            self.metrics.increment("matchmaking_connections_opened")
+        assert self._reader and self._writer
+        headers = [
+            f"POST {self._path_prefix}{path} HTTP/1.1",
+            f"Host: {self._host}:{self._port}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive",
+        ]
+        if self.api_key:
+            headers.append(f"X-API-Key: {self.api_key}")
+        self._writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("matchmaking backend closed the connection")
+        version, status = self._parse_status(status_line)
+        response_headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        await self._reader.readexactly(int(response_headers.get("content-length", "0")))
+        if version == "HTTP/1.0" or response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status
+
+    @staticmethod
+    def _parse_status(line: bytes) -> Tuple[str, int]:
+        parts = line.decode("latin-1").split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ValueError(f"malformed status line: {line!r}")
+        return parts[0], int(parts[1])
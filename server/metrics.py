@@ -1,28 +1,313 @@
 import logging
+import re
 import threading
 import time
-from collections import Counter
-from typing import Dict
+import uuid
+from bisect import bisect_left
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 33, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; bucket bounds are inclusive upper limits.
+
+    Handles returned by :meth:`Metrics.histogram` are observed without locking and,
+    like :class:`CounterHandle`, must only be written from one thread.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS_MS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, object]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class CounterHandle:
+    """
+    Pre-registered counter for hot paths: increments skip the lock and the key lookup.
+
+    A handle must only be incremented from one thread (the event loop); readers see
+    its value through :meth:`Metrics.get` and :meth:`Metrics.snapshot`.
+    """
+
+    __slots__ = ("key", "value")
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.value = 0
+
+    def increment(self, value: int = 1) -> None:
+        self.value += value
 
 
 class Metrics:
     """
     Minimal metrics sink with periodic logging.
+
+    Counters are recorded into a per-thread shard without locking and only merged
+    when read, so :meth:`increment` costs one dict update on the message path.
     """
 
     def __init__(self) -> None:
         self._lock = threading.Lock()
-        self._counter = Counter()
+        self._local = threading.local()
+        self._shards: List[Dict[str, int]] = []
+        self._handles: Dict[str, CounterHandle] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        # Identifies this instance in exports, so an aggregator can tell a restarted process from a live one.
+        self.instance = uuid.uuid4().hex
+
+    def counter(self, key: str) -> CounterHandle:
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = self._handles[key] = CounterHandle(key)
+            return handle
+
+    def histogram(self, key: str, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS_MS) -> Histogram:
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            return histogram
 
     def increment(self, key: str, value: int = 1) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[key] += value
+
+    def _new_shard(self) -> Dict[str, int]:
+        shard: Dict[str, int] = defaultdict(int)
+        with self._lock:
+            # Shards of finished threads stay registered so their counts are never lost.
+            self._shards = self._shards + [shard]
+        self._local.shard = shard
+        return shard
+
+    def get(self, key: str) -> int:
+        handle = self._handles.get(key)
+        total = handle.value if handle is not None else 0
+        for shard in self._shards:
+            total += shard.get(key, 0)
+        return total
+
+    def set_gauge(self, key: str, value: float) -> None:
         with self._lock:
-            self._counter[key] += value
+            self._gauges[key] = value
+
+    def observe(self, key: str, value: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
 
     def snapshot(self) -> Dict[str, int]:
         with self._lock:
-            return dict(self._counter)
+            snapshot: Dict[str, int] = {}
+            for shard in self._shards:
+                # dict() copies a shard atomically under the GIL even while its owner keeps writing.
+                for key, value in dict(shard).items():
+                    snapshot[key] = snapshot.get(key, 0) + value
+            for key, handle in self._handles.items():
+                if handle.value:
+                    snapshot[key] = snapshot.get(key, 0) + handle.value
+            return snapshot
+
+    def gauges(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._gauges)
+
+    def histograms(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {key: histogram.snapshot() for key, histogram in self._histograms.items()}
+
+    def export(self) -> Dict[str, Dict]:
+        """Plain-data copy of every metric, suitable for pickling to another process."""
+        return {
+            "instance": self.instance,
+            "counters": self.snapshot(),
+            "gauges": self.gauges(),
+            "histograms": self.histograms(),
+        }
+
+    def render_prometheus(self, prefix: str = "shiz_") -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for key, value in sorted(self.snapshot().items()):
+            name = _metric_name(prefix + key)
+            if not name.endswith("_total"):
+                name += "_total"
+            lines += [f"# TYPE {name} counter", f"{name} {value}"]
+        for key, series in sorted(self._gauge_series().items()):
+            name = _metric_name(prefix + key)
+            lines.append(f"# TYPE {name} gauge")
+            lines += [f"{name}{labels} {_format_value(value)}" for labels, value in series]
+        for key, histogram in sorted(self.histograms().items()):
+            name = _metric_name(prefix + key)
+            lines.append(f"# TYPE {name} histogram")
+            for bound, cumulative in histogram["buckets"].items():
+                lines.append(f'{name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {histogram["count"]}')
+            lines.append(f"{name}_sum {_format_value(histogram['sum'])}")
+            lines.append(f"{name}_count {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def _gauge_series(self) -> Dict[str, List[Tuple[str, float]]]:
+        """Every gauge as ``(Prometheus label set, value)`` series."""
+        return {key: [("", value)] for key, value in self.gauges().items()}
 
     def log_periodically(self, interval_seconds: int, stop_event: threading.Event) -> None:
         while not stop_event.wait(interval_seconds):
             snapshot = self.snapshot()
-            logging.info("metrics snapshot: %s", snapshot)
+            logging.info("metrics snapshot: %s gauges: %s", snapshot, self.gauges())
+
+
+class AggregatedMetrics(Metrics):
+    """
+    Metrics of a supervisor merged with the latest :meth:`Metrics.export` of each worker process.
+
+    Counters and histograms are summed. Gauges are not: :meth:`gauges` holds the supervisor's
+    own, and each worker's are rendered as their own series labelled ``worker="N"``. When a
+    worker restarts, its predecessor's final counters and histograms are kept as a base, so
+    the merged totals never go down.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._workers: Dict[int, Dict[str, Dict]] = {}
+        self._retired_counters: Dict[str, int] = {}
+        self._retired_histograms: Dict[str, Dict[str, object]] = {}
+
+    def update_worker(self, worker: int, export: Dict[str, Dict]) -> None:
+        with self._lock:
+            previous = self._workers.get(worker)
+            if previous is not None and previous.get("instance") != export.get("instance"):
+                for key, value in previous["counters"].items():
+                    self._retired_counters[key] = self._retired_counters.get(key, 0) + value
+                for key, histogram in previous["histograms"].items():
+                    _merge_histogram(self._retired_histograms, key, histogram)
+            self._workers[worker] = export
+
+    def get(self, key: str) -> int:
+        total = super().get(key)
+        with self._lock:
+            total += self._retired_counters.get(key, 0)
+            for export in self._workers.values():
+                total += export["counters"].get(key, 0)
+        return total
+
+    def snapshot(self) -> Dict[str, int]:
+        snapshot = super().snapshot()
+        with self._lock:
+            for counters in [self._retired_counters] + [export["counters"] for export in self._workers.values()]:
+                for key, value in counters.items():
+                    snapshot[key] = snapshot.get(key, 0) + value
+        return snapshot
+
+    def worker_gauges(self) -> Dict[int, Dict[str, float]]:
+        with self._lock:
+            return {worker: dict(export["gauges"]) for worker, export in self._workers.items()}
+
+    def _gauge_series(self) -> Dict[str, List[Tuple[str, float]]]:
+        series = super()._gauge_series()
+        for worker, gauges in sorted(self.worker_gauges().items()):
+            for key, value in gauges.items():
+                series.setdefault(key, []).append((f'{{worker="{worker}"}}', value))
+        return series
+
+    def histograms(self) -> Dict[str, Dict[str, object]]:
+        histograms = super().histograms()
+        with self._lock:
+            for key, histogram in self._retired_histograms.items():
+                _merge_histogram(histograms, key, histogram)
+            for export in self._workers.values():
+                for key, histogram in export["histograms"].items():
+                    _merge_histogram(histograms, key, histogram)
+        return histograms
+
+
+class MetricsExporter:
+    """
+    Serves a :class:`Metrics` instance as Prometheus text at ``/metrics`` from a background thread.
+    """
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9100):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:  # noqa: A003
+                logging.debug("metrics: " + format, *args)
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logging.info("metrics exporter listening on %s:%s", self.host, self.port)
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+
+def _metric_name(key: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_:]", "_", key)
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _merge_histogram(histograms: Dict[str, Dict[str, object]], key: str, histogram: Dict[str, object]) -> None:
+    """Add a :meth:`Histogram.snapshot` into ``histograms[key]``, copying it if the key is new."""
+    merged = histograms.get(key)
+    if merged is None:
+        histograms[key] = {**histogram, "buckets": dict(histogram["buckets"])}
+        return
+    merged["count"] += histogram["count"]
+    merged["sum"] += histogram["sum"]
+    for bound, cumulative in histogram["buckets"].items():
+        merged["buckets"][bound] = merged["buckets"].get(bound, 0) + cumulative
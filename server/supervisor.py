@@ -0,0 +1,143 @@
+import asyncio
+import dataclasses
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from typing import List, Optional
+
+from server.config import ServerConfig
+from server.game_server import GameServer
+from server.metrics import AggregatedMetrics, Metrics
+from shizgiggles.net import install_event_loop
+
+METRICS_PUSH_SECONDS = 1.0
+RESTART_BACKOFF_SECONDS = 1.0
+
+
+def worker_configs(config: ServerConfig) -> List[ServerConfig]:
+    """
+    Per-worker configs: consecutive ports from config.port, or config.port for all with SO_REUSEPORT.
+    """
+    configs = []
+    for index in range(config.workers):
+        configs.append(
+            dataclasses.replace(
+                config,
+                port=config.port if config.shared_port else config.port + index,
+                reuse_port=config.reuse_port or config.shared_port,
+                metrics_port=None,
+                workers=1,
+                shared_port=False,
+            )
+        )
+    return configs
+
+
+class WorkerSupervisor:
+    """
+    Runs one independent GameServer per worker process and restarts workers that exit.
+
+    Each worker registers with matchmaking on its own and pushes its metrics to the
+    supervisor, whose AggregatedMetrics can be served by a single MetricsExporter.
+    """
+
+    def __init__(self, config: ServerConfig, metrics: Optional[AggregatedMetrics] = None):
+        if config.workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.config = config
+        self.metrics = metrics or AggregatedMetrics()
+        self.configs = worker_configs(config)
+        self._context = multiprocessing.get_context("spawn")
+        self._queue = self._context.Queue()
+        self._processes: List[Optional[multiprocessing.process.BaseProcess]] = [None] * len(self.configs)
+        self._restart_at: List[float] = [0.0] * len(self.configs)
+        self._stop_event = threading.Event()
+        self._collector: Optional[threading.Thread] = None
+
+    def start(self):
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+        for index in range(len(self.configs)):
+            self._spawn(index)
+        logging.info(
+            "supervisor started %s workers on %s:%s%s",
+            len(self.configs),
+            self.config.host,
+            self.config.port,
+            " (shared port)" if self.config.shared_port else f"-{self.config.port + len(self.configs) - 1}",
+        )
+
+    def check_workers(self) -> None:
+        """Restart workers that have exited, at most once per RESTART_BACKOFF_SECONDS each."""
+        now = time.monotonic()
+        alive = 0
+        for index, process in enumerate(self._processes):
+            if process is not None and process.is_alive():
+                alive += 1
+                continue
+            if now < self._restart_at[index]:
+                continue
+            if process is not None:
+                logging.warning("worker %s exited with code %s; restarting", index, process.exitcode)
+                self.metrics.increment("workers_restarted")
+            self._spawn(index)
+            alive += 1
+        self.metrics.set_gauge("workers_alive", alive)
+
+    def run_forever(self, poll_seconds: float = 1.0) -> None:
+        while not self._stop_event.wait(poll_seconds):
+            self.check_workers()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout)
+        if self._collector:
+            self._collector.join(timeout=1)
+        logging.info("supervisor stopped")
+
+    def _spawn(self, index: int) -> None:
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self.configs[index], self._queue),
+            name=f"shiz-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+        self._restart_at[index] = time.monotonic() + RESTART_BACKOFF_SECONDS
+
+    def _collect(self):
+        while not self._stop_event.is_set():
+            try:
+                index, export = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.metrics.update_worker(index, export)
+
+
+def _worker_main(index: int, config: ServerConfig, metrics_queue) -> None:
+    logging.basicConfig(level=logging.INFO, format=f"[%(asctime)s] %(levelname)s: [worker {index}] %(message)s")
+    install_event_loop(config.event_loop)
+    try:
+        asyncio.run(_run_worker(index, config, metrics_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _run_worker(index: int, config: ServerConfig, metrics_queue) -> None:
+    metrics = Metrics()
+    server = GameServer(config=config, metrics=metrics)
+    await server.start()
+    try:
+        while True:
+            metrics_queue.put((index, metrics.export()))
+            await asyncio.sleep(METRICS_PUSH_SECONDS)
+    finally:
+        await server.stop()
@@ -4,30 +4,94 @@ import argparse
 import asyncio
 import json
 import logging
-from typing import Iterable
+from collections import OrderedDict
+from typing import Any, Dict, Iterable
 
-from shizgiggles.protocol import Message
+from shizgiggles.codec import BINARY_CODEC, SUPPORTED_CODECS, BinaryCodec, read_frame
+from shizgiggles.protocol import Message, MessageType, SnapshotState, apply_snapshot_delta
 
 logger = logging.getLogger(__name__)
 
 
-async def send_actions(host: str, port: int, player_id: str, actions: Iterable[Message]) -> None:
+class SnapshotDecoder:
+    """Rebuilds world state from delta snapshots, keeping recent states as baselines."""
+
+    def __init__(self, history: int = 64) -> None:
+        self.history = history
+        self.latest_seq = -1
+        self._states: "OrderedDict[int, SnapshotState]" = OrderedDict()
+
+    @property
+    def state(self) -> SnapshotState:
+        return self._states.get(self.latest_seq, {})
+
+    def apply(self, payload: Dict[str, Any]) -> int | None:
+        """Apply a snapshot payload and return its seq, or None if it cannot be used."""
+        seq = int(payload["seq"])
+        if seq <= self.latest_seq:
+            return None
+        base = payload.get("base")
+        if base is None:
+            base_state: SnapshotState = {}
+        elif base in self._states:
+            base_state = self._states[base]
+        else:
+            logger.debug("Dropping snapshot %s: unknown baseline %s", seq, base)
+            return None
+        self._states[seq] = apply_snapshot_delta(base_state, payload.get("players", {}), payload.get("removed", ()))
+        self.latest_seq = seq
+        while len(self._states) > self.history:
+            self._states.popitem(last=False)
+        return seq
+
+
+async def send_actions(
+    host: str,
+    port: int,
+    player_id: str,
+    actions: Iterable[Message],
+    delta: bool = False,
+    codec: str | None = None,
+) -> None:
     reader, writer = await asyncio.open_connection(host, port)
-    writer.write((Message.join(player_id).to_json() + "\n").encode())
+    writer.write((Message.join(player_id, delta_snapshots=delta, codec=codec).to_json() + "\n").encode())
     await writer.drain()
+    decoder = SnapshotDecoder()
+    binary: BinaryCodec | None = None
+    if codec is not None:
+        reply = Message.from_json((await reader.readline()).decode())
+        if (reply.payload or {}).get("codec") == BINARY_CODEC:
+            binary = BinaryCodec()
+            binary.learn(int(reply.payload["index"]), player_id)
+
+    def send(message: Message) -> None:
+        writer.write(binary.encode(message) if binary else (message.to_json() + "\n").encode())
+
+    async def receive() -> Message | None:
+        if binary:
+            frame = await read_frame(reader)
+            return binary.decode(frame) if frame is not None else None
+        data = await reader.readline()
+        return Message.from_json(data.decode()) if data else None
+
     async def receiver() -> None:
         while True:
-            data = await reader.readline()
-            if not data:
+            message = await receive()
+            if message is None:
                 return
-            logger.debug("Received: %s", data.decode().strip())
+            logger.debug("Received: %s %s", message.type.value, message.payload)
+            if delta and message.type == MessageType.SNAPSHOT:
+                seq = decoder.apply(message.payload or {})
+                if seq is not None:
+                    send(Message.ack(player_id, seq))
+
     recv_task = asyncio.create_task(receiver())
     try:
         for action in actions:
-            writer.write((action.to_json() + "\n").encode())
+            send(action)
             await writer.drain()
             await asyncio.sleep(0.05)
-        writer.write((Message.ping(player_id).to_json() + "\n").encode())
+        send(Message.ping(player_id))
         await writer.drain()
         await asyncio.sleep(0.1)
     finally:
@@ -43,6 +107,8 @@ def main() -> None:
     parser.add_argument("--player-id", default="client")
     parser.add_argument("--moves", nargs="*", default=["0,1", "1,0", "0,-1"])
     parser.add_argument("--fire", action="store_true", help="Fire once at the end of the script")
+    parser.add_argument("--delta", action="store_true", help="Request delta-compressed snapshots")
+    parser.add_argument("--codec", choices=SUPPORTED_CODECS, help="Negotiate a wire codec at join")
     parser.add_argument("--log-level", default="INFO")
     args = parser.parse_args()
 
@@ -54,7 +120,7 @@ def main() -> None:
     if args.fire:
         actions.append(Message.fire(args.player_id))
 
-    asyncio.run(send_actions(args.host, args.port, args.player_id, actions))
+    asyncio.run(send_actions(args.host, args.port, args.player_id, actions, delta=args.delta, codec=args.codec))
 
 
 if __name__ == "__main__":
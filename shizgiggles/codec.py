@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import struct
+from typing import Any, Dict, List
+
+from shizgiggles.protocol import Message, MessageType
+
+JSON_CODEC = "json"
+BINARY_CODEC = "binary"
+SUPPORTED_CODECS = (JSON_CODEC, BINARY_CODEC)
+
+SERVER_INDEX = 0xFFFF
+NO_BASE = 0xFFFFFFFF
+
+FIELD_POSITION = 0x01
+FIELD_HEALTH = 0x02
+FIELD_AMMO = 0x04
+
+# Every frame is a big-endian u16 length followed by that many bytes: type code, player index, payload.
+_LENGTH = struct.Struct("!H")
+_HEADER = struct.Struct("!HBH")
+_MOVE = struct.Struct("!ff")
+_ACK = struct.Struct("!I")
+_SNAPSHOT = struct.Struct("!IIHH")
+# A snapshot entry is the player index and field mask followed by only the fields the mask flags.
+_FIELD_FORMATS = ((FIELD_POSITION, "ff"), (FIELD_HEALTH, "h"), (FIELD_AMMO, "H"))
+_FULL_MASK = FIELD_POSITION | FIELD_HEALTH | FIELD_AMMO
+_ENTRIES = tuple(
+    struct.Struct("!HB" + "".join(fmt for bit, fmt in _FIELD_FORMATS if mask & bit)) for mask in range(_FULL_MASK + 1)
+)
+_ENTRY_MASK_OFFSET = 2
+_INDEX = struct.Struct("!H")
+_TYPE_AND_INDEX = struct.Struct("!BH")
+
+_TYPE_CODES = {
+    MessageType.JOIN: 0,
+    MessageType.MOVE: 1,
+    MessageType.FIRE: 2,
+    MessageType.SNAPSHOT: 3,
+    MessageType.PING: 4,
+    MessageType.ACK: 5,
+}
+_TYPES = tuple(sorted(_TYPE_CODES, key=_TYPE_CODES.__getitem__))
+_MAX_FRAME = 0xFFFF
+
+
+class CodecError(ValueError):
+    pass
+
+
+class BinaryCodec:
+    """Struct-packed codec for :class:`Message` with interned player indexes.
+
+    The server interns player ids as they join and announces each mapping with
+    a binary JOIN frame (index in the header, utf-8 id as payload); decoding
+    those frames teaches the client the same table. An ``authoritative`` codec
+    owns the table and never learns mappings from decoded frames. Released
+    indexes are handed out again, lowest first; the JOIN announcing the new id
+    replaces the stale mapping on clients.
+    """
+
+    def __init__(self, authoritative: bool = False) -> None:
+        self.authoritative = authoritative
+        self._names: Dict[int, str] = {SERVER_INDEX: "server"}
+        self._indexes: Dict[str, int] = {"server": SERVER_INDEX}
+        self._next_index = 0
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._indexes) - 1
+
+    def __contains__(self, player_id: object) -> bool:
+        return player_id in self._indexes
+
+    def intern(self, player_id: str) -> int:
+        index = self._indexes.get(player_id)
+        if index is None:
+            if self._free:
+                index = heapq.heappop(self._free)
+            elif self._next_index >= SERVER_INDEX:
+                raise CodecError("player index space exhausted")
+            else:
+                index = self._next_index
+                self._next_index += 1
+            self.learn(index, player_id)
+        return index
+
+    def release(self, player_id: str) -> None:
+        """Forget ``player_id`` and make its index available to the next :meth:`intern`."""
+        index = self._indexes.get(player_id)
+        if index is None or index == SERVER_INDEX:
+            return
+        del self._indexes[player_id]
+        del self._names[index]
+        heapq.heappush(self._free, index)
+
+    def learn(self, index: int, player_id: str) -> None:
+        stale_name = self._names.get(index)
+        if stale_name is not None and stale_name != player_id:
+            del self._indexes[stale_name]
+        stale_index = self._indexes.get(player_id)
+        if stale_index is not None and stale_index != index:
+            del self._names[stale_index]
+        self._names[index] = player_id
+        self._indexes[player_id] = index
+
+    def index_of(self, player_id: str) -> int:
+        try:
+            return self._indexes[player_id]
+        except KeyError:
+            raise CodecError(f"player {player_id!r} has no interned index") from None
+
+    def name_of(self, index: int) -> str:
+        try:
+            return self._names[index]
+        except KeyError:
+            raise CodecError(f"unknown player index {index}") from None
+
+    def roster(self) -> bytes:
+        return b"".join(
+            self.encode(Message.join(player_id)) for player_id in self._indexes if player_id != "server"
+        )
+
+    def encode(self, message: Message) -> bytes:
+        payload = message.payload or {}
+        kind = message.type
+        if kind is MessageType.MOVE:
+            body = _MOVE.pack(payload.get("dx", 0.0), payload.get("dy", 0.0))
+        elif kind is MessageType.SNAPSHOT:
+            body = self._encode_snapshot(payload)
+        elif kind is MessageType.ACK:
+            body = _ACK.pack(payload["seq"])
+        elif kind is MessageType.JOIN:
+            body = message.player_id.encode("utf-8")
+        else:
+            body = b""
+        length = _HEADER.size - _LENGTH.size + len(body)
+        if length > _MAX_FRAME:
+            raise CodecError(f"{kind.value} frame too large ({length} bytes)")
+        return _HEADER.pack(length, _TYPE_CODES[kind], self.index_of(message.player_id)) + body
+
+    def decode(self, frame: bytes) -> Message:
+        """Decode a frame body as returned by :func:`read_frame` (without the length prefix)."""
+        try:
+            code, index = _TYPE_AND_INDEX.unpack_from(frame)
+            kind = _TYPES[code]
+        except (struct.error, IndexError):
+            raise CodecError("truncated frame or unknown message type") from None
+        try:
+            if kind is MessageType.JOIN:
+                player_id = frame[3:].decode("utf-8")
+                if not self.authoritative:
+                    self.learn(index, player_id)
+                return Message(kind, player_id, {"index": index})
+            player_id = self.name_of(index)
+            if kind is MessageType.MOVE:
+                dx, dy = _MOVE.unpack_from(frame, 3)
+                return Message(kind, player_id, {"dx": dx, "dy": dy})
+            if kind is MessageType.SNAPSHOT:
+                return Message(kind, player_id, self._decode_snapshot(memoryview(frame)[3:]))
+            if kind is MessageType.ACK:
+                return Message(kind, player_id, {"seq": _ACK.unpack_from(frame, 3)[0]})
+        except (struct.error, IndexError, UnicodeDecodeError) as exc:
+            raise CodecError(f"malformed {kind.value} frame") from exc
+        return Message(kind, player_id, {})
+
+    def _encode_snapshot(self, payload: Dict[str, Any]) -> bytes:
+        players = payload.get("players", {})
+        removed = payload.get("removed", ())
+        base = payload.get("base")
+        parts = [_SNAPSHOT.pack(payload["seq"], NO_BASE if base is None else base, len(players), len(removed))]
+        index_of = self.index_of
+        append = parts.append
+        pack_full = _ENTRIES[_FULL_MASK].pack
+        pack_position = _ENTRIES[FIELD_POSITION].pack
+        for player_id, fields in players.items():
+            position = fields.get("position")
+            health = fields.get("health")
+            ammo = fields.get("ammo")
+            mask = (
+                (FIELD_POSITION if position is not None else 0)
+                | (FIELD_HEALTH if health is not None else 0)
+                | (FIELD_AMMO if ammo is not None else 0)
+            )
+            # Full entries and position-only deltas dominate; the rest go through the generic path.
+            if mask == _FULL_MASK:
+                append(pack_full(index_of(player_id), mask, position[0], position[1], health, ammo))
+            elif mask == FIELD_POSITION:
+                append(pack_position(index_of(player_id), mask, position[0], position[1]))
+            else:
+                values: List[Any] = list(position) if position is not None else []
+                if health is not None:
+                    values.append(health)
+                if ammo is not None:
+                    values.append(ammo)
+                append(_ENTRIES[mask].pack(index_of(player_id), mask, *values))
+        parts.extend(_INDEX.pack(index_of(player_id)) for player_id in removed)
+        return b"".join(parts)
+
+    def _decode_snapshot(self, body: memoryview) -> Dict[str, Any]:
+        seq, base, count, removed_count = _SNAPSHOT.unpack_from(body)
+        offset = _SNAPSHOT.size
+        players: Dict[str, Dict[str, Any]] = {}
+        name_of = self.name_of
+        full = _ENTRIES[_FULL_MASK]
+        entries_end = len(body) - removed_count * _INDEX.size
+        if entries_end - offset == count * full.size:
+            # Every other mask packs shorter, so a block this size can only hold full entries.
+            for index, mask, x, y, health, ammo in full.iter_unpack(body[offset:entries_end]):
+                if mask != _FULL_MASK:
+                    raise CodecError("malformed snapshot entries")
+                players[name_of(index)] = {"position": [x, y], "health": health, "ammo": ammo}
+            offset = entries_end
+        else:
+            for _ in range(count):
+                entry = _ENTRIES[body[offset + _ENTRY_MASK_OFFSET] & _FULL_MASK]
+                values = entry.unpack_from(body, offset)
+                offset += entry.size
+                mask = values[1]
+                fields: Dict[str, Any] = {}
+                field = 2
+                if mask & FIELD_POSITION:
+                    fields["position"] = [values[2], values[3]]
+                    field = 4
+                if mask & FIELD_HEALTH:
+                    fields["health"] = values[field]
+                    field += 1
+                if mask & FIELD_AMMO:
+                    fields["ammo"] = values[field]
+                players[name_of(values[0])] = fields
+        removed: List[str] = [
+            name_of(index) for (index,) in _INDEX.iter_unpack(body[offset : offset + removed_count * _INDEX.size])
+        ]
+        return {"seq": seq, "base": None if base == NO_BASE else base, "players": players, "removed": removed}
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes | None:
+    """Read one length-prefixed frame, returning None on a clean or truncated EOF."""
+    try:
+        (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+        return await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Tuple
+from typing import Any, Dict, List, Sequence, Tuple
 
 
 @dataclass
@@ -47,6 +47,9 @@ class WorldState:
             self.players[player_id] = PlayerState(player_id=player_id)
         return self.players[player_id]
 
+    def remove_player(self, player_id: str) -> None:
+        self.players.pop(player_id, None)
+
     def move_player(self, player_id: str, delta: Tuple[float, float]) -> PlayerState:
         player = self.ensure_player(player_id)
         player.move(delta)
@@ -56,3 +59,16 @@ class WorldState:
         player = self.ensure_player(player_id)
         damage = player.fire(self.tick)
         return player, damage
+
+    def move_players(self, player_ids: Sequence[str], deltas: Sequence[Tuple[float, float]]) -> None:
+        for player_id, delta in zip(player_ids, deltas):
+            self.move_player(player_id, delta)
+
+    def fire_weapons(self, player_ids: Sequence[str]) -> List[int]:
+        return [self.fire_weapon(player_id)[1] for player_id in player_ids]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            pid: {"position": player.position, "health": player.health, "ammo": player.ammo}
+            for pid, player in self.players.items()
+        }
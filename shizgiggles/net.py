@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+from dataclasses import dataclass
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+LOOP_AUTO = "auto"
+LOOP_ASYNCIO = "asyncio"
+LOOP_UVLOOP = "uvloop"
+LOOP_CHOICES = (LOOP_AUTO, LOOP_ASYNCIO, LOOP_UVLOOP)
+
+
+@dataclass(frozen=True)
+class SocketOptions:
+    """Socket tuning shared by both servers.
+
+    ``nodelay`` disables Nagle's algorithm on every accepted connection so small
+    snapshot frames leave immediately. Buffer sizes of ``None`` keep the kernel
+    defaults; ``reuse_port`` lets several processes bind the same port.
+    """
+
+    nodelay: bool = True
+    send_buffer: int | None = None
+    recv_buffer: int | None = None
+    reuse_port: bool = False
+
+
+def install_event_loop(name: str = LOOP_AUTO) -> str:
+    """Install the requested event loop policy and return the implementation in use.
+
+    ``auto`` picks uvloop when it is installed; asking for ``uvloop`` explicitly
+    falls back to the stdlib loop with a warning when it is not.
+    """
+    if name not in LOOP_CHOICES:
+        raise ValueError(f"unknown event loop {name!r}")
+    if name == LOOP_ASYNCIO:
+        return LOOP_ASYNCIO
+    try:
+        import uvloop
+    except ImportError:
+        if name == LOOP_UVLOOP:
+            logger.warning("uvloop requested but not installed; using the asyncio event loop")
+        return LOOP_ASYNCIO
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return LOOP_UVLOOP
+
+
+def listen_kwargs(options: SocketOptions) -> Dict[str, Any]:
+    """Extra ``asyncio.start_server`` arguments for ``options``."""
+    if not options.reuse_port:
+        return {}
+    if not hasattr(socket, "SO_REUSEPORT"):
+        logger.warning("SO_REUSEPORT is not supported on this platform; binding without it")
+        return {}
+    return {"reuse_port": True}
+
+
+def tune_server(server: asyncio.AbstractServer, options: SocketOptions) -> None:
+    """Size the listening sockets' buffers; accepted connections inherit them."""
+    for sock in server.sockets:
+        if options.send_buffer:
+            _setsockopt(sock, socket.SOL_SOCKET, socket.SO_SNDBUF, options.send_buffer)
+        if options.recv_buffer:
+            _setsockopt(sock, socket.SOL_SOCKET, socket.SO_RCVBUF, options.recv_buffer)
+
+
+def tune_connection(writer: asyncio.StreamWriter, options: SocketOptions) -> None:
+    sock = writer.get_extra_info("socket")
+    if sock is None or sock.family not in (socket.AF_INET, socket.AF_INET6):
+        return
+    # The stdlib loop already sets this; be explicit so it holds for any loop implementation.
+    _setsockopt(sock, socket.IPPROTO_TCP, socket.TCP_NODELAY, int(options.nodelay))
+
+
+def _setsockopt(sock: Any, level: int, option: int, value: int) -> None:
+    try:
+        sock.setsockopt(level, option, value)
+    except OSError as exc:
+        logger.debug("setsockopt(%s, %s) failed: %s", level, option, exc)
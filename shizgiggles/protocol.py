@@ -3,7 +3,9 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, List, Tuple
+
+SnapshotState = Dict[str, Dict[str, Any]]
 
 
 class MessageType(str, Enum):
@@ -12,6 +14,7 @@ class MessageType(str, Enum):
     FIRE = "fire"
     SNAPSHOT = "snapshot"
     PING = "ping"
+    ACK = "ack"
 
 
 @dataclass
@@ -38,14 +41,51 @@ class Message:
         return Message(type=MessageType.FIRE, player_id=player_id, payload={})
 
     @staticmethod
-    def join(player_id: str) -> "Message":
-        return Message(type=MessageType.JOIN, player_id=player_id, payload={})
+    def join(player_id: str, delta_snapshots: bool = False, codec: str | None = None) -> "Message":
+        payload: Dict[str, Any] = {"snapshots": "delta"} if delta_snapshots else {}
+        if codec is not None:
+            payload["codec"] = codec
+        return Message(type=MessageType.JOIN, player_id=player_id, payload=payload)
 
     @staticmethod
     def ping(player_id: str) -> "Message":
         return Message(type=MessageType.PING, player_id=player_id, payload={})
 
+    @staticmethod
+    def ack(player_id: str, seq: int) -> "Message":
+        return Message(type=MessageType.ACK, player_id=player_id, payload={"seq": seq})
+
+    @staticmethod
+    def snapshot(
+        seq: int, players: SnapshotState, base: int | None = None, removed: Iterable[str] = ()
+    ) -> "Message":
+        payload = {"seq": seq, "base": base, "players": players, "removed": list(removed)}
+        return Message(type=MessageType.SNAPSHOT, player_id="server", payload=payload)
+
     @classmethod
     def from_json(cls, payload: str) -> "Message":
         data = json.loads(payload)
         return cls(type=MessageType(data["type"]), player_id=data["player_id"], payload=data.get("payload", {}))
+
+
+def diff_snapshot(base: SnapshotState, current: SnapshotState) -> Tuple[SnapshotState, List[str]]:
+    """Return the per-player fields that changed since ``base`` and the players that left."""
+    changed: SnapshotState = {}
+    for player_id, fields in current.items():
+        previous = base.get(player_id)
+        if previous is None:
+            changed[player_id] = dict(fields)
+            continue
+        delta = {key: value for key, value in fields.items() if previous.get(key) != value}
+        if delta:
+            changed[player_id] = delta
+    removed = [player_id for player_id in base if player_id not in current]
+    return changed, removed
+
+
+def apply_snapshot_delta(base: SnapshotState, players: SnapshotState, removed: Iterable[str] = ()) -> SnapshotState:
+    removed = set(removed)
+    state = {player_id: dict(fields) for player_id, fields in base.items() if player_id not in removed}
+    for player_id, fields in players.items():
+        state.setdefault(player_id, {}).update(fields)
+    return state
@@ -3,85 +3,407 @@ from __future__ import annotations
 import argparse
 import asyncio
 import logging
-from typing import Dict
+import math
+from collections import OrderedDict, deque
+from enum import Enum
+from typing import TYPE_CHECKING, Deque, Dict, List, Tuple
 
+from shizgiggles.codec import BINARY_CODEC, JSON_CODEC, BinaryCodec, CodecError, read_frame
 from shizgiggles.logic import WorldState
-from shizgiggles.protocol import Message, MessageType
+from shizgiggles.net import (
+    LOOP_AUTO,
+    LOOP_CHOICES,
+    SocketOptions,
+    install_event_loop,
+    listen_kwargs,
+    tune_connection,
+    tune_server,
+)
+from shizgiggles.protocol import Message, MessageType, SnapshotState, diff_snapshot
+
+if TYPE_CHECKING:
+    from shizgiggles.array_world import ArrayWorldState
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TICK_RATE = 10
+DEFAULT_OUTBOUND_QUEUE = 32
+DEFAULT_KEYFRAME_INTERVAL = 30
+
+_PONG = (Message.ping("server").to_json() + "\n").encode()
+
+
+def _move_delta(payload: object) -> Tuple[float, float] | None:
+    """The ``(dx, dy)`` of a MOVE payload, or None unless both are finite numbers."""
+    if not isinstance(payload, dict):
+        return None
+    try:
+        delta = (float(payload.get("dx", 0)), float(payload.get("dy", 0)))
+    except (TypeError, ValueError):
+        return None
+    return delta if math.isfinite(delta[0]) and math.isfinite(delta[1]) else None
+
+
+class OverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop-oldest"
+    DISCONNECT = "disconnect"
+
+
+class ClientConnection:
+    """Bounded per-client outbound queue drained by its own writer task.
+
+    A slow reader only backs up its own queue. Snapshots are queued as
+    droppable so ``DROP_OLDEST`` can discard stale ones on overflow.
+    """
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        max_queue: int = DEFAULT_OUTBOUND_QUEUE,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ) -> None:
+        if max_queue <= 0:
+            raise ValueError("max_queue must be positive")
+        self.writer = writer
+        self.max_queue = max_queue
+        self.policy = policy
+        self.codec = JSON_CODEC
+        self.dropped = 0
+        self.closed = False
+        self._queue: Deque[Tuple[bool, bytes]] = deque()
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._write_loop())
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def send(self, data: bytes, droppable: bool = False) -> bool:
+        if self.closed:
+            return False
+        if len(self._queue) >= self.max_queue and not self._make_room():
+            logger.warning("Outbound queue overflow, disconnecting %s", self.writer.get_extra_info("peername"))
+            self.close()
+            return False
+        self._queue.append((droppable, data))
+        self._ready.set()
+        return True
+
+    def _make_room(self) -> bool:
+        if self.policy != OverflowPolicy.DROP_OLDEST:
+            return False
+        for index, (droppable, _) in enumerate(self._queue):
+            if droppable:
+                del self._queue[index]
+                self.dropped += 1
+                return True
+        return False
+
+    async def _write_loop(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._queue:
+                    _, data = self._queue.popleft()
+                    self.writer.write(data)
+                    await self.writer.drain()
+        except ConnectionError:
+            self.closed = True
+            self._queue.clear()
+
+    def close(self) -> None:
+        self.closed = True
+        self._queue.clear()
+        self._task.cancel()
+        self.writer.close()
+
 
 class GameServer:
-    def __init__(self, host: str = "0.0.0.0", port: int = 8765) -> None:
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8765,
+        tick_rate: int = DEFAULT_TICK_RATE,
+        max_outbound_queue: int = DEFAULT_OUTBOUND_QUEUE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+        world: WorldState | ArrayWorldState | None = None,
+        socket_options: SocketOptions | None = None,
+    ) -> None:
+        if tick_rate <= 0:
+            raise ValueError("tick_rate must be positive")
+        if keyframe_interval <= 0:
+            raise ValueError("keyframe_interval must be positive")
         self.host = host
         self.port = port
-        self.world = WorldState()
-        self._clients: Dict[str, asyncio.StreamWriter] = {}
+        self.tick_rate = tick_rate
+        self.max_outbound_queue = max_outbound_queue
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.keyframe_interval = keyframe_interval
+        self.world = world if world is not None else WorldState()
+        self.socket_options = socket_options or SocketOptions()
+        self._clients: Dict[str, ClientConnection] = {}
+        # Per player, the (dx, dy) of each queued move, or None for a shot.
+        self._inputs: Dict[str, Deque[Tuple[float, float] | None]] = {}
+        # Delta-mode clients mapped to the last snapshot seq they acknowledged (-1 until the first ACK).
+        self._acked: Dict[str, int] = {}
+        self._history: "OrderedDict[int, SnapshotState]" = OrderedDict()
+        self._codec = BinaryCodec(authoritative=True)
+        # Departed players mapped to the first snapshot seq without them; their index is
+        # released once no remembered snapshot (and so no delta baseline) mentions them.
+        self._departed: Dict[str, int] = {}
+        self._binary_pong = self._codec.encode(Message.ping("server"))
         self._server: asyncio.AbstractServer | None = None
 
     async def start(self) -> None:
-        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
-        logger.info("Server listening on %s:%s", self.host, self.port)
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, **listen_kwargs(self.socket_options)
+        )
+        tune_server(self._server, self.socket_options)
+        logger.info("Server listening on %s:%s (%s Hz)", self.host, self.port, self.tick_rate)
 
     async def stop(self) -> None:
+        for connection in list(self._clients.values()):
+            connection.close()
+        self._clients.clear()
         if self._server:
             self._server.close()
             await self._server.wait_closed()
             logger.info("Server stopped")
 
+    def queue_input(self, player_id: str, message: Message) -> bool:
+        """Queue a MOVE or FIRE for ``player_id``'s next tick; False if it was malformed and dropped."""
+        if message.type == MessageType.MOVE:
+            delta = _move_delta(message.payload)
+            if delta is None:
+                return False
+        elif message.type == MessageType.FIRE:
+            delta = None
+        else:
+            return False
+        self._inputs.setdefault(player_id, deque()).append(delta)
+        return True
+
+    def apply_inputs(self) -> int:
+        movers: List[str] = []
+        deltas: List[Tuple[float, float]] = []
+        shooters: List[str] = []
+        for player_id, queue in self._inputs.items():
+            while queue:
+                delta = queue.popleft()
+                if delta is None:
+                    shooters.append(player_id)
+                else:
+                    movers.append(player_id)
+                    deltas.append(delta)
+        self.world.move_players(movers, deltas)
+        self.world.fire_weapons(shooters)
+        return len(movers) + len(shooters)
+
+    async def tick(self) -> None:
+        self.apply_inputs()
+        self.world.step()
+        await self.broadcast_snapshot()
+
+    async def run_ticks(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        deadline = loop.time()
+        while True:
+            await self.tick()
+            deadline += interval
+            delay = deadline - loop.time()
+            if delay < 0:
+                # Fell behind; resynchronise instead of bursting to catch up.
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def _remember_snapshot(self, seq: int, state: SnapshotState) -> None:
+        self._history[seq] = state
+        while len(self._history) > self.keyframe_interval:
+            self._history.popitem(last=False)
+        oldest = next(iter(self._history))
+        for player_id, departed_at in list(self._departed.items()):
+            if oldest >= departed_at:
+                del self._departed[player_id]
+                self._codec.release(player_id)
+
+    def _baseline_for(self, player_id: str, seq: int) -> int | None:
+        if seq % self.keyframe_interval == 0:
+            return None
+        acked = self._acked.get(player_id, -1)
+        return acked if acked in self._history else None
+
+    def _snapshot_message(self, seq: int, state: SnapshotState, base: int | None) -> Message:
+        if base is None:
+            return Message.snapshot(seq, state)
+        players, removed = diff_snapshot(self._history[base], state)
+        return Message.snapshot(seq, players, base=base, removed=removed)
+
+    def _intern(self, player_id: str) -> int:
+        if player_id in self._codec:
+            return self._codec.index_of(player_id)
+        index = self._codec.intern(player_id)
+        announcement = self._codec.encode(Message.join(player_id))
+        for connection in self._clients.values():
+            if connection.codec == BINARY_CODEC:
+                connection.send(announcement)
+        return index
+
+    def _encode(self, connection: ClientConnection, message: Message) -> bytes:
+        if connection.codec == BINARY_CODEC:
+            return self._codec.encode(message)
+        return (message.to_json() + "\n").encode()
+
     async def broadcast_snapshot(self) -> None:
-        snapshot = {
-            pid: {"position": player.position, "health": player.health, "ammo": player.ammo}
-            for pid, player in self.world.players.items()
-        }
-        message = Message(type=MessageType.SNAPSHOT, player_id="server", payload=snapshot).to_json() + "\n"
-        for writer in list(self._clients.values()):
+        state = self.world.snapshot()
+        seq = self.world.tick
+        if any(connection.codec == BINARY_CODEC for connection in self._clients.values()):
             try:
-                writer.write(message.encode())
-                await writer.drain()
-            except ConnectionResetError:
-                continue
+                for player_id in state:
+                    self._intern(player_id)
+            except CodecError as exc:
+                logger.error("Cannot intern snapshot players: %s", exc)
+        # Clients sharing a codec and baseline share one encoded frame.
+        frames: Dict[Tuple[str, bool, int | None], bytes] = {}
+        messages: Dict[int | None, Message] = {}
+        for player_id, connection in list(self._clients.items()):
+            delta = player_id in self._acked
+            base = self._baseline_for(player_id, seq) if delta else None
+            key = (connection.codec, delta, base)
+            frame = frames.get(key)
+            if frame is None:
+                if delta or connection.codec == BINARY_CODEC:
+                    message = messages.get(base)
+                    if message is None:
+                        message = messages[base] = self._snapshot_message(seq, state, base)
+                else:
+                    message = Message(type=MessageType.SNAPSHOT, player_id="server", payload=state)
+                try:
+                    frame = self._encode(connection, message)
+                except CodecError as exc:
+                    # Skip this tick's frame for these clients rather than stopping the tick loop.
+                    logger.error("Cannot encode %s snapshot %d: %s", connection.codec, seq, exc)
+                    frame = b""
+                frames[key] = frame
+            if frame:
+                connection.send(frame, droppable=True)
+        self._remember_snapshot(seq, state)
+
+    def _join(self, connection: ClientConnection, message: Message) -> None:
+        player_id = message.player_id
+        options = message.payload or {}
+        if options.get("snapshots") == "delta":
+            self._acked[player_id] = -1
+        else:
+            self._acked.pop(player_id, None)
+        self.world.ensure_player(player_id)
+        self._departed.pop(player_id, None)
+        if "codec" in options:
+            codec = BINARY_CODEC if options["codec"] == BINARY_CODEC else JSON_CODEC
+            reply: Dict[str, object] = {"codec": codec}
+            if codec == BINARY_CODEC:
+                reply["index"] = self._intern(player_id)
+            connection.send(self._encode(connection, Message(MessageType.JOIN, "server", reply)))
+            if codec == BINARY_CODEC:
+                connection.codec = BINARY_CODEC
+                connection.send(self._codec.roster())
+        self._clients[player_id] = connection
 
     async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
         peername = writer.get_extra_info("peername")
         logger.info("Connection from %s", peername)
+        tune_connection(writer, self.socket_options)
+        connection = ClientConnection(writer, self.max_outbound_queue, self.overflow_policy)
         player_id = None
-        while True:
-            raw = await reader.readline()
-            if not raw:
-                if player_id and player_id in self._clients:
-                    del self._clients[player_id]
-                writer.close()
+        try:
+            while True:
+                try:
+                    if connection.codec == BINARY_CODEC:
+                        frame = await read_frame(reader)
+                        if frame is None:
+                            break
+                        try:
+                            message = self._codec.decode(frame)
+                        except CodecError as exc:
+                            logger.warning("Dropping frame from %s: %s", peername, exc)
+                            continue
+                    else:
+                        raw = await reader.readline()
+                        if not raw:
+                            break
+                        try:
+                            message = Message.from_json(raw.decode())
+                        except (ValueError, KeyError, TypeError) as exc:
+                            logger.warning("Dropping message from %s: %s", peername, exc)
+                            continue
+                except ConnectionError:
+                    # A reset peer is a disconnect too.
+                    break
+                if message.type == MessageType.JOIN:
+                    if connection.codec == BINARY_CODEC:
+                        continue
+                    player_id = message.player_id
+                    self._join(connection, message)
+                elif message.type in (MessageType.MOVE, MessageType.FIRE):
+                    # Inputs count only once joined, and always for the joined player.
+                    if player_id is not None and not self.queue_input(player_id, message):
+                        logger.warning("Dropping malformed move from %s", peername)
+                elif message.type == MessageType.ACK:
+                    if player_id in self._acked:
+                        try:
+                            seq = int((message.payload or {}).get("seq", -1))
+                        except (AttributeError, TypeError, ValueError, OverflowError):
+                            logger.warning("Dropping malformed ack from %s", peername)
+                            continue
+                        self._acked[player_id] = max(self._acked[player_id], seq)
+                elif message.type == MessageType.PING:
+                    connection.send(self._binary_pong if connection.codec == BINARY_CODEC else _PONG)
+        finally:
+            if player_id and self._clients.get(player_id) is connection:
+                del self._clients[player_id]
+                self._inputs.pop(player_id, None)
+                self._acked.pop(player_id, None)
+                self.world.remove_player(player_id)
+                if player_id in self._codec:
+                    self._departed[player_id] = self.world.tick + 1
+            connection.close()
+            try:
                 await writer.wait_closed()
-                logger.info("Disconnected %s", peername)
-                return
-            message = Message.from_json(raw.decode())
-            if message.type == MessageType.JOIN:
-                player_id = message.player_id
-                self._clients[player_id] = writer
-                self.world.ensure_player(player_id)
-                await self.broadcast_snapshot()
-            elif message.type == MessageType.MOVE:
-                delta = (float(message.payload.get("dx", 0)), float(message.payload.get("dy", 0)))
-                self.world.move_player(message.player_id, delta)
-                await self.broadcast_snapshot()
-            elif message.type == MessageType.FIRE:
-                self.world.fire_weapon(message.player_id)
-                await self.broadcast_snapshot()
-            elif message.type == MessageType.PING:
-                writer.write((Message.ping("server").to_json() + "\n").encode())
-                await writer.drain()
-
-
-async def run_server(host: str, port: int) -> None:
-    server = GameServer(host, port)
+            except ConnectionError:
+                pass
+            logger.info("Disconnected %s", peername)
+
+async def run_server(
+    host: str,
+    port: int,
+    tick_rate: int = DEFAULT_TICK_RATE,
+    max_outbound_queue: int = DEFAULT_OUTBOUND_QUEUE,
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    array_world: bool = False,
+    socket_options: SocketOptions | None = None,
+) -> None:
+    world = None
+    if array_world:
+        from shizgiggles.array_world import ArrayWorldState
+
+        world = ArrayWorldState()
+    server = GameServer(
+        host,
+        port,
+        tick_rate=tick_rate,
+        max_outbound_queue=max_outbound_queue,
+        overflow_policy=overflow_policy,
+        keyframe_interval=keyframe_interval,
+        world=world,
+        socket_options=socket_options,
+    )
     await server.start()
     try:
-        while True:
-            await asyncio.sleep(0.1)
-            server.world.step()
-            if server.world.tick % 10 == 0:
-                await server.broadcast_snapshot()
+        await server.run_ticks()
     except asyncio.CancelledError:
         pass
     finally:
@@ -92,11 +414,58 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Run Shiz-and-giggles dedicated server")
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick-rate", type=int, default=DEFAULT_TICK_RATE, help="Simulation and snapshot rate in Hz")
+    parser.add_argument(
+        "--max-outbound-queue",
+        type=int,
+        default=DEFAULT_OUTBOUND_QUEUE,
+        help="Queued messages per client before overflow",
+    )
+    parser.add_argument(
+        "--overflow-policy",
+        choices=[policy.value for policy in OverflowPolicy],
+        default=OverflowPolicy.DROP_OLDEST.value,
+        help="What to do when a slow client's outbound queue is full",
+    )
+    parser.add_argument(
+        "--keyframe-interval",
+        type=int,
+        default=DEFAULT_KEYFRAME_INTERVAL,
+        help="Ticks between full snapshots for delta-mode clients",
+    )
+    parser.add_argument(
+        "--array-world", action="store_true", help="Use the NumPy-backed world (requires the 'fast' extra)"
+    )
+    parser.add_argument(
+        "--loop", choices=LOOP_CHOICES, default=LOOP_AUTO, help="Event loop implementation (auto prefers uvloop)"
+    )
+    parser.add_argument("--no-nodelay", action="store_true", help="Leave Nagle's algorithm enabled on client sockets")
+    parser.add_argument("--send-buffer", type=int, help="SO_SNDBUF size in bytes (default: kernel default)")
+    parser.add_argument("--recv-buffer", type=int, help="SO_RCVBUF size in bytes (default: kernel default)")
+    parser.add_argument("--reuse-port", action="store_true", help="Bind with SO_REUSEPORT")
     parser.add_argument("--log-level", default="INFO")
     args = parser.parse_args()
 
     logging.basicConfig(level=args.log_level.upper(), format="[%(asctime)s] %(levelname)s %(message)s")
-    asyncio.run(run_server(args.host, args.port))
+    logger.info("Using the %s event loop", install_event_loop(args.loop))
+    socket_options = SocketOptions(
+        nodelay=not args.no_nodelay,
+        send_buffer=args.send_buffer,
+        recv_buffer=args.recv_buffer,
+        reuse_port=args.reuse_port,
+    )
+    asyncio.run(
+        run_server(
+            args.host,
+            args.port,
+            args.tick_rate,
+            max_outbound_queue=args.max_outbound_queue,
+            overflow_policy=OverflowPolicy(args.overflow_policy),
+            keyframe_interval=args.keyframe_interval,
+            array_world=args.array_world,
+            socket_options=socket_options,
+        )
+    )
 
 
 if __name__ == "__main__":
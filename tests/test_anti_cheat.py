@@ -0,0 +1,34 @@
+from server.anti_cheat import AntiCheat, RateLimiter, RateLimiterTable
+from server.metrics import Metrics
+
+
+def test_new_limiter_starts_with_full_bucket():
+    limiter = RateLimiter(capacity=2, refill_per_second=1, last_refill=100.0)
+    assert not hasattr(limiter, "__dict__")
+    assert limiter.allow(100.0) and limiter.allow(100.0)
+    assert not limiter.allow(100.0)
+    assert limiter.allow(101.0)
+
+
+def test_table_evicts_idle_and_caps_tracked_clients():
+    metrics = Metrics()
+    table = RateLimiterTable(metrics, capacity=5, refill_per_second=5, max_clients=3, idle_seconds=10.0)
+    for idx in range(4):
+        table.allow(f"10.0.0.{idx}:5000", now=float(idx))
+    assert len(table) == 3
+    assert "10.0.0.0:5000" not in table
+
+    table.allow("10.0.0.1:5000", now=5.0)
+    table.allow("10.0.0.9:5000", now=14.0)
+    assert "10.0.0.2:5000" not in table and "10.0.0.3:5000" not in table
+    assert "10.0.0.1:5000" in table and "10.0.0.9:5000" in table
+    assert metrics.get("rate_limiter_evictions") == 3
+    assert metrics.gauges()["rate_limiter_clients"] == 2
+
+
+def test_anti_cheat_forgets_disconnected_clients():
+    anti_cheat = AntiCheat(Metrics(), rate_limit_per_second=1, max_message_size=16)
+    assert anti_cheat.allow_message("1.2.3.4:1")
+    assert not anti_cheat.allow_message("1.2.3.4:1")
+    anti_cheat.forget_client("1.2.3.4:1")
+    assert anti_cheat.allow_message("1.2.3.4:1")
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from shizgiggles.array_world import ArrayWorldState  # noqa: E402
+from shizgiggles.logic import WorldState  # noqa: E402
+
+
+def test_array_world_matches_dataclass_world():
+    rng = random.Random(7)
+    reference = WorldState()
+    world = ArrayWorldState(capacity=2)
+    ids = [f"p{idx}" for idx in range(5)]
+    for _ in range(20):
+        movers = [rng.choice(ids) for _ in range(12)]
+        deltas = [(rng.uniform(-40, 40), rng.uniform(-40, 40)) for _ in movers]
+        shooters = [rng.choice(ids) for _ in range(6)]
+        reference.move_players(movers, deltas)
+        world.move_players(movers, deltas)
+        assert world.fire_weapons(shooters) == reference.fire_weapons(shooters)
+        reference.step()
+        world.step()
+
+    assert world.capacity >= 5
+    expected = reference.snapshot()
+    actual = world.snapshot()
+    assert actual.keys() == expected.keys()
+    for player_id, fields in expected.items():
+        assert actual[player_id]["position"] == pytest.approx(list(fields["position"]))
+        assert actual[player_id]["ammo"] == fields["ammo"]
+        assert world.players[player_id].velocity == pytest.approx(reference.players[player_id].velocity)
+
+
+def test_single_player_api_and_slot_reuse():
+    world = ArrayWorldState(capacity=1)
+    player = world.move_player("p1", (150.0, -3.0))
+    assert player.position == (100.0, -3.0)
+    _, damage = world.fire_weapon("p1")
+    assert damage == 10
+    _, damage = world.fire_weapon("p1")
+    assert damage == 0
+    assert world.ensure_player("p1").ammo == 29
+
+    world.remove_player("p1")
+    fresh = world.ensure_player("p2")
+    assert fresh.slot == player.slot
+    assert fresh.position == (0.0, 0.0) and fresh.ammo == 30
+
+
+def test_flooded_inputs_match_sequential_moves_and_shots():
+    rng = random.Random(3)
+    reference = WorldState()
+    world = ArrayWorldState(capacity=4, fire_rate=0)
+    # One client floods hundreds of moves that keep hitting the walls; others send one each.
+    movers = ["flooder"] * 500 + [f"p{idx}" for idx in range(8)]
+    rng.shuffle(movers)
+    deltas = [(rng.uniform(-90, 90), rng.uniform(-90, 90)) for _ in movers]
+    reference.move_players(movers, deltas)
+    world.move_players(movers, deltas)
+    for player_id, player in reference.players.items():
+        assert world.players[player_id].position == pytest.approx(player.position)
+        assert world.players[player_id].velocity == pytest.approx(player.velocity)
+
+    # With no fire-rate limit every queued shot fires until the magazine is empty.
+    damages = world.fire_weapons(["flooder"] * 40 + ["p1"])
+    assert damages == [10] * 30 + [0] * 10 + [10]
+    assert world.players["flooder"].ammo == 0
+
+    limited = ArrayWorldState()
+    assert limited.fire_weapons(["p1", "p2", "p1", "p1"]) == [10, 10, 0, 0]
+    limited.step()
+    assert limited.fire_weapons(["p1"]) == [0]
+    limited.step()
+    assert limited.fire_weapons(["p1", "p1"]) == [10, 0]
+    assert limited.players["p1"].ammo == 28
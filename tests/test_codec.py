@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+
+from shizgiggles.codec import BINARY_CODEC, SERVER_INDEX, BinaryCodec, CodecError, read_frame
+from shizgiggles.protocol import Message, MessageType
+from shizgiggles.server import GameServer
+
+
+def _round_trip(server: BinaryCodec, client: BinaryCodec, message: Message) -> Message:
+    frame = server.encode(message)
+    return client.decode(frame[2:])
+
+
+def test_binary_round_trip_uses_interned_indexes():
+    server = BinaryCodec(authoritative=True)
+    client = BinaryCodec()
+    for player_id in ("p1", "p2"):
+        server.intern(player_id)
+        _round_trip(server, client, Message.join(player_id))
+
+    move = _round_trip(server, client, Message.move("p1", (1.0, -1.5)))
+    assert move.type == MessageType.MOVE and move.player_id == "p1"
+    assert move.payload == {"dx": 1.0, "dy": -1.5}
+    assert _round_trip(server, client, Message.fire("p2")).type == MessageType.FIRE
+    assert _round_trip(server, client, Message.ack("p2", 77)).payload == {"seq": 77}
+
+    players = {"p1": {"position": (2.0, 3.0), "health": 80, "ammo": 12}, "p2": {"ammo": 4}}
+    snapshot = _round_trip(server, client, Message.snapshot(9, players, base=7, removed=["p1"]))
+    assert snapshot.payload == {
+        "seq": 9,
+        "base": 7,
+        "players": {"p1": {"position": [2.0, 3.0], "health": 80, "ammo": 12}, "p2": {"ammo": 4}},
+        "removed": ["p1"],
+    }
+    assert len(server.encode(Message.move("p1", (1.0, 0.0)))) < len(Message.move("p1", (1.0, 0.0)).to_json())
+
+
+def test_snapshot_entries_only_carry_flagged_fields():
+    server = BinaryCodec(authoritative=True)
+    client = BinaryCodec()
+    server.intern("p1")
+    _round_trip(server, client, Message.join("p1"))
+
+    full = server.encode(Message.snapshot(2, {"p1": {"position": (1.0, 2.0), "health": 90, "ammo": 5}}))
+    moved = server.encode(Message.snapshot(3, {"p1": {"position": (1.5, 2.0)}}, base=2))
+    healed = server.encode(Message.snapshot(4, {"p1": {"health": 100}}, base=3))
+    # index + mask, then two floats for a position-only delta and a single short for health.
+    assert len(full) - len(moved) == 4
+    assert len(moved) - len(healed) == 6
+    assert client.decode(moved[2:]).payload["players"] == {"p1": {"position": [1.5, 2.0]}}
+    assert client.decode(healed[2:]).payload["players"] == {"p1": {"health": 100}}
+    with pytest.raises(CodecError):
+        client.decode(moved[2:-1])
+
+
+def test_unknown_index_is_rejected():
+    server = BinaryCodec(authoritative=True)
+    server.intern("p1")
+    with pytest.raises(CodecError):
+        BinaryCodec().decode(server.encode(Message.fire("p1"))[2:])
+    with pytest.raises(CodecError):
+        server.encode(Message.fire("stranger"))
+
+
+def test_binary_codec_negotiated_at_join():
+    async def run():
+        server = GameServer(host="127.0.0.1", port=0)
+        await server.start()
+        host, port, *_ = server._server.sockets[0].getsockname()
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write((Message.join("p1", codec=BINARY_CODEC).to_json() + "\n").encode())
+        await writer.drain()
+
+        reply = Message.from_json((await reader.readline()).decode())
+        assert reply.payload["codec"] == BINARY_CODEC
+        codec = BinaryCodec()
+        codec.learn(reply.payload["index"], "p1")
+        assert codec.decode(await read_frame(reader)).type == MessageType.JOIN
+
+        writer.write(codec.encode(Message.move("p1", (2.0, 0.0))))
+        await writer.drain()
+        await asyncio.sleep(0.01)
+        await server.tick()
+        snapshot = codec.decode(await read_frame(reader))
+        assert snapshot.payload["players"]["p1"]["position"] == [2.0, 0.0]
+
+        writer.close()
+        await writer.wait_closed()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_released_indexes_are_reused_and_remapped():
+    server = BinaryCodec(authoritative=True)
+    client = BinaryCodec()
+    for player_id in ("p1", "p2", "p3"):
+        server.intern(player_id)
+        _round_trip(server, client, Message.join(player_id))
+
+    server.release("p2")
+    server.release("server")
+    assert "p2" not in server and "server" in server
+    assert server.intern("p4") == 1
+    assert server.intern("p5") == 3
+
+    # The announcement for the reused index replaces the client's stale mapping.
+    _round_trip(server, client, Message.join("p4"))
+    assert client.name_of(1) == "p4" and "p2" not in client
+    assert _round_trip(server, client, Message.fire("p4")).player_id == "p4"
+
+
+async def _binary_join(port: int, player_id: str):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((Message.join(player_id, codec=BINARY_CODEC).to_json() + "\n").encode())
+    await writer.drain()
+    reply = Message.from_json((await reader.readline()).decode())
+    return reader, writer, reply.payload["index"]
+
+
+def test_server_reuses_indexes_of_departed_players():
+    async def run():
+        server = GameServer(host="127.0.0.1", port=0, keyframe_interval=2)
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        reader, writer, _ = await _binary_join(port, "p1")
+        codec = BinaryCodec()
+        leaver_reader, leaver_writer, leaver_index = await _binary_join(port, "p2")
+        await asyncio.sleep(0.01)
+        await server.tick()
+
+        leaver_writer.close()
+        await leaver_writer.wait_closed()
+        await asyncio.sleep(0.01)
+        for _ in range(3):
+            await server.tick()
+        assert "p2" not in server.world.players and "p2" not in server._codec
+
+        _, joiner_writer, joiner_index = await _binary_join(port, "p3")
+        assert joiner_index == leaver_index
+        await asyncio.sleep(0.01)
+        await server.tick()
+
+        snapshots = []
+        while len(snapshots) < 5:
+            message = codec.decode(await read_frame(reader))
+            if message.type == MessageType.SNAPSHOT:
+                snapshots.append(message.payload)
+        assert "p2" in snapshots[0]["players"]
+        assert "p2" not in snapshots[-1]["players"] and "p3" in snapshots[-1]["players"]
+
+        for closing in (writer, joiner_writer):
+            closing.close()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_exhausted_index_space_does_not_stop_ticking():
+    async def run():
+        server = GameServer(host="127.0.0.1", port=0)
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        _, writer, _ = await _binary_join(port, "p1")
+        await asyncio.sleep(0.01)
+        server._codec._next_index = SERVER_INDEX
+        server.queue_input("newcomer", Message.move("newcomer", (1.0, 0.0)))
+
+        await server.tick()
+        await server.tick()
+        assert server.world.tick == 2
+
+        writer.close()
+        await server.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,113 @@
+import copy
+import math
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from game.explosions import resolve_explosions  # noqa: E402
+from game.health import HealthArmor  # noqa: E402
+from game.weapons import Actor, RocketProjectile  # noqa: E402
+
+
+def _scenario(seed, actor_count=40, rocket_count=25, extent=12.0):
+    rng = random.Random(seed)
+    actors = [
+        Actor(
+            "shooter" if index == 0 else f"p{index}",
+            health=HealthArmor(health=rng.choice([40, 100, 150]), armor=rng.choice([0, 10, 50])),
+            position=(rng.uniform(-extent, extent), rng.uniform(-extent, extent), rng.uniform(0, 3)),
+            velocity=(rng.uniform(-1, 1), 0.0, 0.0),
+        )
+        for index in range(actor_count)
+    ]
+    rockets = [
+        RocketProjectile(
+            damage=rng.choice([0.0, 60.0, 120.0]),
+            splash_radius=rng.choice([3.0, 6.0]),
+            position=(rng.uniform(-extent, extent), rng.uniform(-extent, extent), rng.uniform(0, 3)),
+            velocity=(0.0, 0.0, 0.0),
+            self_damage_scale=rng.choice([0.0, 0.5]),
+            knockback_force=15.0,
+        )
+        for _ in range(rocket_count)
+    ]
+    # Edge cases: a rocket centred on an actor and an actor exactly on the splash edge.
+    rockets[1].position = actors[3].position
+    x, y, z = rockets[2].position
+    actors[4].position = (x + rockets[2].splash_radius, y, z)
+    return actors, rockets
+
+
+def _assert_reports_equal(batched, scalar):
+    assert len(batched) == len(scalar)
+    for got, want in zip(batched, scalar):
+        assert got.damage_applied == pytest.approx(want.damage_applied)
+        assert got.remaining_health == pytest.approx(want.remaining_health)
+        assert got.remaining_armor == pytest.approx(want.remaining_armor)
+        assert (got.defeated, got.feedback) == (want.defeated, want.feedback)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batched_explosions_match_scalar_path(seed):
+    actors, rockets = _scenario(seed)
+    scalar_actors = copy.deepcopy(actors)
+
+    batched = resolve_explosions(rockets, actors)
+    scalar = [rocket.explode(scalar_actors) for rocket in rockets]
+
+    assert len(batched) == len(scalar)
+    for got, want in zip(batched, scalar):
+        _assert_reports_equal(got.damaged_actors, want.damaged_actors)
+    for got, want in zip(actors, scalar_actors):
+        assert got.health.health == pytest.approx(want.health.health)
+        assert got.health.armor == pytest.approx(want.health.armor)
+        assert got.velocity == pytest.approx(want.velocity)
+
+
+def test_batched_explosions_handle_empty_inputs():
+    actors, rockets = _scenario(0, actor_count=5, rocket_count=3)
+
+    assert resolve_explosions([], actors) == []
+    assert [result.damaged_actors for result in resolve_explosions(rockets, [])] == [[], [], []]
+
+
+def test_batched_explosions_match_scalar_path_on_diagonal_edges():
+    rng = random.Random(7)
+    rockets = [
+        RocketProjectile(
+            damage=100.0,
+            splash_radius=rng.choice([3.0, 6.0, 7.3]),
+            position=(rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(0, 3)),
+            velocity=(0.0, 0.0, 0.0),
+            self_damage_scale=0.5,
+            knockback_force=15.0,
+        )
+        for _ in range(20)
+    ]
+    actors = []
+    # Actors in random directions at exactly the splash radius and the direct-hit radius, where
+    # rounding decides which side of the threshold they fall on.
+    for index, rocket in enumerate(rockets):
+        for fraction in (1.0, 0.25) * 10:
+            x, y, z = (rng.gauss(0, 1) for _ in range(3))
+            norm = math.sqrt(x * x + y * y + z * z)
+            reach = rocket.splash_radius * fraction / norm
+            cx, cy, cz = rocket.position
+            actors.append(
+                Actor(
+                    f"p{index}-{len(actors)}",
+                    health=HealthArmor(health=500, armor=50),
+                    position=(cx + x * reach, cy + y * reach, cz + z * reach),
+                )
+            )
+    scalar_actors = copy.deepcopy(actors)
+
+    batched = resolve_explosions(rockets, actors)
+    scalar = [rocket.explode(scalar_actors) for rocket in rockets]
+
+    for got, want in zip(batched, scalar):
+        _assert_reports_equal(got.damaged_actors, want.damaged_actors)
+    for got, want in zip(actors, scalar_actors):
+        assert got.health.armor == pytest.approx(want.health.armor)
@@ -1,7 +1,12 @@
 import asyncio
 import json
+import time
 
+import pytest
+
+from server.admission import AdmissionController
 from server.config import ServerConfig
+from server.framing import LineFramer
 from server.game_server import GameServer
 from server.metrics import Metrics
 
@@ -30,3 +35,214 @@ def test_player_session_removed_on_disconnect():
         await server.stop()
 
     asyncio.run(run())
+
+
+def test_message_handling_and_drain_latency_recorded():
+    async def run():
+        config = ServerConfig(host="127.0.0.1", port=0, maps=["arena"])
+        metrics = Metrics()
+        server = GameServer(config=config, metrics=metrics)
+        await server.start()
+        host, port, *_ = server._server.sockets[0].getsockname()
+
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(json.dumps({"player_id": "p1"}).encode() + b"\n")
+        await writer.drain()
+        await reader.readline()
+        writer.write(b'{"action":"ping"}\n')
+        await writer.drain()
+        assert await reader.readline() == b'{"action":"pong"}\n'
+
+        # The join handshake is not a game message; the ping is. Both replies were drained.
+        histograms = metrics.histograms()
+        assert histograms["message_handle_ms"]["count"] == 1
+        assert histograms["drain_ms"]["count"] == 2
+
+        writer.close()
+        await writer.wait_closed()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def _run_tick_loop(config: ServerConfig, seconds: float, tick_work: float = 0.0) -> Metrics:
+    async def run():
+        metrics = Metrics()
+        server = GameServer(config=config, metrics=metrics)
+        original = server._run_tick
+
+        def slow_tick():
+            time.sleep(tick_work)
+            original()
+
+        server._run_tick = slow_tick
+        task = asyncio.create_task(server._tick_loop())
+        await asyncio.sleep(seconds)
+        task.cancel()
+        return metrics
+
+    return asyncio.run(run())
+
+
+def test_tick_loop_holds_rate_despite_tick_work():
+    config = ServerConfig(host="127.0.0.1", port=0, tick_rate=50)
+    metrics = _run_tick_loop(config, 1.2, tick_work=0.01)
+
+    assert metrics.gauges()["tick_rate_actual"] == pytest.approx(50, rel=0.1)
+    assert metrics.histograms()["tick_duration_ms"]["count"] == metrics.snapshot()["ticks"]
+    assert "ticks_skipped" not in metrics.snapshot()
+
+
+def test_tick_loop_records_overruns_and_skips():
+    config = ServerConfig(host="127.0.0.1", port=0, tick_rate=100, max_catchup_ticks=1)
+    metrics = _run_tick_loop(config, 0.3, tick_work=0.035)
+
+    counters = metrics.snapshot()
+    assert counters["tick_overruns"] == counters["ticks"]
+    assert counters["ticks_skipped"] > 0
+
+
+def test_map_rotation_uses_server_tick_counter():
+    config = ServerConfig(host="127.0.0.1", port=0, maps=["arena", "sewers"], tick_rate=2, map_rotation_seconds=3)
+    metrics = Metrics()
+    server = GameServer(config=config, metrics=metrics)
+    server.state.players["p1"] = object()
+
+    for _ in range(5):
+        server._run_tick()
+    assert server.state.current_map == "arena"
+    server._run_tick()
+    assert server.state.current_map == "sewers"
+    assert server.tick_count == 6
+    assert metrics.get("ticks") == 6
+
+
+def test_ip_limit_spares_loopback_and_can_be_disabled():
+    def admitted(controller, ip, attempts=5):
+        return sum(controller.try_admit(ip) is None for _ in range(attempts))
+
+    limited = AdmissionController(Metrics(), max_connections_per_ip=2, join_rate_per_second=100, join_burst=100)
+    assert admitted(limited, "203.0.113.7") == 2
+    assert admitted(limited, "127.0.0.1") == 5
+    assert admitted(limited, "::1") == 5
+    assert admitted(limited, "::ffff:127.0.0.1") == 5
+
+    strict = AdmissionController(Metrics(), 2, 100, 100, exempt_loopback=False)
+    assert admitted(strict, "127.0.0.1") == 2
+    unlimited = AdmissionController(Metrics(), 0, 100, 100)
+    assert admitted(unlimited, "203.0.113.7") == 5
+    assert ServerConfig().max_connections_per_ip >= 32
+
+
+def test_admission_rejects_before_parsing_join():
+    async def run():
+        config = ServerConfig(
+            host="127.0.0.1",
+            port=0,
+            max_connections_per_ip=2,
+            ip_limit_exempt_loopback=False,
+            join_rate_per_second=1,
+            join_burst=3,
+        )
+        metrics = Metrics()
+        server = GameServer(config=config, metrics=metrics)
+        await server.start()
+        host, port, *_ = server._server.sockets[0].getsockname()
+
+        held = [await asyncio.open_connection(host, port) for _ in range(2)]
+        reader, writer = await asyncio.open_connection(host, port)
+        assert await reader.readline() == b"too many connections\n"
+        writer.close()
+
+        for _, held_writer in held:
+            held_writer.close()
+            await held_writer.wait_closed()
+        await asyncio.sleep(0.05)
+        assert server.admission.connections_from(host) == 0
+
+        # The join budget (burst of 3) is spent after one more admit, even though the per-IP cap has room.
+        admitted = await asyncio.open_connection(host, port)
+        reader, writer = await asyncio.open_connection(host, port)
+        assert await reader.readline() == b"server busy\n"
+        writer.close()
+
+        counters = metrics.snapshot()
+        assert counters["connections_rejected_ip_limit"] == 1
+        assert counters["connections_rejected_join_rate"] == 1
+        assert counters["connections_opened"] == 3
+
+        admitted[1].close()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_pipelined_messages_are_answered_in_one_batch():
+    async def run():
+        config = ServerConfig(host="127.0.0.1", port=0, maps=["arena", "docks"], max_message_size=64)
+        metrics = Metrics()
+        server = GameServer(config=config, metrics=metrics)
+        await server.start()
+        host, port, *_ = server._server.sockets[0].getsockname()
+
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(json.dumps({"player_id": "p1"}).encode() + b"\n")
+        await reader.readline()
+        writer.write(b'{"action":"ping"}\n{"action":"rotate_map"}\nnot json\n' + b"x" * 100 + b'\n{"action":"ping"}\n')
+        await writer.drain()
+        replies = [await reader.readline() for _ in range(5)]
+        assert replies == [
+            b'{"action":"pong"}\n',
+            b'{"map": "docks"}\n',
+            b"invalid message\n",
+            b"message too large\n",
+            b'{"action":"pong"}\n',
+        ]
+
+        histograms = metrics.histograms()
+        assert histograms["messages_per_read"]["count"] == 1
+        assert histograms["drain_ms"]["count"] == 2
+        writer.close()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_line_framer_carries_partial_lines_and_bounds_oversized_ones():
+    framer = LineFramer(max_size=8)
+
+    assert framer.feed(b'{"a":1}\n{"b"') == [b'{"a":1}\n']
+    assert framer.feed(b":2}\n") == [b'{"b":2}\n']
+    assert framer.feed(b"0123456789abcdef") == []
+    assert framer.pending == 9
+    assert framer.feed(b"more junk") == []
+    assert framer.feed(b"tail\nok\n") == [b"012345678", b"ok\n"]
+    assert framer.pending == 0
+
+    assert framer.feed(b"last") == []
+    assert framer.flush() == [b"last"]
+    assert framer.flush() == []
+
+
+def test_message_size_limit_and_unterminated_last_line_match_readline():
+    async def run():
+        config = ServerConfig(host="127.0.0.1", port=0, maps=["arena"], max_message_size=32)
+        server = GameServer(config=config, metrics=Metrics())
+        await server.start()
+        host, port, *_ = server._server.sockets[0].getsockname()
+
+        def ping(size):
+            # Padded so the line, newline included, is exactly ``size`` bytes.
+            return b'{"action":"ping"}'.ljust(size - 1) + b"\n"
+
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(json.dumps({"player_id": "p1"}).encode() + b"\n")
+        await reader.readline()
+        writer.write(ping(32) + ping(33) + b'{"action":"ping"}')
+        writer.write_eof()
+        assert await reader.read() == b'{"action":"pong"}\nmessage too large\n{"action":"pong"}\n'
+
+        writer.close()
+        await server.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,123 @@
+import copy
+import math
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from game.health import HealthArmor  # noqa: E402
+from game.hitscan import HitscanResolver  # noqa: E402
+from game.spatial import SpatialGrid  # noqa: E402
+from game.weapons import Actor, HitscanWeapon, Railgun, Shotgun  # noqa: E402
+
+
+def _actor(name, position):
+    return Actor(name, health=HealthArmor(health=100, armor=0), position=position)
+
+
+def _first_hit(origin, direction, actors, radius, max_range):
+    """Reference ray cast: nearest sphere entry along one ray, one actor at a time."""
+    best = None
+    for actor in actors:
+        offset = [origin[i] - actor.position[i] for i in range(3)]
+        b = sum(offset[i] * direction[i] for i in range(3))
+        c = sum(value * value for value in offset) - radius * radius
+        disc = b * b - c
+        if disc < 0:
+            continue
+        t = 0.0 if c <= 0 else -b - math.sqrt(disc)
+        if 0 <= t <= max_range and (best is None or t < best[0]):
+            best = (t, actor)
+    return best
+
+
+def test_railgun_hits_nearest_actor_only():
+    resolver = HitscanResolver(actor_radius=0.5)
+    shooter = _actor("shooter", (0.0, 0.0, 0.0))
+    front = _actor("front", (20.0, 0.0, 0.0))
+    back = _actor("back", (30.0, 0.0, 0.0))
+    behind = _actor("behind", (-10.0, 0.0, 0.0))
+    railgun = Railgun(max_range=300.0)
+
+    result = resolver.fire(railgun, shooter, (1.0, 0.0, 0.0), now=0.0, actors=[shooter, behind, back, front])
+
+    assert result.was_fired
+    assert [hit.actor.name for hit in result.hits] == ["front"]
+    assert result.hits[0].distance == pytest.approx(19.5)
+    assert result.hits[0].point == pytest.approx((19.5, 0.0, 0.0))
+    assert result.damage_by_victim() == {"front": railgun.calculate_damage(19.5)}
+    assert front.health.health == pytest.approx(100 - railgun.calculate_damage(19.5))
+    assert back.health.health == 100
+    assert shooter.health.health == 100
+
+    assert not resolver.fire(railgun, shooter, (1.0, 0.0, 0.0), now=0.5, actors=[front]).was_fired
+
+
+def test_out_of_range_and_missed_actors_take_no_damage():
+    resolver = HitscanResolver(actor_radius=0.5)
+    shooter = _actor("shooter", (0.0, 0.0, 0.0))
+    far = _actor("far", (50.0, 0.0, 0.0))
+    aside = _actor("aside", (10.0, 3.0, 0.0))
+    weapon = HitscanWeapon("Machinegun", fire_rate=10.0, damage=7.0, max_range=40.0)
+
+    result = resolver.fire(weapon, shooter, (1.0, 0.0, 0.0), now=0.0, actors=[far, aside])
+
+    assert result.was_fired
+    assert result.hits == []
+    assert result.victims == []
+    assert far.health.health == 100 and aside.health.health == 100
+
+
+def test_shotgun_pellets_match_per_ray_reference():
+    scene = random.Random(11)
+    shooter = _actor("shooter", (0.0, 0.0, 1.0))
+    actors = [shooter] + [
+        _actor(f"p{i}", (scene.uniform(2, 30), scene.uniform(-4, 4), scene.uniform(0, 2))) for i in range(24)
+    ]
+    reference_actors = copy.deepcopy(actors)
+    resolver = HitscanResolver(actor_radius=0.6)
+    shotgun = Shotgun(pellet_count=8, spread=8.0, rng=random.Random(3))
+    replay = Shotgun(pellet_count=8, spread=8.0, rng=random.Random(3))
+    aim = (1.0, 0.1, 0.0)
+
+    result = resolver.fire(shotgun, shooter, aim, now=0.0, actors=actors)
+
+    directions = resolver.pellet_directions(aim, [replay.roll_spread() for _ in range(8)])
+    expected = {}
+    for direction in directions.tolist():
+        hit = _first_hit(shooter.position, direction, reference_actors[1:], 0.6, replay.max_range)
+        if hit is not None:
+            expected[hit[1].name] = expected.get(hit[1].name, 0.0) + replay.calculate_damage(hit[0])
+
+    assert len(result.hits) > 1
+    assert result.damage_by_victim() == pytest.approx(expected)
+    for actor in actors[1:]:
+        assert actor.health.health == pytest.approx(max(0.0, 100 - expected.get(actor.name, 0.0)))
+    assert all(victim.hits >= 1 and victim.report is not None for victim in result.victims)
+
+
+def test_spatial_grid_broadphase_matches_actor_list():
+    scene = random.Random(5)
+    positions = [(scene.uniform(-60, 60), scene.uniform(-60, 60), 0.0) for _ in range(200)]
+    shooter_list = _actor("shooter", (0.0, 0.0, 0.0))
+    shooter_grid = _actor("shooter", (0.0, 0.0, 0.0))
+    listed = [shooter_list] + [_actor(f"p{i}", position) for i, position in enumerate(positions)]
+    gridded = [shooter_grid] + [_actor(f"p{i}", position) for i, position in enumerate(positions)]
+    resolver = HitscanResolver(actor_radius=0.5)
+
+    for aim in ((1.0, 0.0, 0.0), (0.3, -1.0, 0.0), (-1.0, 0.7, 0.0)):
+        from_list = resolver.fire(Shotgun(spread=6.0, rng=random.Random(9)), shooter_list, aim, 0.0, listed)
+        from_grid = resolver.fire(
+            Shotgun(spread=6.0, rng=random.Random(9)), shooter_grid, aim, 0.0, SpatialGrid(8.0, gridded)
+        )
+        assert from_grid.damage_by_victim() == pytest.approx(from_list.damage_by_victim())
+        assert [hit.pellet for hit in from_grid.hits] == [hit.pellet for hit in from_list.hits]
+
+
+def test_pellet_directions_follow_spread_angles():
+    resolver = HitscanResolver()
+    yaw = math.radians(5.0)
+    directions = resolver.pellet_directions((0.0, 0.0, 1.0), [(0.0, 0.0, 0.0), (0.0, yaw, 0.0)])
+    assert directions[0].tolist() == pytest.approx([0.0, 0.0, 1.0])
+    assert math.degrees(math.acos(float(directions[0] @ directions[1]))) == pytest.approx(5.0)
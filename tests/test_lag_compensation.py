@@ -0,0 +1,103 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from game.health import HealthArmor  # noqa: E402
+from game.hitscan import HitscanResolver  # noqa: E402
+from game.lag_compensation import LagCompensator, PositionHistory  # noqa: E402
+from game.weapons import Actor, Railgun  # noqa: E402
+
+TICK = 1 / 30
+
+
+def _actor(name, position):
+    return Actor(name, health=HealthArmor(health=100, armor=0), position=position)
+
+
+def _strafe(history, target, ticks, speed=10.0):
+    """Record ``ticks`` ticks of ``target`` running along +y from y=0."""
+    for tick in range(ticks):
+        target.position = (20.0, tick * TICK * speed, 0.0)
+        history.record(tick * TICK)
+
+
+def test_high_ping_shot_hits_where_the_target_was_on_screen():
+    history = PositionHistory.for_window(tick_rate=30, window=0.5, max_actors=4)
+    shooter = _actor("shooter", (0.0, 0.0, 0.0))
+    target = _actor("target", (20.0, 0.0, 0.0))
+    history.track(shooter)
+    history.track(target)
+    _strafe(history, target, 31)
+    now = 30 * TICK
+    # 150 ms ago the target was at y=8.5; it is at y=10 now.
+    aim = (20.0, 8.5, 0.0)
+    compensator = LagCompensator(history, HitscanResolver(actor_radius=0.5), max_rewind=0.25)
+
+    unrewound = HitscanResolver(actor_radius=0.5).fire(Railgun(), shooter, aim, now, [target], apply=False)
+    assert unrewound.hits == []
+
+    result = compensator.fire(Railgun(), shooter, aim, now, client_time=now - 0.15)
+    assert [hit.actor.name for hit in result.hits] == ["target"]
+    assert target.health.health < 100
+    assert shooter.health.health == 100
+
+
+def test_rewind_is_bounded_by_max_rewind():
+    history = PositionHistory.for_window(tick_rate=30, window=1.0, max_actors=2)
+    shooter = _actor("shooter", (0.0, 0.0, 0.0))
+    target = _actor("target", (20.0, 0.0, 0.0))
+    history.track(target)
+    _strafe(history, target, 31)
+    now = 30 * TICK
+    compensator = LagCompensator(history, max_rewind=0.1)
+
+    assert compensator.rewind_time(now, now - 0.5) == pytest.approx(now - 0.1)
+    assert compensator.rewind_time(now, now + 0.5) == now
+    # A claimed 500 ms of lag only buys 100 ms, so a shot at the half-second-old position misses.
+    assert compensator.fire(Railgun(), shooter, (20.0, 5.0, 0.0), now, now - 0.5).hits == []
+    assert compensator.fire(Railgun(), shooter, (20.0, 9.0, 0.0), now, now - 0.5).hits[0].actor is target
+
+
+def test_ring_buffer_wraps_without_growing_and_interpolates():
+    history = PositionHistory(capacity=8, max_actors=2)
+    target = _actor("target", (0.0, 0.0, 0.0))
+    history.track(target)
+    buffers = (history.times, history.positions, history.present)
+    _strafe(history, target, 1000)
+
+    assert len(history) == 8
+    assert all(a is b for a, b in zip((history.times, history.positions, history.present), buffers))
+    assert history.newest == pytest.approx(999 * TICK)
+    assert history.oldest == pytest.approx(992 * TICK)
+
+    positions, present = history.sample(995.5 * TICK)
+    assert present.tolist() == [True, False]
+    assert positions[0].tolist() == pytest.approx([20.0, 995.5 * TICK * 10.0, 0.0])
+    # Older than the buffer clamps to the oldest tick still held.
+    positions, _ = history.sample(0.0)
+    assert positions[0].tolist() == pytest.approx([20.0, 992 * TICK * 10.0, 0.0])
+
+
+def test_untracked_and_late_joining_actors():
+    history = PositionHistory(capacity=4, max_actors=2)
+    leaver = _actor("leaver", (20.0, 0.0, 0.0))
+    joiner = _actor("joiner", (20.0, 5.0, 0.0))
+    history.track(leaver)
+    history.record(0.0)
+    history.track(joiner)
+    history.record(TICK)
+
+    _, present = history.sample(0.0)
+    assert present.tolist() == [True, False]
+    positions, present = history.sample(TICK / 2)
+    assert present.tolist() == [True, True]
+    assert positions[1].tolist() == pytest.approx([20.0, 5.0, 0.0])
+
+    history.untrack(leaver)
+    compensator = LagCompensator(history)
+    shooter = _actor("shooter", (0.0, 0.0, 0.0))
+    assert compensator.fire(Railgun(), shooter, (1.0, 0.0, 0.0), TICK, 0.0).hits == []
+    with pytest.raises(ValueError):
+        history.track(joiner)
+    with pytest.raises(ValueError):
+        history.record(0.0)
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+import pytest
+
+from scripts.load_test import (
+    TARGET_GAME_SERVER,
+    ClientStats,
+    LoadTestConfig,
+    ShizgigglesBot,
+    _Bot,
+    benchmark,
+    benchmark_processes,
+    percentile,
+    shard_config,
+)
+from server.config import ServerConfig
+from server.game_server import GameServer as DedicatedServer
+from server.metrics import Metrics
+from shizgiggles.server import GameServer
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 50) == 0.0
+
+
+def test_bot_without_every_override_fails_at_creation():
+    class SilentBot(_Bot):
+        async def handshake(self):
+            return True
+
+    with pytest.raises(TypeError):
+        SilentBot(LoadTestConfig(), "p1", ClientStats())
+    assert ShizgigglesBot(LoadTestConfig(), "p1", ClientStats()).player_id == "p1"
+
+
+def test_benchmark_reports_latency_and_jitter():
+    async def run():
+        server = GameServer(host="127.0.0.1", port=0, tick_rate=50)
+        await server.start()
+        ticks = asyncio.create_task(server.run_ticks())
+        port = server._server.sockets[0].getsockname()[1]
+        config = LoadTestConfig(port=port, clients=3, duration=0.4, ramp_up=0.1, input_rate=30, ping_interval=0.05)
+        report = await benchmark(config)
+        ticks.cancel()
+        await server.stop()
+        return report
+
+    report = asyncio.run(run())
+    assert report["clients"]["connected"] == 3
+    assert report["rtt_ms"]["count"] > 0
+    assert report["rtt_ms"]["p50"] <= report["rtt_ms"]["p99"]
+    assert report["snapshot_interval_ms"]["count"] > 0
+    assert report["throughput"]["messages_sent_per_sec"] > 0
+
+
+def test_benchmark_against_dedicated_server():
+    async def run():
+        config = ServerConfig(host="127.0.0.1", port=0, rate_limit_per_second=100)
+        server = DedicatedServer(config=config, metrics=Metrics())
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        config = LoadTestConfig(port=port, target=TARGET_GAME_SERVER, clients=2, duration=0.3, input_rate=20)
+        report = await benchmark(config)
+        await server.stop()
+        return report
+
+    report = asyncio.run(run())
+    assert report["clients"]["connected"] == 2
+    assert report["rtt_ms"]["count"] > 0
+
+
+def test_shards_cover_all_clients_on_one_schedule():
+    config = LoadTestConfig(clients=10, ramp_up=2.0, processes=3)
+    shards = shard_config(config, config.processes, start_at=123.0)
+    assert [shard.clients for shard in shards] == [4, 3, 3]
+    assert [shard.first_client for shard in shards] == [0, 4, 7]
+    assert all(shard.total_clients == 10 and shard.start_at == 123.0 for shard in shards)
+    assert len(shard_config(LoadTestConfig(clients=2), 4, start_at=0.0)) == 2
+
+
+def test_multiprocess_benchmark_aggregates_shards():
+    loop = asyncio.new_event_loop()
+    server = GameServer(host="127.0.0.1", port=0, tick_rate=50)
+    loop.run_until_complete(server.start())
+    ticks = loop.create_task(server.run_ticks())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        port = server._server.sockets[0].getsockname()[1]
+        config = LoadTestConfig(port=port, clients=4, duration=0.3, input_rate=20, ping_interval=0.05, processes=2)
+        report = benchmark_processes(config, startup_grace=0.5)
+    finally:
+        loop.call_soon_threadsafe(ticks.cancel)
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    assert report["clients"]["connected"] == 4
+    assert report["rtt_ms"]["count"] > 0
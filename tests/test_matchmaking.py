@@ -0,0 +1,280 @@
+import asyncio
+import http.client
+import json
+import random
+import re
+import socket
+import time
+from urllib import error, request
+
+import pytest
+
+from server.matchmaking import (
+    _MAX_HEADER_BYTES,
+    AsyncMatchmakingClient,
+    MatchmakingBackend,
+    ServerAnnouncement,
+    ServerList,
+    _parse_request,
+    _Registry,
+    _wants_keep_alive,
+)
+from server.metrics import Metrics
+
+
+def _register(client: AsyncMatchmakingClient, port: int):
+    return client.register_server(
+        address="127.0.0.1", port=port, region="eu", max_players=8, map_name="arena", tick_rate=30
+    )
+
+
+def test_async_registration_reuses_connection():
+    backend = MatchmakingBackend(host="127.0.0.1", port=0)
+    backend.start()
+    try:
+        port = backend.port
+        metrics = Metrics()
+
+        async def run():
+            client = AsyncMatchmakingClient(f"http://127.0.0.1:{port}", metrics=metrics)
+            results = [await _register(client, 7000 + idx) for idx in range(3)]
+            await client.close()
+            return results
+
+        assert asyncio.run(run()) == [True, True, True]
+        assert len(backend.server_list.registry.list_active()) == 3
+        counters = metrics.snapshot()
+        assert counters["matchmaking_connections_opened"] == 1
+        assert counters["matchmaking_register_responses"] == 3
+    finally:
+        backend.stop()
+
+
+def test_async_registration_retries_with_backoff():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    metrics = Metrics()
+    client = AsyncMatchmakingClient(
+        f"http://127.0.0.1:{port}", metrics=metrics, max_retries=2, backoff_base=0.01, rng=random.Random(1)
+    )
+
+    assert asyncio.run(_register(client, 7000)) is False
+    counters = metrics.snapshot()
+    assert counters["matchmaking_register_errors"] == 3
+    assert counters["matchmaking_register_retries"] == 2
+    assert all(0 <= client.backoff_delay(attempt) <= client.backoff_cap for attempt in range(10))
+
+
+def _announce(port: int, region: str = "eu", map_name: str = "arena", players: int = 0, last_seen: float = 1000.0):
+    return ServerAnnouncement(
+        address="10.0.0.1",
+        port=port,
+        region=region,
+        max_players=8,
+        map_name=map_name,
+        tick_rate=30,
+        last_seen=last_seen,
+        players=players,
+    )
+
+
+def test_registry_filters_paginates_and_expires():
+    registry = _Registry(ttl_seconds=120)
+    registry.register(_announce(1, "eu", "arena"))
+    registry.register(_announce(2, "eu", "docks", players=8))
+    registry.register(_announce(3, "us", "arena"))
+    registry.register(_announce(4, "eu", "arena", last_seen=1100.0))
+
+    def ports(**filters):
+        servers, total = registry.query(now=1050.0, **filters)
+        return [s.port for s in servers], total
+
+    assert ports() == ([1, 2, 3, 4], 4)
+    assert ports(region="eu") == ([1, 2, 4], 3)
+    assert ports(region="eu", map_name="arena") == ([1, 4], 2)
+    assert ports(region="eu", has_free_slots=True) == ([1, 4], 2)
+    assert ports(map_name="sewers") == ([], 0)
+    assert ports(offset=1, limit=2) == ([2, 3], 4)
+
+    # A heartbeat that moves server 1 to another map re-indexes it and extends its lifetime.
+    registry.register(_announce(1, "eu", "docks", last_seen=1100.0))
+    assert ports(map_name="arena") == ([3, 4], 2)
+
+    assert registry.expire(now=1121.0) == 2
+    assert ports(region="us") == ([], 0)
+    assert [s.port for s in registry.query(now=1121.0)[0]] == [1, 4]
+    assert registry.expire(now=1300.0) == 2
+    assert len(registry) == 0
+
+
+def test_malformed_registration_leaves_registry_untouched():
+    server_list = ServerList(ttl_seconds=120)
+    valid = {"address": "10.0.0.1", "port": 7000, "region": "eu", "map_name": "arena", "max_players": 8}
+
+    for bad in ({"region": ["eu"]}, {"map_name": {"name": "arena"}}, {"address": 7}):
+        status, _ = server_list.register(json.dumps({**valid, **bad}).encode())
+        assert status == 400
+    assert len(server_list.registry) == 0
+
+    # A valid heartbeat from the same address:port registers and indexes normally, and still expires.
+    assert server_list.register(json.dumps(valid).encode())[0] == 200
+    assert server_list.register(json.dumps({**valid, "map_name": "docks"}).encode())[0] == 200
+    registry = server_list.registry
+    assert [s.map_name for s in registry.query(region="eu")[0]] == ["docks"]
+    assert registry.query(map_name="arena") == ([], 0)
+    assert registry.expire(now=time.time() + 121) == 1
+    assert len(registry) == 0
+
+
+def test_backend_serves_filtered_pages():
+    backend = MatchmakingBackend(host="127.0.0.1", port=0)
+    backend.start()
+    try:
+        now = time.time()
+        for port in range(5):
+            backend.server_list.registry.register(_announce(port, players=port * 2, last_seen=now))
+        base = f"http://127.0.0.1:{backend.port}/servers"
+
+        with request.urlopen(f"{base}?has_slots=1&limit=2") as resp:
+            page = json.loads(resp.read())
+        assert [s["port"] for s in page["servers"]] == [0, 1]
+        assert (page["total"], page["next_offset"]) == (4, 2)
+
+        with request.urlopen(f"{base}?has_slots=1&offset=2&limit=2") as resp:
+            page = json.loads(resp.read())
+        assert [s["port"] for s in page["servers"]] == [2, 3]
+        assert page["next_offset"] is None
+
+        with pytest.raises(error.HTTPError) as excinfo:
+            request.urlopen(f"{base}?limit=0")
+        assert excinfo.value.code == 400
+    finally:
+        backend.stop()
+
+
+def test_registry_version_ignores_plain_heartbeats():
+    registry = _Registry(ttl_seconds=120)
+    registry.register(_announce(1, last_seen=1000.0))
+    version = registry.current_version(now=1000.0)
+
+    registry.register(_announce(1, last_seen=1030.0))
+    assert registry.current_version(now=1030.0) == version
+    registry.register(_announce(1, players=3, last_seen=1060.0))
+    assert registry.current_version(now=1060.0) == version + 1
+    assert registry.current_version(now=1200.0) == version + 2
+
+
+def test_backend_caches_listing_and_answers_conditional_gets():
+    backend = MatchmakingBackend(host="127.0.0.1", port=0)
+    backend.start()
+    try:
+        backend.server_list.registry.register(_announce(1, last_seen=time.time()))
+        conn = http.client.HTTPConnection("127.0.0.1", backend.port)
+
+        conn.request("GET", "/servers?region=eu")
+        resp = conn.getresponse()
+        first = resp.read()
+        etag = resp.getheader("ETag")
+        assert resp.status == 200 and etag
+
+        conn.request("GET", "/servers?region=eu", headers={"If-None-Match": etag})
+        resp = conn.getresponse()
+        assert (resp.status, resp.read()) == (304, b"")
+
+        conn.request("GET", "/servers?region=eu")
+        resp = conn.getresponse()
+        assert resp.read() == first
+        assert (backend.server_list.responses.hits, backend.server_list.responses.misses) == (2, 1)
+
+        backend.server_list.registry.register(_announce(2, last_seen=time.time()))
+        conn.request("GET", "/servers?region=eu", headers={"If-None-Match": etag})
+        resp = conn.getresponse()
+        assert resp.status == 200
+        assert resp.getheader("ETag") != etag
+        assert [s["port"] for s in json.loads(resp.read())["servers"]] == [1, 2]
+        conn.close()
+    finally:
+        backend.stop()
+
+
+def test_backend_answers_pipelined_requests_and_bounds_connections():
+    async def run():
+        backend = MatchmakingBackend(host="127.0.0.1", port=0, max_connections=1)
+        await backend.start_async()
+        registration = json.dumps({"address": "10.0.0.1", "port": 7000, "max_players": 8}).encode()
+        reader, writer = await asyncio.open_connection("127.0.0.1", backend.port)
+        writer.write(
+            b"POST /register HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n%s" % (len(registration), registration)
+            + b"GET /servers HTTP/1.1\r\nHost: x\r\n\r\n"
+            + b"GET /missing HTTP/1.1\r\nHost: x\r\n\r\n"
+        )
+        statuses = []
+        for _ in range(3):
+            statuses.append((await reader.readline()).split()[1])
+            length = 0
+            while (line := await reader.readline()) != b"\r\n":
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            body = await reader.readexactly(length)
+        assert statuses == [b"200", b"200", b"404"]
+
+        # The first connection is still open, so a second one is turned away.
+        busy_reader, busy_writer = await asyncio.open_connection("127.0.0.1", backend.port)
+        assert (await busy_reader.readline()).split()[1] == b"503"
+        busy_writer.close()
+
+        writer.write(b"GET /servers HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+        response = await reader.read()
+        assert response.startswith(b"HTTP/1.1 200 OK") and b'"port": 7000' in response
+        assert body == b'{"error": "not found"}'
+        await backend.stop_async()
+
+    asyncio.run(run())
+
+
+def test_backend_answers_500_when_a_request_fails():
+    async def run():
+        backend = MatchmakingBackend(host="127.0.0.1", port=0)
+        await backend.start_async()
+
+        def broken_register(raw):
+            raise RuntimeError("registry unavailable")
+
+        backend.server_list.register = broken_register
+        reader, writer = await asyncio.open_connection("127.0.0.1", backend.port)
+        writer.write(
+            b"GET /servers HTTP/1.1\r\nHost: x\r\n\r\n"
+            + b"POST /register HTTP/1.1\r\nHost: x\r\nContent-Length: 2\r\n\r\n{}"
+            + b"GET /servers HTTP/1.1\r\nHost: x\r\n\r\n"
+        )
+        response = await asyncio.wait_for(reader.read(), 5)
+        statuses = re.findall(rb"HTTP/1\.1 (\d{3}) ", response)
+        # The request before the failure is answered; the failing one gets a 500 and the connection closes.
+        assert statuses == [b"200", b"500"]
+        assert b"Connection: close" in response
+        writer.close()
+        await backend.stop_async()
+
+    asyncio.run(run())
+
+
+def test_header_size_limit_applies_with_or_without_terminator():
+    def head(size):
+        filler = b"GET /servers HTTP/1.1\r\nX-Pad: "
+        return filler + b"a" * (size - len(filler))
+
+    assert _parse_request(bytearray(head(_MAX_HEADER_BYTES + 1))) == 431
+    # The whole oversized block arriving in one read, terminator included, is refused too.
+    assert _parse_request(bytearray(head(_MAX_HEADER_BYTES + 1) + b"\r\n\r\n")) == 431
+    assert _parse_request(bytearray(head(_MAX_HEADER_BYTES) + b"\r\n\r\n"))[:2] == ("GET", "/servers")
+
+
+def test_request_version_cannot_be_overridden_by_a_header():
+    method, target, version, headers, _ = _parse_request(
+        bytearray(b"GET /servers HTTP/1.1\r\nHost: x\r\nVersion: HTTP/1.0\r\n\r\n")
+    )
+    assert (method, target, version) == ("GET", "/servers", "HTTP/1.1")
+    assert headers == {"host": "x", "version": "HTTP/1.0"}
+    assert _wants_keep_alive(version, headers)
+    assert not _wants_keep_alive("HTTP/1.0", headers)
@@ -0,0 +1,65 @@
+import threading
+import urllib.request
+
+from server.metrics import Metrics, MetricsExporter
+
+
+def test_counter_handles_merge_with_string_counters():
+    metrics = Metrics()
+    ticks = metrics.counter("ticks")
+    assert metrics.counter("ticks") is ticks
+
+    ticks.increment()
+    ticks.increment(2)
+    metrics.increment("ticks")
+    metrics.increment("pings")
+
+    assert metrics.get("ticks") == 4
+    assert metrics.get("missing") == 0
+    assert metrics.snapshot() == {"ticks": 4, "pings": 1}
+
+
+def test_prometheus_exposition_and_scrape_endpoint():
+    metrics = Metrics()
+    metrics.increment("pings", 2)
+    metrics.set_gauge("tick_rate_actual", 29.5)
+    latency = metrics.histogram("tick_duration_ms", buckets=(1, 10))
+    latency.observe(0.5)
+    latency.observe(4)
+    latency.observe(50)
+
+    text = metrics.render_prometheus()
+    assert "shiz_pings_total 2" in text
+    assert "shiz_tick_rate_actual 29.5" in text
+    assert 'shiz_tick_duration_ms_bucket{le="1"} 1' in text
+    assert 'shiz_tick_duration_ms_bucket{le="10"} 2' in text
+    assert 'shiz_tick_duration_ms_bucket{le="+Inf"} 3' in text
+    assert "shiz_tick_duration_ms_count 3" in text
+
+    exporter = MetricsExporter(metrics, port=0)
+    exporter.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics", timeout=2) as resp:
+            assert resp.status == 200
+            assert resp.read().decode() == metrics.render_prometheus()
+    finally:
+        exporter.stop()
+
+
+def test_increments_from_many_threads_are_merged():
+    metrics = Metrics()
+    metrics.increment("messages")
+
+    def worker():
+        for _ in range(1000):
+            metrics.increment("messages")
+            metrics.increment("bytes", 3)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.snapshot() == {"messages": 4001, "bytes": 12000}
+    assert metrics.get("messages") == 4001
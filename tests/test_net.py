@@ -0,0 +1,46 @@
+import asyncio
+import socket
+import sys
+
+import pytest
+
+from shizgiggles.net import SocketOptions, install_event_loop, listen_kwargs, tune_connection, tune_server
+
+
+def test_install_event_loop_falls_back_without_uvloop(monkeypatch):
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+
+    assert install_event_loop("asyncio") == "asyncio"
+    assert install_event_loop("auto") == "asyncio"
+    assert install_event_loop("uvloop") == "asyncio"
+    with pytest.raises(ValueError):
+        install_event_loop("trio")
+
+
+def test_socket_options_applied_to_listener_and_connections():
+    options = SocketOptions(nodelay=True, send_buffer=64 * 1024, recv_buffer=64 * 1024, reuse_port=True)
+
+    async def run():
+        accepted = asyncio.Queue()
+
+        async def handle(reader, writer):
+            tune_connection(writer, options)
+            sock = writer.get_extra_info("socket")
+            await accepted.put(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, **listen_kwargs(options))
+        tune_server(server, options)
+        listener = server.sockets[0]
+        # Linux doubles the requested size to account for bookkeeping overhead.
+        assert listener.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) >= 64 * 1024
+        assert listener.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 64 * 1024
+
+        host, port, *_ = listener.getsockname()
+        _, writer = await asyncio.open_connection(host, port)
+        assert await accepted.get() != 0
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+import copy
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from game.health import HealthArmor  # noqa: E402
+from game.projectiles import ProjectileManager  # noqa: E402
+from game.weapons import Actor, RocketLauncher, RocketProjectile  # noqa: E402
+
+
+def _actor(name, position):
+    return Actor(name, health=HealthArmor(health=100, armor=0), position=position)
+
+
+def _rocket(position, velocity):
+    return RocketProjectile(100.0, 6.0, position, velocity, 0.5, 15.0)
+
+
+def test_fast_rocket_does_not_tunnel_through_actor():
+    manager = ProjectileManager((-100.0, -100.0, -100.0), (100.0, 100.0, 100.0))
+    shooter = _actor("shooter", (0.0, 0.0, 0.0))
+    target = _actor("target", (10.0, 0.0, 0.0))
+    reference = copy.deepcopy([shooter, target])
+
+    launcher = RocketLauncher(speed=400.0)
+    slot = manager.fire(launcher, shooter, (1.0, 0.0, 0.0), now=0.0)
+    assert manager.fire(launcher, shooter, (1.0, 0.0, 0.0), now=0.1) is None
+
+    # One 0.1 s tick moves the rocket 40 m, far past the target, yet the sweep catches it.
+    (impact,) = manager.step(0.1, [shooter, target])
+    assert impact.slot == slot and impact.actor is target
+    assert impact.position == pytest.approx((9.25, 0.0, 0.0))
+    assert len(manager) == 0
+
+    expected = _rocket(impact.position, (400.0, 0.0, 0.0)).explode(reference)
+    assert impact.explosion == expected
+    assert target.health.health == pytest.approx(reference[1].health.health)
+
+
+def test_rocket_explodes_on_arena_bounds_and_slot_is_recycled():
+    manager = ProjectileManager((-10.0, -10.0, 0.0), (10.0, 10.0, 10.0), capacity=1)
+    bystander = _actor("p1", (0.0, 9.0, 1.0))
+
+    first = manager.spawn(_rocket((0.0, 0.0, 1.0), (0.0, 30.0, 0.0)))
+    pooled = manager.rocket(first)
+    assert manager.step(0.1, [bystander]) == []
+    assert manager.rocket(first).position == pytest.approx((0.0, 3.0, 1.0))
+
+    second = manager.spawn(_rocket((5.0, 0.0, 1.0), (0.0, 0.0, 5.0)))
+    assert manager.capacity == 2
+
+    impacts = manager.step(0.25, [])
+    assert [impact.slot for impact in impacts] == [first]
+    assert impacts[0].actor is None
+    assert impacts[0].position == pytest.approx((0.0, 9.75, 1.0))
+
+    third = manager.spawn(_rocket((1.0, 1.0, 1.0), (0.0, 0.0, 0.0)))
+    assert third == first and manager.rocket(third) is pooled
+    assert len(manager) == 2 and second != third
+
+
+def test_step_explodes_in_impact_order():
+    manager = ProjectileManager((-50.0, -50.0, -50.0), (50.0, 50.0, 50.0))
+    target = _actor("target", (0.0, 0.0, 0.0))
+    late = manager.spawn(_rocket((-9.0, 0.0, 0.0), (10.0, 0.0, 0.0)))
+    early = manager.spawn(_rocket((0.0, 3.0, 0.0), (0.0, -10.0, 0.0)))
+
+    impacts = manager.step(1.0, [target])
+    assert [impact.slot for impact in impacts] == [early, late]
+    assert all(impact.actor is target for impact in impacts)
@@ -1,4 +1,4 @@
-from shizgiggles.protocol import Message, MessageType
+from shizgiggles.protocol import Message, MessageType, apply_snapshot_delta, diff_snapshot
 
 
 def test_message_round_trip():
@@ -9,3 +9,20 @@ def test_message_round_trip():
     assert restored.player_id == "p1"
     assert restored.payload["dx"] == 1.0
     assert restored.payload["dy"] == -1.5
+
+
+def test_snapshot_delta_round_trip():
+    base = {
+        "p1": {"position": [0.0, 0.0], "health": 100, "ammo": 30},
+        "p2": {"position": [1.0, 1.0], "health": 90, "ammo": 5},
+    }
+    current = {
+        "p1": {"position": [2.0, 0.0], "health": 100, "ammo": 30},
+        "p3": {"position": [0.0, 0.0], "health": 100, "ammo": 30},
+    }
+    players, removed = diff_snapshot(base, current)
+    assert players == {"p1": {"position": [2.0, 0.0]}, "p3": current["p3"]}
+    assert removed == ["p2"]
+
+    message = Message.from_json(Message.snapshot(5, players, base=4, removed=removed).to_json())
+    assert apply_snapshot_delta(base, message.payload["players"], message.payload["removed"]) == current
@@ -0,0 +1,203 @@
+import asyncio
+
+from shizgiggles.client import SnapshotDecoder
+from shizgiggles.protocol import Message, MessageType
+from shizgiggles.server import ClientConnection, GameServer, OverflowPolicy
+
+
+def test_inputs_are_applied_once_per_tick():
+    async def run():
+        server = GameServer(tick_rate=20)
+        broadcasts = []
+
+        async def record_broadcast():
+            broadcasts.append(server.world.tick)
+
+        server.broadcast_snapshot = record_broadcast
+        server.queue_input("p1", Message.move("p1", (1.0, 0.0)))
+        server.queue_input("p1", Message.move("p1", (0.0, 2.0)))
+        server.queue_input("p1", Message.fire("p1"))
+        assert "p1" not in server.world.players
+
+        await server.tick()
+
+        player = server.world.players["p1"]
+        assert player.position == (1.0, 2.0)
+        assert player.ammo == 29
+        assert server.world.tick == 1
+        assert broadcasts == [1]
+
+        await server.tick()
+        assert player.position == (1.0, 2.0)
+        assert broadcasts == [1, 2]
+
+    asyncio.run(run())
+
+
+class StalledWriter:
+    def __init__(self):
+        self.written = []
+        self.closed = False
+        self.release = asyncio.Event()
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def drain(self):
+        await self.release.wait()
+
+    def close(self):
+        self.closed = True
+
+    def get_extra_info(self, name):
+        return ("127.0.0.1", 0)
+
+
+def test_slow_client_drops_oldest_snapshots():
+    async def run():
+        writer = StalledWriter()
+        connection = ClientConnection(writer, max_queue=2, policy=OverflowPolicy.DROP_OLDEST)
+        for index in range(5):
+            assert connection.send(b"snap-%d" % index, droppable=True)
+            await asyncio.sleep(0)
+
+        assert writer.written == [b"snap-0"]
+        assert connection.dropped == 2
+        writer.release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert writer.written == [b"snap-0", b"snap-3", b"snap-4"]
+        connection.close()
+
+    asyncio.run(run())
+
+
+def test_slow_client_disconnected_on_overflow():
+    async def run():
+        writer = StalledWriter()
+        connection = ClientConnection(writer, max_queue=1, policy=OverflowPolicy.DISCONNECT)
+        connection.send(b"snap-0", droppable=True)
+        await asyncio.sleep(0)
+        connection.send(b"snap-1", droppable=True)
+        assert connection.send(b"snap-2", droppable=True) is False
+        assert connection.closed and writer.closed
+
+    asyncio.run(run())
+
+
+def test_snapshot_encoded_once_for_all_clients():
+    async def run():
+        server = GameServer()
+        writers = [StalledWriter() for _ in range(3)]
+        for index, writer in enumerate(writers):
+            writer.release.set()
+            server._clients[f"p{index}"] = ClientConnection(writer)
+            server.world.ensure_player(f"p{index}")
+
+        await server.broadcast_snapshot()
+        await asyncio.sleep(0)
+
+        frames = [writer.written[0] for writer in writers]
+        assert all(frame is frames[0] for frame in frames)
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_delta_client_receives_only_changes_after_ack():
+    async def run():
+        server = GameServer(keyframe_interval=10)
+        writer = StalledWriter()
+        writer.release.set()
+        server._clients["p1"] = ClientConnection(writer)
+        server._acked["p1"] = -1
+        server.world.ensure_player("p1")
+        server.world.ensure_player("p2")
+        decoder = SnapshotDecoder()
+
+        async def receive():
+            await asyncio.sleep(0)
+            frame = Message.from_json(writer.written.pop().decode())
+            return frame.payload, decoder.apply(frame.payload)
+
+        await server.tick()
+        keyframe, seq = await receive()
+        assert keyframe["base"] is None and set(keyframe["players"]) == {"p1", "p2"}
+        server._acked["p1"] = seq
+
+        server.queue_input("p2", Message.move("p2", (3.0, 0.0)))
+        await server.tick()
+        delta, _ = await receive()
+        assert delta["base"] == seq
+        assert delta["players"] == {"p2": {"position": [3.0, 0.0]}}
+        assert decoder.state["p2"]["position"] == [3.0, 0.0]
+        assert decoder.state["p1"]["health"] == 100
+        await server.stop()
+
+    asyncio.run(run())
+
+
+async def _json_join(port, player_id, **options):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((Message(MessageType.JOIN, player_id, options).to_json() + "\n").encode())
+    await writer.drain()
+    await asyncio.sleep(0.01)
+    return reader, writer
+
+
+def test_bad_or_unjoined_inputs_are_dropped_and_ticks_continue():
+    async def run():
+        server = GameServer(host="127.0.0.1", port=0, tick_rate=100)
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        ticks = asyncio.create_task(server.run_ticks())
+
+        stranger = (await asyncio.open_connection("127.0.0.1", port))[1]
+        stranger.write((Message.move("ghost", (1.0, 0.0)).to_json() + "\n").encode())
+        _, writer = await _json_join(port, "p1")
+        writer.write(b'{"type": "move", "player_id": "p1", "payload": {"dx": "zz", "dy": 0}}\n')
+        writer.write(b'{"type": "move", "player_id": "p1", "payload": {"dx": NaN, "dy": 0}}\n')
+        writer.write((Message.move("someone-else", (2.0, 0.0)).to_json() + "\n").encode())
+        await writer.drain()
+        await asyncio.sleep(0.1)
+
+        assert not ticks.done()
+        tick = server.world.tick
+        await asyncio.sleep(0.05)
+        assert server.world.tick > tick
+        # The joined player moved by the one valid input; nobody else was created.
+        assert set(server.world.players) == {"p1"}
+        assert server.world.players["p1"].position == (2.0, 0.0)
+        assert set(server._inputs) <= {"p1"}
+
+        ticks.cancel()
+        for closing in (stranger, writer):
+            closing.close()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_malformed_lines_do_not_leak_the_session():
+    async def run():
+        server = GameServer(host="127.0.0.1", port=0)
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+
+        reader, writer = await _json_join(port, "p1", snapshots="delta")
+        writer.write(b'{"type": "ack", "player_id": "p1", "payload": {"seq": "x"}}\n')
+        writer.write(b"not json\n[1, 2]\n" + b'{"type": "teleport", "player_id": "p1"}\n')
+        writer.write((Message.ping("p1").to_json() + "\n").encode())
+        await writer.drain()
+        # The bad lines are skipped and the connection keeps serving.
+        assert Message.from_json((await reader.readline()).decode()).type == MessageType.PING
+        assert server._acked == {"p1": -1}
+
+        writer.close()
+        await asyncio.sleep(0.05)
+        assert "p1" not in server._clients
+        assert "p1" not in server._acked
+        assert "p1" not in server.world.players
+        await server.stop()
+
+    asyncio.run(run())
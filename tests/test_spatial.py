@@ -0,0 +1,70 @@
+import copy
+import math
+import random
+
+import pytest
+
+from game.health import HealthArmor
+from game.spatial import SpatialGrid
+from game.weapons import Actor, RocketProjectile
+
+
+def _actors(count, rng, extent=60.0):
+    return [
+        Actor(
+            f"p{index}",
+            health=HealthArmor(health=100, armor=rng.choice([0, 25, 50])),
+            position=(rng.uniform(-extent, extent), rng.uniform(-extent, extent), rng.uniform(0, 10)),
+        )
+        for index in range(count)
+    ]
+
+
+def test_grid_tracks_moves_incrementally():
+    actors = _actors(3, random.Random(1))
+    grid = SpatialGrid(cell_size=4.0, actors=actors)
+    mover = actors[1]
+
+    grid.move(mover, (100.0, 100.0, 0.0))
+    assert grid.query_radius((100.0, 100.0, 0.0), 1.0) == [mover]
+    assert mover not in grid.query_radius(actors[0].position, 0.0)
+
+    mover.position = (101.0, 100.0, 0.0)
+    grid.update(mover)
+    assert grid.query_radius((102.0, 100.0, 0.0), 1.0) == [mover]
+
+    grid.remove(mover)
+    assert mover not in grid and len(grid) == 2
+    assert grid.query_radius((101.0, 100.0, 0.0), 5.0) == []
+    with pytest.raises(ValueError):
+        grid.insert(actors[0])
+
+
+@pytest.mark.parametrize("cell_size", [1.0, 6.0, 50.0])
+def test_grid_query_matches_brute_force(cell_size):
+    rng = random.Random(7)
+    actors = _actors(200, rng)
+    grid = SpatialGrid(cell_size=cell_size, actors=actors)
+    for _ in range(50):
+        center = (rng.uniform(-70, 70), rng.uniform(-70, 70), rng.uniform(0, 10))
+        radius = rng.choice([0.5, 6.0, 25.0, 500.0])
+        expected = [actor for actor in actors if math.dist(center, actor.position) <= radius]
+        assert grid.query_radius(center, radius) == expected
+
+
+def test_explode_with_grid_matches_list_scan():
+    rng = random.Random(3)
+    actors = _actors(150, rng, extent=20.0)
+    actors[0].name = "shooter"
+    rockets = [
+        RocketProjectile(100.0, 6.0, (rng.uniform(-20, 20), rng.uniform(-20, 20), 2.0), (0.0, 0.0, 0.0), 0.5, 15.0)
+        for _ in range(20)
+    ]
+    scanned = copy.deepcopy(actors)
+    grid = SpatialGrid(cell_size=6.0, actors=actors)
+
+    for rocket in rockets:
+        assert rocket.explode(grid) == rocket.explode(scanned)
+    assert [(a.health.health, a.health.armor, a.velocity) for a in actors] == [
+        (a.health.health, a.health.armor, a.velocity) for a in scanned
+    ]
@@ -0,0 +1,91 @@
+import json
+import socket
+import time
+
+from server.config import ServerConfig
+from server.metrics import AggregatedMetrics, Metrics
+from server.supervisor import WorkerSupervisor, worker_configs
+
+
+def test_worker_configs_assign_ports():
+    config = ServerConfig(port=7000, workers=3, metrics_port=9100)
+
+    assert [c.port for c in worker_configs(config)] == [7000, 7001, 7002]
+    assert all(c.metrics_port is None and c.workers == 1 for c in worker_configs(config))
+
+    shared = worker_configs(ServerConfig(port=7000, workers=2, shared_port=True))
+    assert [(c.port, c.reuse_port) for c in shared] == [(7000, True), (7000, True)]
+
+
+def test_aggregated_metrics_merge_worker_exports():
+    workers = [Metrics(), Metrics()]
+    for value, metrics in enumerate(workers, start=1):
+        metrics.increment("ticks", 10 * value)
+        metrics.set_gauge("tick_rate_actual", 30.0)
+        metrics.observe("tick_duration_ms", value)
+
+    aggregate = AggregatedMetrics()
+    aggregate.increment("workers_restarted")
+    for index, metrics in enumerate(workers):
+        aggregate.update_worker(index, metrics.export())
+
+    assert aggregate.snapshot() == {"ticks": 30, "workers_restarted": 1}
+    assert aggregate.gauges() == {}
+    assert aggregate.worker_gauges() == {0: {"tick_rate_actual": 30.0}, 1: {"tick_rate_actual": 30.0}}
+    histogram = aggregate.histograms()["tick_duration_ms"]
+    assert histogram["count"] == 2
+    assert histogram["buckets"][1] == 1
+    assert histogram["buckets"][2] == 2
+    rendered = aggregate.render_prometheus()
+    assert "shiz_ticks_total 30" in rendered
+    assert rendered.count("# TYPE shiz_tick_rate_actual gauge") == 1
+    assert 'shiz_tick_rate_actual{worker="0"} 30.0' in rendered
+    assert 'shiz_tick_rate_actual{worker="1"} 30.0' in rendered
+
+
+def test_aggregated_counters_survive_a_worker_restart():
+    aggregate = AggregatedMetrics()
+    first = Metrics()
+    first.increment("ticks", 100)
+    first.observe("tick_duration_ms", 1)
+    aggregate.update_worker(0, first.export())
+    first.increment("ticks", 20)
+    aggregate.update_worker(0, first.export())
+    assert aggregate.get("ticks") == 120
+
+    restarted = Metrics()
+    restarted.increment("ticks", 5)
+    restarted.set_gauge("tick_rate_actual", 24.0)
+    aggregate.update_worker(0, restarted.export())
+    assert aggregate.snapshot() == {"ticks": 125}
+    assert aggregate.get("ticks") == 125
+    assert aggregate.histograms()["tick_duration_ms"]["count"] == 1
+    assert 'shiz_tick_rate_actual{worker="0"} 24.0' in aggregate.render_prometheus()
+
+
+def test_supervisor_runs_workers_on_a_shared_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    config = ServerConfig(host="127.0.0.1", port=port, workers=2, shared_port=True, tick_rate=20)
+    supervisor = WorkerSupervisor(config)
+    supervisor.start()
+    try:
+        deadline = time.monotonic() + 15
+        reply = b""
+        while time.monotonic() < deadline and not reply:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=2) as client:
+                    client.sendall(json.dumps({"player_id": "p1"}).encode() + b"\n")
+                    reply = client.recv(1024)
+            except OSError:
+                time.sleep(0.1)
+        assert json.loads(reply)["status"] == "ok"
+
+        while time.monotonic() < deadline and supervisor.metrics.get("connections_opened") < 1:
+            time.sleep(0.1)
+        supervisor.check_workers()
+        assert supervisor.metrics.gauges()["workers_alive"] == 2
+        assert supervisor.metrics.snapshot()["connections_opened"] >= 1
+    finally:
+        supervisor.stop()